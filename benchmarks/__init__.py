@@ -0,0 +1,6 @@
+# benchmarks/__init__.py
+"""
+Benchmarks do pipeline, executados como módulos a partir da raiz do projeto:
+
+    python -m benchmarks.bench_pipeline
+"""
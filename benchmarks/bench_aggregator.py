@@ -0,0 +1,147 @@
+# benchmarks/bench_aggregator.py
+"""
+Benchmark da agregação Gold em colunas (NumPy) contra uma versão de referência em Python puro.
+
+    python -m benchmarks.bench_aggregator [--rows 250000,500000,1000000,2000000] [--repeat 3]
+
+Para cada tamanho, mede o caminho em colunas (linhas fato + agregados por categoria) e
+mostra o custo por linha: com crescimento linear, o tempo por linha fica constante.
+Antes de medir, confere que a saída é idêntica à da referência.
+"""
+import argparse
+import random
+import time
+
+from src.processing.gold import aggregator
+
+CATEGORIES = ["specials", "top_sellers", "new_releases", "coming_soon", "5", "6", None]
+PROCESSING_TIME = "2025-12-11T18:32:10.683270"
+
+
+def make_silver_columns(n: int, seed: int = 42) -> dict:
+    """Colunas do Silver como devolvidas por formats.read_dataset_columns (listas Python)."""
+    rng = random.Random(seed)
+    original = [rng.choice([19.99, 59.9, 129.0, 0.0, None]) for _ in range(n)]
+    discount = [rng.choice([0, 10, 25, 50, 75, 90, None]) for _ in range(n)]
+    final = [
+        None if o is None else round(o * (100 - (d or 0)) / 100, 2)
+        for o, d in zip(original, discount)
+    ]
+    return {
+        "game_id": [100000 + i for i in range(n)],
+        "game_name": [f"Game {i}" for i in range(n)],
+        "game_type": [rng.choice([0, 1, None]) for _ in range(n)],
+        "genres": [rng.choice([["Action"], ["Indie", "RPG"], None]) for _ in range(n)],
+        "is_discounted": [None if d is None or rng.random() < 0.3 else d > 0 for d in discount],
+        "discount_percent": discount,
+        "original_price": original,
+        "final_price": final,
+        "category": [rng.choice(CATEGORIES) for _ in range(n)],
+        "source": ["steam"] * n,
+        "captured_at": ["2025-12-11T18:31:47.910484+00:00"] * n,
+    }
+
+
+def reference_facts(records: list, processing_time: str) -> list:
+    # Implementação direta, um dicionário por vez (mesmas regras do aggregator)
+    facts = []
+    for r in records:
+        if r.get("game_id") is None:
+            continue
+        original, final, discount = r.get("original_price"), r.get("final_price"), r.get("discount_percent")
+        if discount is None and original is not None and final is not None and original > 0:
+            discount = int(min(100, max(0, round(100.0 * (1.0 - final / original)))))
+        is_discounted = r.get("is_discounted")
+        if is_discounted is None and discount is not None:
+            is_discounted = discount > 0
+        facts.append({
+            "fact_id": f"{r['game_id']}_{processing_time}",
+            "game_id": r["game_id"],
+            "game_name": r.get("game_name"),
+            "game_type": r.get("game_type"),
+            "genres": r.get("genres"),
+            "is_discounted": is_discounted,
+            "discount_percent": discount,
+            "original_price": original,
+            "final_price": final,
+            "category": r.get("category"),
+            "source": r.get("source"),
+            "capture_date_utc": r.get("captured_at"),
+            "processing_date_utc": processing_time,
+        })
+    return facts
+
+
+def reference_categories(facts: list) -> dict:
+    groups = {}
+    for f in facts:
+        g = groups.setdefault(f["category"], {"items": 0, "discounted": 0, "prices": [], "discounts": []})
+        g["items"] += 1
+        g["discounted"] += f["is_discounted"] is True
+        if f["final_price"] is not None:
+            g["prices"].append(f["final_price"])
+        if f["discount_percent"] is not None:
+            g["discounts"].append(f["discount_percent"])
+    return groups
+
+
+def check_equivalence(columns: dict) -> None:
+    n = len(columns["game_id"])
+    records = [{name: values[i] for name, values in columns.items()} for i in range(n)]
+    expected = reference_facts(records, PROCESSING_TIME)
+    facts, categories = aggregator.aggregate_featured_columns(columns, PROCESSING_TIME)
+    if aggregator.fact_records(facts) != expected:
+        raise AssertionError("linhas fato divergem da referência")
+    if aggregator.aggregate_featured_games(records, PROCESSING_TIME) != expected:
+        raise AssertionError("aggregate_featured_games diverge da referência")
+
+    groups = reference_categories(expected)
+    for row in categories:
+        g = groups[row["category"]]
+        prices, discounts = g["prices"], g["discounts"]
+        checks = (
+            row["items"] == g["items"],
+            row["discounted_items"] == g["discounted"],
+            row["min_final_price"] == (min(prices) if prices else None),
+            row["avg_final_price"] == (round(sum(prices) / len(prices), 2) if prices else None),
+            sum(row[name] for name, _ in aggregator.DISCOUNT_BUCKETS) == len(discounts),
+        )
+        if not all(checks):
+            raise AssertionError(f"agregado divergente para a categoria {row['category']!r}: {row}")
+
+
+def _best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rows", default="250000,500000,1000000,2000000")
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    check_equivalence(make_silver_columns(20_000, seed=7))
+
+    # Referência em Python puro, medida só no menor tamanho (é a ordem de grandeza a comparar)
+    sizes = [int(s) for s in args.rows.split(",")]
+    small = make_silver_columns(sizes[0])
+    small_records = [dict(zip(small, row)) for row in zip(*small.values())]
+    t_ref = _best_of(lambda: reference_categories(reference_facts(small_records, PROCESSING_TIME)), args.repeat)
+    print(f"referência (Python puro, {sizes[0]} linhas): {t_ref * 1e9 / sizes[0]:.0f} ns/linha")
+    del small, small_records
+
+    print(f"{'linhas':>10}  {'colunas fato':>14}  {'+ categorias':>14}  {'ns/linha':>9}")
+    for n in sizes:
+        columns = make_silver_columns(n)
+        t_facts = _best_of(lambda: aggregator.build_fact_columns(columns, PROCESSING_TIME), args.repeat)
+        t_total = _best_of(lambda: aggregator.aggregate_featured_columns(columns, PROCESSING_TIME), args.repeat)
+        print(f"{n:>10}  {t_facts:>13.3f}s  {t_total:>13.3f}s  {t_total * 1e9 / n:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+# benchmarks/bench_pipeline.py
+"""
+Vazão de cada etapa do pipeline sobre payloads sintéticos (benchmarks/synthetic.py).
+
+    python -m benchmarks.bench_pipeline [--items 50000] [--categories 4] [--duplicate-ratio 0.1]
+                                        [--malformed-rate 0.02] [--repeat 3] [--stages a,b]
+                                        [--output resultado.json] [--compare anterior.json]
+
+Etapas: parse_featured, stream_parse (leitura em streaming do Bronze), normalize_featured,
+validate (_validate_and_clean_game), silver_dedup (process_bronze_file + merge_games, o laço
+de desduplicação do Silver) e gold_aggregate (colunas + linhas fato + agregados).
+
+Cada etapa roda num processo separado, para que o pico de memória de uma não contamine a
+outra. Para cada uma são medidos: registros/s (melhor de --repeat), pico de RSS do processo
+durante a etapa (inclui a entrada já preparada), pico de memória alocada pelo Python e
+bytes por registro que continuam alocados no resultado (tracemalloc, numa execução à parte,
+porque o rastreamento deixa a execução mais lenta).
+
+O resultado é gravado em JSON (por padrão benchmarks/results/<commit>.json) junto com o
+commit e os parâmetros; --compare mostra a variação em relação a outro resultado.
+"""
+import argparse
+import atexit
+import copy
+import datetime as dt
+import io
+import json
+import multiprocessing
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from .synthetic import make_featured_payload
+
+PROCESSING_TIME = "2025-12-11T18:32:10.683270"
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+
+# --- etapas -------------------------------------------------------------------
+# Cada etapa recebe o payload e retorna (prepare, run, registros): prepare() monta a entrada
+# de uma repetição (fora da medição) e run(entrada) é o trecho medido.
+
+def _stage_parse_featured(payload):
+    from src.collectors.steam import parser
+
+    items = sum(len(c["items"]) for _, c in parser.iter_categories(payload))
+    return (lambda: payload), parser.parse_featured, items
+
+
+def _stage_stream_parse(payload):
+    from src.collectors.steam import parser
+
+    text = json.dumps(payload)
+    items = sum(len(c["items"]) for _, c in parser.iter_categories(payload))
+    return (lambda: io.StringIO(text)), (lambda fp: sum(1 for _ in parser.iter_featured_games(fp))), items
+
+
+def _stage_normalize_featured(payload):
+    from src.collectors.steam import parser
+
+    items = [item for _, c in parser.iter_categories(payload) for item in c["items"]]
+    # normalize_featured altera o item: cada repetição recebe cópias novas
+    return (lambda: copy.deepcopy(items)), (lambda batch: [parser.normalize_featured(i) for i in batch]), len(items)
+
+
+def _normalized_records(payload) -> list:
+    from src.collectors.steam import parser
+
+    metadata = {"source": "steam", "endpoint": "featuredcategories",
+                "captured_at": PROCESSING_TIME, "normalized_at": PROCESSING_TIME}
+    records = []
+    for category, game in parser.iter_featured_games(copy.deepcopy(payload)):
+        game.update(metadata, category=category)
+        records.append(game)
+    return records
+
+
+def _stage_validate(payload):
+    from steam_pipeline_functions.process_silver import _validate_and_clean_game
+
+    records = _normalized_records(payload)
+    return (lambda: records), (lambda batch: [_validate_and_clean_game(r) for r in batch]), len(records)
+
+
+def _stage_silver_dedup(payload):
+    from src.processing import bronze_store, silver_transform
+
+    tmp = Path(tempfile.mkdtemp(prefix="bench_silver_"))
+    atexit.register(shutil.rmtree, tmp, True)
+    digest, _ = bronze_store.put_capture(tmp, payload, name="raw_featured_20250101_000000")
+    path = bronze_store.find_object(tmp, digest)
+    items = sum(len(c["items"]) for c in payload.values() if isinstance(c, dict) and "items" in c)
+
+    def run(state):
+        ok, games, *_ = silver_transform.process_bronze_file(path, PROCESSING_TIME)
+        silver_transform.merge_games(state, games)
+        return state
+
+    return dict, run, items
+
+
+def _stage_gold_aggregate(payload):
+    from src.collectors.steam.Schemas.validator import FEATURED_GAME_VALIDATOR
+    from src.processing.gold import aggregator
+
+    silver = [g for g in (FEATURED_GAME_VALIDATOR.validate(r) for r in _normalized_records(payload)) if g]
+
+    def run(records):
+        return aggregator.aggregate_featured_columns(aggregator.columns_from_records(records), PROCESSING_TIME)
+
+    return (lambda: silver), run, len(silver)
+
+
+STAGES = {
+    "parse_featured": _stage_parse_featured,
+    "stream_parse": _stage_stream_parse,
+    "normalize_featured": _stage_normalize_featured,
+    "validate": _stage_validate,
+    "silver_dedup": _stage_silver_dedup,
+    "gold_aggregate": _stage_gold_aggregate,
+}
+
+
+# --- medição ------------------------------------------------------------------
+
+def _reset_peak_rss() -> bool:
+    # Linux: zera o pico de RSS (VmHWM) do processo para medir só a etapa
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _peak_rss_mb() -> float:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # ru_maxrss: KiB no Linux, bytes no macOS (pico do processo inteiro, inclusive a preparação)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def run_stage(name: str, params: dict, repeat: int) -> dict:
+    """Executa uma etapa (no processo atual) e retorna as métricas."""
+    payload = make_featured_payload(**params)
+    prepare, run, records = STAGES[name](payload)
+
+    best = float("inf")
+    for _ in range(repeat):
+        data = prepare()
+        start = time.perf_counter()
+        run(data)
+        best = min(best, time.perf_counter() - start)
+
+    data = prepare()
+    exact_rss = _reset_peak_rss()
+    run(data)
+    peak_rss = _peak_rss_mb()
+
+    data = prepare()
+    blocks = sys.getallocatedblocks()
+    tracemalloc.start()
+    result = run(data)
+    retained_bytes, alloc_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    retained = sys.getallocatedblocks() - blocks
+    del result
+
+    return {
+        "records": records,
+        "seconds": round(best, 6),
+        "records_per_sec": round(records / best, 1) if best > 0 else None,
+        "peak_rss_mb": round(peak_rss, 1),
+        "peak_rss_exact": exact_rss,
+        "alloc_peak_mb": round(alloc_peak / (1024 * 1024), 2),
+        "retained_bytes_per_record": round(retained_bytes / records, 1) if records else None,
+        "retained_blocks": retained,
+    }
+
+
+def _git_commit() -> str | None:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                             cwd=Path(__file__).resolve().parent, check=True)
+        return out.stdout.strip() or None
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current: dict, previous: dict) -> None:
+    print(f"\ncomparação com {previous.get('commit') or '?'} ({previous.get('created_at', '?')}):")
+    print(f"{'etapa':<20}  {'registros/s':>12}  {'pico RSS':>9}  {'alocado':>9}  {'bytes/reg.':>10}")
+    for name, stage in current["stages"].items():
+        old = previous.get("stages", {}).get(name)
+        if not old:
+            print(f"{name:<20}  {'(nova)':>12}")
+            continue
+
+        def ratio(key):
+            a, b = stage.get(key), old.get(key)
+            return f"{(a / b - 1) * 100:+.1f}%" if a and b else "-"
+        print(f"{name:<20}  {ratio('records_per_sec'):>12}  {ratio('peak_rss_mb'):>9}  {ratio('alloc_peak_mb'):>9}  "
+              f"{ratio('retained_bytes_per_record'):>10}")
+    if previous.get("params") != current["params"]:
+        print("atenção: parâmetros diferentes entre as execuções")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--items", type=int, default=50_000)
+    ap.add_argument("--categories", type=int, default=4)
+    ap.add_argument("--duplicate-ratio", type=float, default=0.1)
+    ap.add_argument("--malformed-rate", type=float, default=0.02)
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--stages", default=",".join(STAGES))
+    ap.add_argument("--output", type=Path, help="arquivo JSON de saída (padrão: benchmarks/results/<commit>.json)")
+    ap.add_argument("--compare", type=Path, help="resultado JSON anterior para comparação")
+    args = ap.parse_args()
+
+    params = {"items": args.items, "categories": args.categories, "duplicate_ratio": args.duplicate_ratio,
+              "malformed_rate": args.malformed_rate, "seed": args.seed}
+    names = [s for s in args.stages.split(",") if s]
+    unknown = set(names) - set(STAGES)
+    if unknown:
+        ap.error(f"etapas desconhecidas: {', '.join(sorted(unknown))}")
+
+    stages = {}
+    print(f"{'etapa':<20}  {'registros':>10}  {'registros/s':>14}  {'pico RSS':>10}  {'alocado':>10}")
+    # Um processo novo por etapa (spawn): o pico de memória é só o da etapa
+    ctx = multiprocessing.get_context("spawn")
+    for name in names:
+        with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+            stage = pool.submit(run_stage, name, params, args.repeat).result()
+        stages[name] = stage
+        print(f"{name:<20}  {stage['records']:>10,}  {stage['records_per_sec']:>14,.0f}  "
+              f"{stage['peak_rss_mb']:>8.1f}MB  {stage['alloc_peak_mb']:>8.1f}MB")
+
+    commit = _git_commit()
+    result = {
+        "commit": commit,
+        "created_at": dt.datetime.now(dt.timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": params,
+        "repeat": args.repeat,
+        "stages": stages,
+    }
+    output = args.output or RESULTS_DIR / f"{commit or 'sem-commit'}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(result, indent=2, ensure_ascii=False), encoding="utf-8")
+    print(f"\nresultado gravado em {output}")
+
+    if args.compare:
+        compare(result, json.loads(args.compare.read_text(encoding="utf-8")))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# benchmarks/bench_price_history.py
+"""
+Latência das consultas do histórico de preços em função do número de capturas.
+
+    python -m benchmarks.bench_price_history [--games 20000] [--captures 50,200,800]
+
+Para cada quantidade de capturas, monta um histórico sintético (cada jogo muda de preço
+em ~30% das capturas) e mede histórico completo, menor preço histórico e último preço
+de jogos aleatórios. O custo de uma consulta depende só das observações do jogo
+consultado, não do total armazenado.
+"""
+import argparse
+import datetime as dt
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from src.processing.price_history import PriceHistoryStore
+
+PRICES = [9.99, 19.99, 29.99, 59.9, 129.0]
+DISCOUNTS = [0, 10, 25, 50, 75, 90]
+
+
+def build_store(root: Path, games: int, captures: int, seed: int = 42) -> PriceHistoryStore:
+    rng = random.Random(seed)
+    store = PriceHistoryStore(root)
+    start = dt.datetime(2025, 1, 1, tzinfo=dt.timezone.utc)
+    state = {game_id: (rng.choice(PRICES), 0) for game_id in range(1, games + 1)}
+    for i in range(captures):
+        records = []
+        for game_id, (original, discount) in state.items():
+            if rng.random() < 0.3:
+                discount = rng.choice(DISCOUNTS)
+                state[game_id] = (original, discount)
+            records.append({
+                "game_id": game_id,
+                "original_price": original,
+                "final_price": round(original * (100 - discount) / 100, 2),
+                "discount_percent": discount,
+                "category": "specials" if discount else "top_sellers",
+            })
+        store.append(records, captured_at=(start + dt.timedelta(hours=i)).isoformat())
+        if i % 50 == 49:
+            store.commit()
+    store.commit()
+    return store
+
+
+def _per_query_ms(fn, ids) -> float:
+    start = time.perf_counter()
+    for game_id in ids:
+        fn(game_id)
+    return (time.perf_counter() - start) * 1000 / len(ids)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--games", type=int, default=20_000)
+    ap.add_argument("--captures", default="50,200,800")
+    ap.add_argument("--queries", type=int, default=2_000)
+    args = ap.parse_args()
+
+    rng = random.Random(0)
+    print(f"{'capturas':>9}  {'observações':>12}  {'abrir (ms)':>10}  {'histórico':>10}  {'mínimo':>9}  {'último':>9}")
+    for captures in (int(c) for c in args.captures.split(",")):
+        with tempfile.TemporaryDirectory() as tmp:
+            build_store(Path(tmp), args.games, captures).close()
+
+            start = time.perf_counter()
+            store = PriceHistoryStore(Path(tmp))
+            open_ms = (time.perf_counter() - start) * 1000
+            total = len(store)
+
+            ids = [rng.randint(1, args.games) for _ in range(args.queries)]
+            history_ms = _per_query_ms(store.history, ids)
+            low_ms = _per_query_ms(store.all_time_low, ids)
+            latest_ms = _per_query_ms(store.latest, ids)
+            store.close()
+        print(f"{captures:>9}  {total:>12,}  {open_ms:>10.1f}  {history_ms:>8.3f}ms  "
+              f"{low_ms:>7.4f}ms  {latest_ms:>7.4f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+# benchmarks/bench_validator.py
+"""
+Micro-benchmark do validador compilado contra a implementação de referência.
+
+    python -m benchmarks.bench_validator [--records 200000] [--repeat 5]
+
+Antes de medir, confere que as duas implementações produzem exatamente a mesma saída
+para um conjunto de registros com valores válidos, ausentes e malformados.
+"""
+import argparse
+import random
+import time
+
+from src.collectors.steam.Schemas.featured_schema import SCHEMA_FEATURED_GAME
+from src.collectors.steam.Schemas.validator import compile_schema, validate_and_clean_game
+
+# Valores "sujos" que já aparecem ou podem aparecer na API / em arquivos antigos
+_MALFORMED = {
+    "game_id": [None, "abc", "123", 45.9, True],
+    "game_name": [None, 123, b"bytes"],
+    "game_type": [None, "0", "x", 1.7, False],
+    "is_discounted": [None, 0, 1, "", "false"],
+    "discount_percent": [None, "50", "abc", 33.3],
+    "original_price": [None, "R$ 22,90", "abc", True, 10**400, float("inf"), "12.5 "],
+    "final_price": [None, "19,99", "", -1, 3.14159],
+    "category": [None, 5, "specials"],
+}
+
+
+# Campos que o pipeline preenche com o mesmo valor para todo o arquivo Bronze
+METADATA_FIELDS = ("source", "endpoint", "captured_at", "normalized_at")
+
+
+def _clean_record(rng: random.Random, i: int) -> dict:
+    # Registro típico depois do normalize_featured
+    original = rng.choice([19.99, 59.9, 129.0, 0.0])
+    discount = rng.choice([0, 10, 25, 50, 75, 90])
+    return {
+        "game_id": 100000 + i,
+        "game_type": 0,
+        "game_name": f"Game {i}",
+        "is_discounted": discount > 0,
+        "discount_percent": discount,
+        "original_price": original,
+        "final_price": round(original * (100 - discount) / 100, 2),
+        "currency": "BRL",
+        "source": "steam",
+        "endpoint": "featuredcategories",
+        "category": rng.choice(["specials", "top_sellers", "new_releases", "coming_soon"]),
+        "captured_at": "2025-12-11T18:31:47.910484+00:00",
+        "normalized_at": "2025-12-11T18:31:47.910484+00:00",
+    }
+
+
+def make_records(n: int, malformed_rate: float = 0.02, seed: int = 42) -> list:
+    rng = random.Random(seed)
+    records = []
+    for i in range(n):
+        record = _clean_record(rng, i)
+        if rng.random() < malformed_rate:
+            field = rng.choice(list(_MALFORMED))
+            record[field] = rng.choice(_MALFORMED[field])
+        records.append(record)
+    return records
+
+
+def check_equivalence(records: list, validator) -> None:
+    expected_all = []
+    for record in records:
+        expected = validate_and_clean_game(record)
+        got = validator.validate(record)
+        if repr(expected) != repr(got):
+            raise AssertionError(f"saída divergente para {record!r}:\n{expected!r}\n{got!r}")
+        if expected is not None:
+            expected_all.append(expected)
+    # Lote em colunas, com e sem metadados constantes
+    if repr(validator.validate_batch(records).records()) != repr(expected_all):
+        raise AssertionError("validate_batch diverge da referência")
+    constants = {field: records[0][field] for field in METADATA_FIELDS}
+    if repr(validator.validate_batch(records, constants).records()) != repr(expected_all):
+        raise AssertionError("validate_batch com constantes diverge da referência")
+    # Todos os valores malformados, campo a campo
+    base = _clean_record(random.Random(0), 0)
+    for field, values in _MALFORMED.items():
+        for value in values:
+            record = dict(base, **{field: value})
+            if repr(validate_and_clean_game(record)) != repr(validator.validate(record)):
+                raise AssertionError(f"saída divergente para {field}={value!r}")
+
+
+def _best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--records", type=int, default=200_000)
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--malformed-rate", type=float, default=0.02)
+    args = ap.parse_args()
+
+    validator = compile_schema(SCHEMA_FEATURED_GAME)
+    records = make_records(args.records, args.malformed_rate)
+    check_equivalence(records[:20_000], validator)
+
+    constants = {field: records[0][field] for field in METADATA_FIELDS}
+    validate = validator.validate
+
+    results = {
+        "referência": _best_of(lambda: [validate_and_clean_game(r) for r in records], args.repeat),
+        "compilado (registro)": _best_of(lambda: [validate(r) for r in records], args.repeat),
+        "lote (colunas)": _best_of(lambda: validator.validate_batch(records), args.repeat),
+        "lote + constantes": _best_of(lambda: validator.validate_batch(records, constants), args.repeat),
+        "lote + constantes + dicts": _best_of(lambda: validator.validate_batch(records, constants).records(), args.repeat),
+    }
+
+    batch = validator.validate_batch(records, constants)
+    n = len(records)
+    t_ref = results["referência"]
+    print(f"registros: {n}  rejeitados: {batch.rejected}  erros por campo: {dict(batch.errors)}")
+    for label, seconds in results.items():
+        print(f"{label:<26}: {n / seconds:>12,.0f} registros/s  ({t_ref / seconds:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
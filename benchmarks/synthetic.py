@@ -0,0 +1,165 @@
+# benchmarks/synthetic.py
+"""
+Gerador de payloads sintéticos do endpoint featuredcategories da Steam.
+
+    python -m benchmarks.synthetic --out /tmp/bronze [--captures 10] [--items 5000]
+                                   [--categories 4] [--duplicate-ratio 0.1] [--malformed-rate 0.02]
+
+O payload segue a estrutura da API (categorias com id/name/items, entradas sem items como
+genres/trailerslideshow e o campo status), com preços em centavos e os mesmos campos de
+imagem/plataforma dos arquivos Bronze reais. Com --out, grava as capturas no Bronze
+endereçado por conteúdo, prontas para o process_silver.
+
+- duplicate_ratio: fração dos itens que repete um game_id já gerado (em qualquer categoria);
+- malformed_rate: fração dos itens com um campo malformado ou ausente.
+"""
+import argparse
+import datetime as dt
+import random
+from pathlib import Path
+
+# Categorias com items, na ordem da API; além delas, as numeradas ("0", "1", ...) como os spotlights
+BASE_CATEGORIES = [
+    ("specials", "cat_specials", "Specials"),
+    ("coming_soon", "cat_comingsoon", "Coming Soon"),
+    ("top_sellers", "cat_topsellers", "Top Sellers"),
+    ("new_releases", "cat_newreleases", "New Releases"),
+]
+
+CURRENCIES = ["BRL", "USD", "EUR", "SAR"]
+PRICES_CENTS = [0, 999, 1999, 2999, 4999, 5990, 7999, 12900, 19990, 22900, 29900]
+DISCOUNTS = [0, 0, 0, 10, 15, 20, 25, 33, 50, 60, 66, 75, 80, 90]
+WORDS = ["Dark", "Legend", "Space", "Farm", "Souls", "Tactics", "Racing", "Simulator", "Quest",
+         "Chronicles", "Dungeon", "City", "Zombie", "Pixel", "Empire", "Odyssey", "Rogue", "Kingdom"]
+
+# Corrupções possíveis em cada item (valores que a validação precisa descartar/converter)
+_MALFORMED = [
+    ("original_price", "R$ 22,90"),
+    ("final_price", "abc"),
+    ("final_price", None),
+    ("discount_percent", "50"),
+    ("discount_percent", 33.3),
+    ("discounted", "false"),
+    ("name", 12345),
+    ("type", "0"),
+    ("id", "not-an-id"),
+    ("type", None),        # removido: o item deixa de ser um jogo
+    ("id", None),          # removido: descartado na normalização
+]
+
+_IMAGE = "https://shared.akamai.steamstatic.com/store_item_assets/steam/apps/{id}/{name}?t={t}"
+
+
+def make_item(rng: random.Random, game_id: int, currency: str) -> dict:
+    original = rng.choice(PRICES_CENTS)
+    discount = rng.choice(DISCOUNTS) if original else 0
+    t = rng.randint(1_700_000_000, 1_760_000_000)
+    item = {
+        "id": game_id,
+        "type": 0 if rng.random() < 0.9 else rng.choice([1, 2]),
+        "name": " ".join(rng.sample(WORDS, rng.randint(2, 4))),
+        "discounted": discount > 0,
+        "discount_percent": discount,
+        "original_price": original if rng.random() < 0.95 else None,
+        "final_price": original * (100 - discount) // 100,
+        "currency": currency,
+        "large_capsule_image": _IMAGE.format(id=game_id, name="capsule_616x353.jpg", t=t),
+        "small_capsule_image": _IMAGE.format(id=game_id, name="capsule_184x69.jpg", t=t),
+        "windows_available": True,
+        "mac_available": rng.random() < 0.3,
+        "linux_available": rng.random() < 0.2,
+        "streamingvideo_available": False,
+        "header_image": _IMAGE.format(id=game_id, name="header.jpg", t=t),
+        "controller_support": rng.choice(["full", "partial", None]),
+    }
+    if discount:
+        item["discount_expiration"] = t + rng.randint(1, 30) * 86_400
+    if item["controller_support"] is None:
+        del item["controller_support"]
+    return item
+
+
+def _corrupt(rng: random.Random, item: dict) -> None:
+    field, value = rng.choice(_MALFORMED)
+    if value is None and field in ("id", "type"):
+        del item[field]
+    else:
+        item[field] = value
+
+
+def make_featured_payload(items: int = 1000, categories: int = 4, duplicate_ratio: float = 0.1,
+                          malformed_rate: float = 0.02, seed: int = 42, first_id: int = 100_000) -> dict:
+    """
+    Payload featuredcategories com `items` itens distribuídos entre `categories` categorias.
+    Mesma semente, mesmo payload (os benchmarks comparam execuções entre commits).
+    """
+    rng = random.Random(seed)
+    currency = rng.choice(CURRENCIES)
+    names = list(BASE_CATEGORIES[:categories])
+    names += [(str(i), f"cat_spotlight_{i}", f"Spotlight {i}") for i in range(categories - len(names))]
+
+    payload = {}
+    for key, cat_id, name in names:
+        payload[key] = {"id": cat_id, "name": name, "items": []}
+
+    seen = []
+    next_id = first_id
+    for i in range(items):
+        if seen and rng.random() < duplicate_ratio:
+            game_id = rng.choice(seen)
+        else:
+            game_id = next_id
+            next_id += rng.randint(1, 7)
+            seen.append(game_id)
+        item = make_item(rng, game_id, currency)
+        if rng.random() < malformed_rate:
+            _corrupt(rng, item)
+        payload[names[i % len(names)][0]]["items"].append(item)
+
+    # Entradas sem lista de items, como na resposta real
+    payload["genres"] = {"id": "cat_genres", "name": "Genres"}
+    payload["trailerslideshow"] = {"id": "cat_trailerslideshow", "name": "Trailer TV"}
+    payload["status"] = 1
+    return payload
+
+
+def write_captures(root: Path, captures: int, start: dt.datetime | None = None, **kwargs) -> list:
+    """
+    Grava `captures` capturas no Bronze endereçado por conteúdo (uma por hora a partir de start).
+    Cada captura usa outra semente: preços e descontos mudam entre elas.
+    Retorna os nomes das capturas.
+    """
+    from src.processing import bronze_store
+
+    start = start or dt.datetime(2025, 1, 1, tzinfo=dt.timezone.utc)
+    seed = kwargs.pop("seed", 42)
+    names = []
+    for i in range(captures):
+        ts = start + dt.timedelta(hours=i)
+        name = f"raw_featured_{ts.strftime('%Y%m%d_%H%M%S')}"
+        payload = make_featured_payload(seed=seed + i, **kwargs)
+        bronze_store.put_capture(root, payload, name=name, captured_at=ts.isoformat())
+        names.append(name)
+    return names
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--out", type=Path, required=True, help="diretório Bronze de saída")
+    ap.add_argument("--captures", type=int, default=10)
+    ap.add_argument("--items", type=int, default=5000)
+    ap.add_argument("--categories", type=int, default=4)
+    ap.add_argument("--duplicate-ratio", type=float, default=0.1)
+    ap.add_argument("--malformed-rate", type=float, default=0.02)
+    ap.add_argument("--seed", type=int, default=42)
+    args = ap.parse_args()
+
+    args.out.mkdir(parents=True, exist_ok=True)
+    names = write_captures(args.out, args.captures, items=args.items, categories=args.categories,
+                           duplicate_ratio=args.duplicate_ratio, malformed_rate=args.malformed_rate,
+                           seed=args.seed)
+    print(f"{len(names)} capturas gravadas em {args.out} ({names[0]} .. {names[-1]})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+# scripts/backfill.py
+"""
+Reprocessamento histórico do Bronze em paralelo (src/processing/backfill.py):
+
+    python scripts/backfill.py --start 2025-09-01 --end 2025-11-30 --workers 8 --shards 32
+    python scripts/backfill.py --start 2025-09-01 --end 2025-11-30 --history --commit
+
+Repetir o mesmo comando (ou o mesmo --name) depois de uma falha retoma do último
+checkpoint. --commit grava o resultado na tabela Silver (MERGE por game_id; vence a captura
+Bronze mais recente, então jogos recapturados depois do intervalo não mudam); sem ele, só
+os datasets em src/processing/_backfill/<nome> são gravados.
+"""
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+from src.collectors.steam import regions as steam_regions
+from src.processing import backfill
+from src.processing import storage as layer_storage
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Backfill Bronze -> Silver/Gold em paralelo (map-reduce por game_id)")
+    ap.add_argument("--start", help="início do intervalo de captura (ISO 8601, inclusivo)")
+    ap.add_argument("--end", help="fim do intervalo de captura (ISO 8601, inclusivo; uma data inclui o dia inteiro)")
+    ap.add_argument("--shards", type=int, default=backfill.DEFAULT_SHARDS,
+                    help="partições por hash(game_id); mais shards = menos memória por worker no reduce")
+    ap.add_argument("--workers", type=int, default=None, help="processos (padrão: número de CPUs)")
+    ap.add_argument("--task-size", type=int, default=backfill.DEFAULT_TASK_SIZE, help="capturas por tarefa de map")
+    ap.add_argument("--history", action="store_true", help="grava também todas as observações (histórico completo)")
+    ap.add_argument("--commit", action="store_true", help="grava o resultado na tabela Silver (MERGE por game_id)")
+    ap.add_argument("--name", help="nome do backfill (diretório de trabalho e checkpoints)")
+    args = ap.parse_args()
+
+    store = layer_storage.get_storage(ROOT)
+    try:
+        summary = backfill.run(store, start=args.start, end=args.end, shards=args.shards, workers=args.workers,
+                               task_size=args.task_size, history=args.history, commit=args.commit, name=args.name,
+                               region=steam_regions.primary_region(os.getenv("STEAM_REGIONS", "")))
+    finally:
+        store.close()
+    print(json.dumps({k: summary[k] for k in ("name", "captures", "games", "versions")}, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# scripts/fake_steam_server.py
+"""
+Servidor HTTP local que imita o endpoint featuredcategories da Steam, para testar o
+coletor sem acessar a API real:
+
+    python scripts/fake_steam_server.py --payload caminho/raw_featured.json --port 8765
+    STEAM_API_BASE=http://localhost:8765 python -c "from src.collectors.steam import api; print(api.get_featured_games())"
+
+Responde com ETag/Last-Modified (e 304 para requisições condicionais), comprime com gzip
+quando o cliente aceita, e pode injetar falhas 429/503 para exercitar o backoff.
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import random
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+
+def make_handler(body: bytes, fail_rate: float):
+    etag = '"' + hashlib.sha256(body).hexdigest()[:16] + '"'
+    last_modified = formatdate(usegmt=True)
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, para exercitar o pool de conexões
+
+        def _send(self, status, payload=b"", extra=None):
+            self.send_response(status)
+            for name, value in (extra or {}).items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_GET(self):
+            if not self.path.startswith("/api/featuredcategories"):
+                return self._send(404)
+            if random.random() < fail_rate:
+                return self._send(random.choice([429, 503]), extra={"Retry-After": "1"})
+            if self.headers.get("If-None-Match") == etag:
+                return self._send(304, extra={"ETag": etag})
+
+            headers = {"Content-Type": "application/json", "ETag": etag, "Last-Modified": last_modified}
+            payload = body
+            if "gzip" in self.headers.get("Accept-Encoding", ""):
+                payload = gzip.compress(body)
+                headers["Content-Encoding"] = "gzip"
+            self._send(200, payload, headers)
+
+    return Handler
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Servidor falso da API featuredcategories da Steam")
+    ap.add_argument("--payload", type=Path, required=True, help="arquivo JSON servido como resposta")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--fail-rate", type=float, default=0.0, help="fração de respostas 429/503 (0-1)")
+    args = ap.parse_args()
+
+    body = json.dumps(json.loads(args.payload.read_text(encoding="utf-8"))).encode("utf-8")
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), make_handler(body, args.fail_rate))
+    print(f"[fake_steam_server] http://127.0.0.1:{args.port}/api/featuredcategories")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
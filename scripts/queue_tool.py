@@ -0,0 +1,105 @@
+# scripts/queue_tool.py
+"""
+Ferramenta para as filas do pipeline (Azurite local ou Storage Account):
+
+    python scripts/queue_tool.py create                      (cria as filas e as -poison)
+    python scripts/queue_tool.py send-bronze raw_featured_20251211_120000
+    python scripts/queue_tool.py send-silver silver_featured@v12 --rows 120
+    python scripts/queue_tool.py peek bronze-captured
+    python scripts/queue_tool.py requeue                     (reenvia src/processing/_dead_letters/)
+
+A conexão vem de AzureWebJobsStorage (padrão: UseDevelopmentStorage=true, o Azurite).
+Os dead letters são lidos do armazenamento das camadas (PIPELINE_STORAGE), como nas Functions.
+As mensagens vão em base64, o formato esperado pelo queueTrigger do Azure Functions.
+"""
+import argparse
+import os
+import sys
+from pathlib import Path
+
+from azure.storage.queue import QueueClient, TextBase64DecodePolicy, TextBase64EncodePolicy
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+from src.processing import events
+from src.processing import storage as layer_storage
+
+QUEUES = [events.BRONZE_QUEUE, events.SILVER_QUEUE]
+
+
+def _queue(name: str) -> QueueClient:
+    conn = os.getenv("AzureWebJobsStorage", "UseDevelopmentStorage=true")
+    return QueueClient.from_connection_string(conn, name,
+                                              message_encode_policy=TextBase64EncodePolicy(),
+                                              message_decode_policy=TextBase64DecodePolicy())
+
+
+def _create(_args) -> None:
+    for name in QUEUES + [q + events.POISON_SUFFIX for q in QUEUES]:
+        client = _queue(name)
+        try:
+            client.create_queue()
+            print(f"[queue_tool] fila {name} criada")
+        except Exception as e:
+            # ResourceExistsError: a fila já existe
+            print(f"[queue_tool] fila {name}: {type(e).__name__}")
+
+
+def _send(queue: str, body: str) -> None:
+    _queue(queue).send_message(body)
+    print(f"[queue_tool] {queue} <- {body}")
+
+
+def _peek(args) -> None:
+    for message in _queue(args.queue).peek_messages(max_messages=32):
+        print(f"{message.id}  tentativas={message.dequeue_count}  {message.content}")
+
+
+def _requeue(_args) -> None:
+    """Reenvia os dead letters para a fila de origem; só os reenviados são apagados."""
+    store = layer_storage.get_storage(ROOT)
+    try:
+        letters = events.list_dead_letters(store)
+        if not letters:
+            print("[queue_tool] nenhum dead letter registrado")
+            return
+        for key, entry in letters:
+            try:
+                _send(entry["queue"], entry["body"])
+            except Exception as e:
+                print(f"[queue_tool] falha ao reenviar para {entry['queue']}: {e}")
+                continue
+            store.delete(key)
+    finally:
+        store.close()
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = ap.add_subparsers(dest="command", required=True)
+    sub.add_parser("create").set_defaults(fn=_create)
+
+    bronze = sub.add_parser("send-bronze")
+    bronze.add_argument("capture", help="nome da captura Bronze (ex: raw_featured_20251211_120000)")
+    bronze.add_argument("--sha256", default="")
+    bronze.add_argument("--region")
+    bronze.set_defaults(fn=lambda a: _send(events.BRONZE_QUEUE, events.bronze_captured(a.capture, a.sha256, a.region)))
+
+    silver = sub.add_parser("send-silver")
+    silver.add_argument("dataset", help="versão da tabela Silver (ex: silver_featured@v12)")
+    silver.add_argument("--rows", type=int, default=0)
+    silver.set_defaults(fn=lambda a: _send(events.SILVER_QUEUE, events.silver_published(a.dataset, a.rows)))
+
+    peek = sub.add_parser("peek")
+    peek.add_argument("queue")
+    peek.set_defaults(fn=_peek)
+
+    sub.add_parser("requeue").set_defaults(fn=_requeue)
+
+    args = ap.parse_args()
+    args.fn(args)
+
+
+if __name__ == "__main__":
+    main()
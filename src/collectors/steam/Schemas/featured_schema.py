@@ -1,5 +1,8 @@
 # src/collectors/steam/Schemas/featured_schema.py
 
+# Versão do schema Silver registrada no catálogo de partições (incrementar ao mudar os campos)
+SCHEMA_VERSION = 1
+
 SCHEMA_FEATURED_GAME = {
     # GAME_ID é CRÍTICO para a desduplicação e deve ser OBRIGATÓRIO
     "game_id": {"type": int, "required": True, "description": "ID único do jogo na Steam."},
@@ -13,6 +16,7 @@ SCHEMA_FEATURED_GAME = {
     "original_price": {"type": float, "required": False, "description": "Preço original."},
     "final_price": {"type": float, "required": False, "description": "Preço final após desconto."},
     "category": {"type": str, "required": False, "description": "Categoria da Steam (e.g., specials, top_sellers)."},
+    "region": {"type": str, "required": False, "description": "Região da captura (cc-l, e.g., br-portuguese); None na captura padrão."},
     
     # Metadados adicionados pelo pipeline (Silver) - estes são gerados, não da API
     "source": {"type": str, "required": False},
@@ -0,0 +1,102 @@
+# src/collectors/steam/Schemas/record.py
+"""
+Registro compacto de jogo, derivado do SCHEMA_FEATURED_GAME.
+
+Um dicionário com os 13 campos do schema custa ~650 bytes por jogo (tabela hash + chaves);
+uma classe com __slots__ guarda só os ponteiros dos valores, na ordem do schema. O
+registro se comporta como um mapeamento somente leitura (get, [], keys, items, dict(r)),
+então quem consome os registros do Silver (formatos de arquivo, histórico de preços,
+tabela Silver) não precisa saber se recebeu um dict ou um registro.
+"""
+import sys
+
+from .featured_schema import SCHEMA_FEATURED_GAME
+
+# Campos de baixa cardinalidade: uma única cópia de cada string na memória
+INTERNED_FIELDS = ("category", "region", "source", "endpoint")
+
+
+class _Record:
+    __slots__ = ()
+    _fields = ()
+    _index = {}
+
+    @classmethod
+    def from_columns(cls, columns: dict) -> list:
+        """Registros a partir de colunas {campo: [valores]} (ex: BatchResult.columns), na ordem do schema."""
+        n = len(next(iter(columns.values()), ()))
+        values = [columns.get(f) or [None] * n for f in cls._fields]
+        return [cls(*row) for row in zip(*values)]
+
+    @classmethod
+    def from_dict(cls, record: dict):
+        return cls(*map(record.get, cls._fields))
+
+    def __getitem__(self, key):
+        if key not in self._index:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in self._index else default
+
+    def keys(self):
+        return self._fields
+
+    def values(self):
+        return [getattr(self, f) for f in self._fields]
+
+    def items(self):
+        return [(f, getattr(self, f)) for f in self._fields]
+
+    def __iter__(self):
+        return iter(self._fields)
+
+    def __len__(self):
+        return len(self._fields)
+
+    def __contains__(self, key):
+        return key in self._index
+
+    def to_dict(self) -> dict:
+        return dict(zip(self._fields, self.values()))
+
+    def __eq__(self, other):
+        if isinstance(other, _Record):
+            return self._fields == other._fields and self.values() == other.values()
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"{type(self).__name__}({', '.join(f'{f}={getattr(self, f)!r}' for f in self._fields)})"
+
+    def __reduce__(self):
+        # Pickle compacto (ProcessPoolExecutor do Silver): só a tupla de valores
+        return type(self), tuple(self.values())
+
+
+def make_record_class(schema: dict = SCHEMA_FEATURED_GAME, key_field: str = "game_id", name: str = "GameRecord"):
+    """
+    Gera a classe de registro do schema: a chave primeiro e os demais campos na ordem do
+    schema (a mesma ordem das colunas de CompiledValidator.validate_batch).
+    """
+    fields = tuple([key_field] + [f for f in schema if f != key_field])
+    interned = [f for f in INTERNED_FIELDS if f in fields]
+    assignments = [f"    self.{f} = {f}" if f not in interned else f"    self.{f} = _intern({f}) if type({f}) is str else {f}"
+                   for f in fields]
+    source = "\n".join([f"def __init__(self, {', '.join(f'{f}=None' for f in fields)}):", *assignments]) + "\n"
+    namespace = {"_intern": sys.intern}
+    exec(compile(source, f"<record {name}>", "exec"), namespace)
+
+    return type(name, (_Record,), {
+        "__slots__": fields,
+        "__init__": namespace["__init__"],
+        "_fields": fields,
+        "_index": {f: i for i, f in enumerate(fields)},
+    })
+
+
+GameRecord = make_record_class(SCHEMA_FEATURED_GAME)
@@ -0,0 +1,297 @@
+# src/collectors/steam/Schemas/validator.py
+"""
+Validação dos registros de jogo contra o SCHEMA_FEATURED_GAME.
+
+validate_and_clean_game é a implementação de referência (interpreta o schema a cada registro).
+compile_schema gera, uma única vez, uma função Python especializada para o schema: um
+conversor em linha reta por campo, com atalhos para valores que já estão no tipo certo.
+O resultado é idêntico ao da referência, registro a registro.
+"""
+from collections import Counter, namedtuple
+from itertools import repeat
+
+from .featured_schema import SCHEMA_FEATURED_GAME
+
+PRICE_FIELDS = ("original_price", "final_price")
+
+_NoneType = type(None)
+
+# Tamanho dos blocos em que validate_batch procura valores fora do tipo esperado
+_TYPE_BLOCK = 64
+
+
+class BatchResult(namedtuple("BatchResult", ["columns", "rejected", "errors"])):
+    """
+    Resultado de validate_batch: os registros válidos em colunas {campo: [valores]},
+    o número de registros rejeitados e um Counter de erros por campo.
+    """
+
+    def __len__(self):
+        return len(next(iter(self.columns.values()), ()))
+
+    def records(self) -> list:
+        # Materializa os registros como dicionários (mesma saída de validate_and_clean_game)
+        names = list(self.columns)
+        return [dict(zip(names, row)) for row in zip(*self.columns.values())]
+
+
+def validate_and_clean_game(game: dict, schema: dict = SCHEMA_FEATURED_GAME) -> dict | None:
+    """
+    Valida e converte tipos de dados do registro do jogo usando o SCHEMA_FEATURED_GAME.
+    Retorna o jogo limpo ou None se a validação falhar.
+    """
+    cleaned_game = {}
+
+    # 1. VALIDAÇÃO CRÍTICA: Game ID deve existir e ser conversível
+    game_id = game.get("game_id")
+    if game_id is None:
+        return None
+    try:
+        cleaned_game["game_id"] = int(game_id)
+    except ValueError:
+        return None # Descartar se o ID não for um número
+
+    # 2. Conversão e Limpeza dos demais campos
+    for field, spec in schema.items():
+        if field == "game_id":
+            continue # Já validado
+
+        value = game.get(field)
+
+        try:
+            target_type = spec["type"]
+
+            if value is not None:
+                if field in ["original_price", "final_price"]:
+                    # Lógica robusta para preço: trata None, remove caracteres
+                    value = str(value).replace('R$', '').replace(',', '.').strip()
+                    cleaned_game[field] = float(value)
+                elif target_type is bool and isinstance(value, int):
+                    cleaned_game[field] = bool(value)
+                else:
+                    cleaned_game[field] = target_type(value)
+            else:
+                # Mantém o valor como None se não foi encontrado, mas pula a conversão
+                cleaned_game[field] = None
+
+        except (ValueError, TypeError):
+            # Se a conversão falhar (ex: 'abc' para float), registramos None e seguimos
+            cleaned_game[field] = None
+
+    # Garantir que todos os campos do schema estejam no dicionário, mesmo que None
+    for field in schema.keys():
+        if field not in cleaned_game:
+            cleaned_game[field] = None
+
+    return cleaned_game
+
+
+def _parse_price(value) -> float:
+    # Mesma limpeza da referência: "R$ 22,90" -> 22.9
+    return float(str(value).replace('R$', '').replace(',', '.').strip())
+
+
+def _without(values: list, drop: list) -> list:
+    # values sem as posições (crescentes) de drop, copiando os trechos entre elas
+    out = []
+    start = 0
+    for i in drop:
+        out += values[start:i]
+        start = i + 1
+    out += values[start:]
+    return out
+
+
+def _indent(lines: list, level: int = 1) -> list:
+    return ["    " * level + line for line in lines]
+
+
+def _count_error(field: str) -> str:
+    return f"if errors is not None: errors[{field!r}] += 1"
+
+
+def _converter_lines(field: str, target_type, type_name: str) -> list:
+    """
+    Linhas de código que convertem a variável local 'v' para o tipo do campo.
+    Se a conversão falhar, 'v' vira None e o erro é contado (mesmo efeito da referência).
+    """
+    fail = ["v = None", _count_error(field)]
+
+    if field in PRICE_FIELDS:
+        # float já está limpo (float(str(x)) == x); int converte direto;
+        # qualquer outro valor passa pela limpeza de string da referência.
+        return [
+            "if v is not None and type(v) is not float:",
+            "    try:",
+            "        if type(v) is int:",
+            "            try:",
+            "                v = float(v)",
+            "            except OverflowError:",
+            "                v = _parse_price(v)",
+            "        else:",
+            "            v = _parse_price(v)",
+            "    except (ValueError, TypeError):",
+            *_indent(fail, 2),
+        ]
+
+    if target_type in (str, int, float, bool):
+        # Valor já no tipo exato: a conversão seria a identidade
+        check = f" and type(v) is not {target_type.__name__}"
+        call = f"{target_type.__name__}(v)"
+    else:
+        check = ""
+        call = f"{type_name}(v)"
+
+    return [
+        f"if v is not None{check}:",
+        "    try:",
+        f"        v = {call}",
+        "    except (ValueError, TypeError):",
+        *_indent(fail, 2),
+    ]
+
+
+class CompiledValidator:
+    """
+    Validador especializado para um schema. Use compile_schema() para criá-lo.
+
+    - validate(game)            -> registro limpo ou None (igual a validate_and_clean_game)
+    - validate_batch(games)     -> BatchResult(valid, rejected, errors por campo)
+    - validate_column(f, vals)  -> lista de valores convertidos para o campo f
+    """
+
+    def __init__(self, schema: dict, key_field: str = "game_id"):
+        self.schema = schema
+        self.key_field = key_field
+        self.fields = [key_field] + [f for f in schema if f != key_field]
+        self.source = self._generate_source()
+
+        namespace = {"_parse_price": _parse_price}
+        for i, field in enumerate(self.fields):
+            namespace[f"_type_{i}"] = schema.get(field, {}).get("type", int)
+        exec(compile(self.source, f"<validator {key_field}>", "exec"), namespace)
+
+        self._validate = namespace["validate"]
+        self._column_converters = {field: namespace[f"convert_{i}"] for i, field in enumerate(self.fields)}
+
+    def _generate_source(self) -> str:
+        key = self.key_field
+        body = [
+            "get = game.get",
+            f"v = get({key!r})",
+            "if v is None:",
+            *_indent([_count_error(key), "return None"]),
+            "if type(v) is not int:",
+            "    try:",
+            "        v = int(v)",
+            "    except ValueError:",
+            *_indent([_count_error(key), "return None"], 2),
+            "c0 = v",
+        ]
+        for i, field in enumerate(self.fields[1:], start=1):
+            body.append(f"v = get({field!r})")
+            body += _converter_lines(field, self.schema[field]["type"], f"_type_{i}")
+            body.append(f"c{i} = v")
+        items = ", ".join(f"{field!r}: c{i}" for i, field in enumerate(self.fields))
+        body.append(f"return {{{items}}}")
+        lines = ["def validate(game, errors=None):", *_indent(body)]
+
+        # Conversores por coluna, para validar um campo de vários registros de uma vez.
+        # Na coluna chave, um valor inválido vira None (a linha é descartada por quem chama).
+        key_loop = [
+            "if v is not None and type(v) is not int:",
+            "    try:",
+            "        v = int(v)",
+            "    except ValueError:",
+            "        v = None",
+            "if v is None:",
+            *_indent([_count_error(key)]),
+        ]
+        for i, field in enumerate(self.fields):
+            if i == 0:
+                loop = key_loop + ["append(v)"]
+            else:
+                loop = _converter_lines(field, self.schema[field]["type"], f"_type_{i}") + ["append(v)"]
+            lines += [
+                "",
+                f"def convert_{i}(values, errors=None):",
+                *_indent(["out = []", "append = out.append", "for v in values:", *_indent(loop), "return out"]),
+            ]
+
+        return "\n".join(lines) + "\n"
+
+    def validate(self, game: dict, errors: Counter | None = None) -> dict | None:
+        return self._validate(game, errors)
+
+    def validate_batch(self, games: list, constants: dict | None = None) -> BatchResult:
+        """
+        Valida uma lista de registros coluna a coluna.
+
+        Cada campo é extraído como uma coluna; se todos os valores já estão no tipo certo
+        (caso comum), a coluna é aceita sem conversão, senão passa pelo conversor do campo.
+        constants recebe campos com o mesmo valor em todo o lote (ex: source, captured_at):
+        são validados uma única vez e sobrepõem o valor dos registros.
+        Registros com o campo chave ausente/inválido são descartados e contados em errors.
+        """
+        constants = constants or {}
+        errors = Counter()
+        n = len(games)
+        get = dict.get
+        columns = {}
+        rejected = 0
+
+        # A chave primeiro: as linhas rejeitadas saem do lote antes de extrair os outros
+        # campos (uma cópia da lista de registros, não uma por coluna), e os erros dos
+        # demais campos dessas linhas não são contados, como em validate()
+        for field in self.fields:
+            convert = self._column_converters[field]
+            if field in constants:
+                constant_errors = Counter()
+                value = convert([constants[field]], constant_errors)[0]
+                for name, count in constant_errors.items():
+                    errors[name] += count * n
+                columns[field] = [value] * n
+                bad = range(n) if value is None else ()
+            else:
+                column = list(map(get, games, repeat(field, n)))
+                expected = int if field == self.key_field else self.schema[field]["type"]
+                # None é aceito em todos os campos, exceto na chave
+                accepted = {expected} if field == self.key_field else {expected, _NoneType}
+                bad = []
+                if not accepted.issuperset(map(type, column)):
+                    # Converte apenas as posições fora do tipo esperado (raras). A coluna é
+                    # conferida em blocos (em C); só os blocos com valores inesperados são
+                    # percorridos em Python para achar as posições
+                    for start in range(0, n, _TYPE_BLOCK):
+                        block = column[start:start + _TYPE_BLOCK]
+                        if not accepted.issuperset(map(type, block)):
+                            bad += [i for i, v in enumerate(block, start) if type(v) not in accepted]
+                    for i, value in zip(bad, convert([column[i] for i in bad], errors)):
+                        column[i] = value
+                columns[field] = column
+
+            if field == self.key_field and bad:
+                # Só as posições convertidas podem ter virado None
+                keys = columns[field]
+                drop = [i for i in bad if keys[i] is None]
+                rejected = len(drop)
+                games = _without(games, drop)
+                columns[field] = _without(keys, drop)
+                n = len(games)
+
+        return BatchResult(columns, rejected, errors)
+
+    def validate_column(self, field: str, values, errors: Counter | None = None) -> list:
+        """
+        Converte uma coluna inteira. Na coluna chave, valores inválidos viram None
+        (quem chama decide descartar a linha).
+        """
+        return self._column_converters[field](values, errors)
+
+
+def compile_schema(schema: dict = SCHEMA_FEATURED_GAME, key_field: str = "game_id") -> CompiledValidator:
+    return CompiledValidator(schema, key_field)
+
+
+# Validador padrão do pipeline, compilado uma vez na importação
+FEATURED_GAME_VALIDATOR = compile_schema(SCHEMA_FEATURED_GAME)
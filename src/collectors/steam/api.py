@@ -1,24 +1,264 @@
 import os
+import json
+import time
+import random
+import threading
 import requests
 import datetime as dt
+from collections import namedtuple
+from pathlib import Path
+from requests.adapters import HTTPAdapter
+
+from src.processing import metrics
+
+try:
+    # Com brotli instalado, o urllib3 descomprime respostas "br" automaticamente
+    import brotli  # noqa: F401
+    _ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    _ACCEPT_ENCODING = "gzip, deflate"
+
+USER_AGENT = "steam-data-pipeline/1.0"
+
+# Status que valem nova tentativa (limite de taxa e falhas do servidor)
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+TransportResponse = namedtuple("TransportResponse", ["status", "headers", "body"])
+
+
+class TransportError(OSError):
+    """Falha de rede (conexão, timeout) ao falar com a API."""
+
+
+class SteamAPIError(RuntimeError):
+    """Resposta HTTP de erro da API da Steam (após esgotar as tentativas, se aplicável)."""
+
+    def __init__(self, status: int, url: str):
+        super().__init__(f"Steam API respondeu HTTP {status} para {url}")
+        self.status = status
+        self.url = url
+
+
+class RequestsTransport:
+    """
+    Transporte padrão: uma requests.Session com pool de conexões keep-alive,
+    reaproveitando TCP/TLS entre chamadas.
+
+    Qualquer objeto com send(url, params, headers, timeout) -> TransportResponse
+    pode substituí-lo (ex: um servidor falso da Steam em testes locais).
+    """
+
+    def __init__(self, pool_size: int = 10):
+        self.session = requests.Session()
+        # As novas tentativas são feitas pelo SteamCollector (com backoff), não pelo urllib3
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def send(self, url, params, headers, timeout) -> TransportResponse:
+        try:
+            r = self.session.get(url, params=params, headers=headers, timeout=timeout)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            raise TransportError(str(e)) from e
+        return TransportResponse(r.status_code, r.headers, r.content)
+
+    def close(self):
+        self.session.close()
+
+
+class SteamCollector:
+    """
+    Cliente reutilizável da API da Steam.
+
+    - Conexões reaproveitadas pelo transporte (pool).
+    - Requisições condicionais (If-None-Match / If-Modified-Since): se o conteúdo não mudou
+      desde a última captura, a API responde 304 e fetch() retorna None. Os validadores de
+      uma resposta só são guardados por remember(), depois que o chamador gravou o conteúdo.
+    - Compressão gzip (e brotli, se instalado) negociada via Accept-Encoding.
+    - Novas tentativas com backoff exponencial e jitter em 429/5xx e falhas de rede,
+      respeitando o cabeçalho Retry-After.
+
+    state_path (opcional) persiste os validadores ETag/Last-Modified entre execuções.
+    """
+
+    def __init__(self, base_url: str | None = None, transport=None, timeout=(5, 30),
+                 max_retries: int = 4, backoff_base: float = 0.5, backoff_max: float = 30.0,
+                 state_path: Path | None = None, sleep=time.sleep):
+        self.base_url = (base_url or os.getenv("STEAM_API_BASE", "https://store.steampowered.com")).rstrip("/")
+        self.transport = transport or RequestsTransport()
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.state_path = Path(state_path) if state_path else None
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._validators = self._load_validators()
+
+    # --- validadores (ETag / Last-Modified) ---------------------------------
+
+    def _load_validators(self) -> dict:
+        if not self.state_path or not self.state_path.exists():
+            return {}
+        try:
+            with self.state_path.open("r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_validators(self) -> None:
+        if not self.state_path:
+            return
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.state_path.with_suffix(self.state_path.suffix + ".tmp")
+        with tmp.open("w", encoding="utf-8") as f:
+            json.dump(self._validators, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, self.state_path)
+
+    @staticmethod
+    def _cache_key(url: str, params: dict | None) -> str:
+        return url + "?" + "&".join(f"{k}={v}" for k, v in sorted((params or {}).items()))
+
+    @staticmethod
+    def _validators_of(key: str, headers) -> dict | None:
+        etag = headers.get("ETag")
+        last_modified = headers.get("Last-Modified")
+        if not etag and not last_modified:
+            return None
+        return {"key": key, "etag": etag, "last_modified": last_modified}
+
+    def remember(self, validators: dict | None) -> None:
+        """
+        Guarda (e persiste em state_path) os validadores retornados por fetch(with_validators=True).
+        Deve ser chamado só depois que o conteúdo foi gravado: se a gravação falhar, a próxima
+        requisição não é condicional e o conteúdo é baixado de novo em vez de receber 304.
+        """
+        if not validators:
+            return
+        with self._lock:
+            self._validators[validators["key"]] = {"etag": validators["etag"],
+                                                   "last_modified": validators["last_modified"]}
+            self._save_validators()
+
+    # --- requisições --------------------------------------------------------
+
+    def _backoff(self, attempt: int, retry_after=None) -> float:
+        if retry_after:
+            try:
+                return min(float(retry_after), self.backoff_max)
+            except ValueError:
+                pass
+        # "Full jitter": espera aleatória entre 0 e base * 2^tentativa
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def fetch(self, path: str, params: dict | None = None, conditional: bool = True,
+              with_validators: bool = False):
+        """
+        Faz GET em base_url + path e retorna o JSON decodificado.
+        Retorna None se a requisição condicional indicar que nada mudou (HTTP 304).
+        Com with_validators=True retorna (payload, validadores); os validadores (None se a
+        resposta não trouxe ETag/Last-Modified) são passados a remember() após gravar o payload.
+        Levanta SteamAPIError (HTTP) ou TransportError (rede) após esgotar as tentativas.
+        """
+        url = f"{self.base_url}{path}"
+        key = self._cache_key(url, params)
+        headers = {"User-Agent": USER_AGENT, "Accept-Encoding": _ACCEPT_ENCODING}
+
+        cached = self._validators.get(key) if conditional else None
+        if cached:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        for attempt in range(self.max_retries + 1):
+            last_attempt = attempt == self.max_retries
+            start = time.perf_counter()
+            try:
+                response = self.transport.send(url, params, headers, self.timeout)
+            except TransportError:
+                metrics.observe("pipeline_http_request_duration_seconds", time.perf_counter() - start,
+                                endpoint=path, status="error")
+                if last_attempt:
+                    raise
+                self._sleep(self._backoff(attempt))
+                continue
+            metrics.observe("pipeline_http_request_duration_seconds", time.perf_counter() - start,
+                            endpoint=path, status=str(response.status))
+            metrics.count("pipeline_http_response_bytes_total", len(response.body or b""), endpoint=path)
+
+            if response.status in RETRY_STATUS and not last_attempt:
+                self._sleep(self._backoff(attempt, response.headers.get("Retry-After")))
+                continue
+
+            if response.status == 304:
+                return (None, None) if with_validators else None
+            if response.status >= 400:
+                raise SteamAPIError(response.status, url)
+
+            payload = json.loads(response.body)
+            if with_validators:
+                return payload, self._validators_of(key, response.headers)
+            return payload
+
+    def get_featured(self, cc: str | None = None, l: str | None = None, conditional: bool = True,
+                     with_validators: bool = False):
+        """Categorias em destaque (featuredcategories), opcionalmente para um país/idioma."""
+        params = {k: v for k, v in (("cc", cc), ("l", l)) if v}
+        return self.fetch("/api/featuredcategories", params or None, conditional=conditional,
+                          with_validators=with_validators)
+
+    def get_app_details(self, app_ids, language: str | None = None) -> dict:
+        """
+        Metadados (nome, tipo, gêneros) de vários apps: {app_id: data ou None}.
+        O appdetails só aceita vários appids com filters=price_overview, então o lote é
+        resolvido com uma requisição por app, todas pela mesma conexão do pool.
+        None indica app inexistente/indisponível na loja (success=false) ou erro HTTP 4xx.
+        """
+        details = {}
+        for app_id in app_ids:
+            params = {"appids": app_id}
+            if language:
+                params["l"] = language
+            try:
+                payload = self.fetch("/api/appdetails", params, conditional=False) or {}
+            except SteamAPIError as e:
+                if e.status >= 500 or e.status == 429:
+                    raise
+                payload = {}
+            entry = payload.get(str(app_id)) or {}
+            details[app_id] = entry.get("data") if entry.get("success") else None
+        return details
+
+    def close(self):
+        if hasattr(self.transport, "close"):
+            self.transport.close()
+
+
+_default_collector = None
+
+
+def default_collector() -> SteamCollector:
+    # Um cliente por processo: o pool de conexões é reaproveitado entre execuções da Function.
+    # STEAM_HTTP_STATE aponta o arquivo onde os validadores ETag/Last-Modified são persistidos.
+    global _default_collector
+    if _default_collector is None:
+        _default_collector = SteamCollector(state_path=os.getenv("STEAM_HTTP_STATE") or None)
+    return _default_collector
+
 
 def get_featured_games():
     """
     Captura categorias em destaque da Steam.
-    Retorna o dicionário JSON bruto da API (payload) ou levanta um erro HTTP.
+    Retorna o dicionário JSON bruto da API (payload), None se nada mudou desde a
+    última captura (HTTP 304), ou levanta um erro HTTP/de rede.
     """
-    base = os.getenv("STEAM_API_BASE", "https://store.steampowered.com")
-    url = f"{base}/api/featuredcategories"
-    headers = {"User-Agent": "steam-data-pipeline/1.0"}
-    
-    # Faz a requisição HTTP
-    # Se falhar, r.raise_for_status() levantará uma exceção clara.
-    r = requests.get(url, timeout=30, headers=headers)
-    r.raise_for_status()
-    
     # Retorna o JSON puro da API para o Bronze
-    return r.json()
+    collector = default_collector()
+    payload, validators = collector.get_featured(with_validators=True)
+    collector.remember(validators)
+    return payload
 
 def now_iso():
     # Mantendo a função, pois pode ser usada em outras partes
-    return dt.datetime.now(dt.timezone.utc).isoformat()
\ No newline at end of file
+    return dt.datetime.now(dt.timezone.utc).isoformat()
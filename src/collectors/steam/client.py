@@ -2,7 +2,7 @@
 
 # A importação relativa expõe a função de api.py, permitindo que
 # o __init__.py a acesse através do alias 'client'.
-from .api import get_featured_games
+from .api import get_featured_games, SteamCollector, RequestsTransport
 
 # Este arquivo não precisa de mais nada, apenas garantir que a função 
-# principal da API esteja acessível.
\ No newline at end of file
+# principal da API e o cliente reutilizável estejam acessíveis.
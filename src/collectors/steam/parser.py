@@ -1,22 +1,39 @@
+import json
+from pathlib import Path
+
+# Tamanho de cada leitura do arquivo Bronze no modo streaming (em caracteres)
+STREAM_CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = " \t\n\r"
+
+# Campos da API renomeados para os nomes do schema (além de id -> game_id)
+_RENAMED_FIELDS = (("name", "game_name"), ("type", "game_type"), ("discounted", "is_discounted"))
+
+
 def normalize_featured(payload: dict) -> dict:
     """
     Normaliza a estrutura dos dados de um item de jogo da Steam.
-    - Renomeia 'id' para 'game_id'.
+    - Renomeia 'id' para 'game_id' (e name/type/discounted para game_name/game_type/is_discounted).
     - Converte preços de centavos para Reais (float).
     - Remove itens que não são jogos (sem 'id' ou 'type').
     """
-    
+
     # CRITÉRIO 1: O item deve ter um 'id' para ser considerado um jogo/app
     if 'id' not in payload:
         return None
-        
+
     # CRITÉRIO 2: O item deve ter um 'type' (0 para jogo é o mais comum, outros são DLC/vídeo)
     if 'type' not in payload:
         return None
-        
+
     # CRITÉRIO 3: Se for um jogo, renomeamos o campo 'id' para 'game_id'
     payload['game_id'] = payload.pop('id')
-    
+
+    # Demais campos da API com o nome usado no SCHEMA_FEATURED_GAME
+    for api_field, schema_field in _RENAMED_FIELDS:
+        if api_field in payload:
+            payload[schema_field] = payload.pop(api_field)
+
     # CRITÉRIO 4: Converter preços de centavos (int) para float/Reais
     # A API da Steam geralmente usa centavos (ex: 2200 = R$ 22.00)
     for price_field in ['original_price', 'final_price']:
@@ -26,22 +43,163 @@ def normalize_featured(payload: dict) -> dict:
 
     return payload
 
-def parse_featured(data: dict) -> dict:
+
+def iter_categories(data: dict):
     """
-    Extrai o dicionário de cada categoria que contém a lista de 'items' (jogos).
+    Gera (category_key, category_data) para cada categoria que contém a lista de 'items'.
     A estrutura da API é {category: {id: X, name: Y, items: [...]}}.
     """
-    normalized_categories = {}
-    
     for category_key, category_data in data.items():
-        # Verifica se o valor é um dicionário e contém a chave 'items'
-        if isinstance(category_data, dict) and 'items' in category_data:
-            items_list = category_data['items']
-            
-            # Verifica se 'items' é uma lista com pelo menos um item (opcional, mas bom)
-            if isinstance(items_list, list):
-                 
-                # Retorna o dicionário da categoria
-                normalized_categories[category_key] = category_data
-                
-    return normalized_categories
\ No newline at end of file
+        # Verifica se o valor é um dicionário e contém a chave 'items' como lista
+        if isinstance(category_data, dict) and isinstance(category_data.get('items'), list):
+            yield category_key, category_data
+
+
+def parse_featured(data: dict) -> dict:
+    """
+    Extrai o dicionário de cada categoria que contém a lista de 'items' (jogos).
+    Mantido por compatibilidade: para arquivos Bronze, prefira iter_featured_games (streaming).
+    """
+    return dict(iter_categories(data))
+
+
+class _JsonStream:
+    """
+    Tokenizador JSON incremental mínimo sobre um arquivo texto.
+    Mantém em memória apenas o trecho ainda não consumido do arquivo, e decodifica
+    um valor JSON por vez com json.JSONDecoder.raw_decode.
+    """
+
+    def __init__(self, fp, chunk_size: int = STREAM_CHUNK_SIZE):
+        self._fp = fp
+        self._chunk_size = chunk_size
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+        self._decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        if self._eof:
+            return False
+        # Descarta o que já foi consumido antes de ler mais
+        if self._pos:
+            self._buf = self._buf[self._pos:]
+            self._pos = 0
+        # Lê no mínimo o tamanho atual do buffer: valores grandes crescem de forma geométrica
+        chunk = self._fp.read(max(self._chunk_size, len(self._buf)))
+        if not chunk:
+            self._eof = True
+            return False
+        self._buf += chunk
+        return True
+
+    def peek(self) -> str:
+        """Retorna o próximo caractere não branco (sem consumir) ou '' no fim do arquivo."""
+        while True:
+            buf, pos = self._buf, self._pos
+            while pos < len(buf) and buf[pos] in _WHITESPACE:
+                pos += 1
+            self._pos = pos
+            if pos < len(buf):
+                return buf[pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, chars: str) -> str:
+        ch = self.peek()
+        if not ch or ch not in chars:
+            raise ValueError(f"JSON inválido: esperado um de {chars!r}, encontrado {ch!r}")
+        self._pos += 1
+        return ch
+
+    def value(self):
+        """Decodifica e consome o próximo valor JSON completo."""
+        self.peek()
+        while True:
+            try:
+                obj, end = self._decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # Um número no fim do buffer pode continuar no próximo bloco (ex: "12" + "34")
+            if end == len(self._buf) and self._fill():
+                continue
+            self._pos = end
+            return obj
+
+
+def _stream_items(stream: _JsonStream):
+    # Gera cada elemento da lista 'items' sem materializar a lista inteira
+    stream.expect("[")
+    if stream.peek() == "]":
+        stream.expect("]")
+        return
+    while True:
+        yield stream.value()
+        if stream.expect(",]") == "]":
+            return
+
+
+def _stream_category(stream: _JsonStream, category_key):
+    stream.expect("{")
+    if stream.peek() == "}":
+        stream.expect("}")
+        return
+    while True:
+        key = stream.value()
+        stream.expect(":")
+        if key == "items" and stream.peek() == "[":
+            for item in _stream_items(stream):
+                yield category_key, item
+        else:
+            stream.value()
+        if stream.expect(",}") == "}":
+            return
+
+
+def iter_featured_items(fp, chunk_size: int = STREAM_CHUNK_SIZE):
+    """
+    Lê um payload 'featuredcategories' de forma incremental e gera (category_key, item),
+    sem carregar o arquivo inteiro. Aceita um arquivo texto aberto.
+    """
+    stream = _JsonStream(fp, chunk_size)
+    if stream.peek() != "{":
+        raise ValueError("payload Bronze não é um objeto JSON (formato de API)")
+    stream.expect("{")
+    if stream.peek() == "}":
+        return
+    while True:
+        category_key = stream.value()
+        stream.expect(":")
+        if stream.peek() == "{":
+            yield from _stream_category(stream, category_key)
+        else:
+            stream.value()
+        if stream.expect(",}") == "}":
+            return
+
+
+def iter_featured_games(source, chunk_size: int = STREAM_CHUNK_SIZE):
+    """
+    Gera (category_key, jogo_normalizado) um a um a partir de um arquivo Bronze
+    (Path, caminho ou arquivo aberto) ou de um payload já carregado (dict).
+    Itens que não são jogos (banners, spotlights) são descartados pela normalização.
+    """
+    if isinstance(source, dict):
+        items = ((key, item) for key, data in iter_categories(source) for item in data['items'])
+        for category_key, item in items:
+            game = normalize_featured(item)
+            if game:
+                yield category_key, game
+        return
+
+    if isinstance(source, (str, Path)):
+        with open(source, "r", encoding="utf-8") as fp:
+            yield from iter_featured_games(fp, chunk_size)
+        return
+
+    for category_key, item in iter_featured_items(source, chunk_size):
+        game = normalize_featured(item)
+        if game:
+            yield category_key, game
@@ -0,0 +1,129 @@
+# src/collectors/steam/regions.py
+"""
+Captura concorrente do featuredcategories para vários pares país/idioma (cc/l).
+
+As requisições rodam em threads (o SteamCollector usa requests, que é bloqueante),
+coordenadas por asyncio com:
+- um token bucket limitando a taxa de requisições (limite da Steam),
+- um semáforo limitando quantas requisições ficam abertas ao mesmo tempo.
+"""
+import asyncio
+import statistics
+import time
+from collections import namedtuple
+
+Region = namedtuple("Region", ["cc", "l"])
+
+RegionResult = namedtuple("RegionResult", ["region", "payload", "latency", "error", "validators"])
+
+
+def region_tag(region: Region) -> str:
+    # "br-portuguese"; usado no nome do arquivo Bronze e no campo 'region' dos itens
+    return f"{region.cc}-{region.l}" if region.l else region.cc
+
+
+def primary_region(spec: str) -> str | None:
+    """
+    Tag da região principal: a primeira de STEAM_REGIONS (None no modo de região única).
+    Só ela entra no Silver e no CDC; as demais regiões trazem os mesmos game_ids com
+    preços em outra moeda e alimentam um histórico de preços por região.
+    """
+    regions = parse_regions(spec)
+    return region_tag(regions[0]) if regions else None
+
+
+def parse_regions(spec: str) -> list:
+    """
+    Converte "br:portuguese,us:english,de" em [Region("br", "portuguese"), ...].
+    O idioma é opcional.
+    """
+    regions = []
+    for part in (spec or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        cc, _, lang = part.partition(":")
+        regions.append(Region(cc.strip().lower(), lang.strip().lower() or None))
+    return regions
+
+
+class TokenBucket:
+    """
+    Limitador de taxa assíncrono: até `capacity` requisições em rajada,
+    reabastecido a `rate` tokens por segundo.
+    """
+
+    def __init__(self, rate: float, capacity: float, clock=time.monotonic):
+        if rate <= 0 or capacity < 1:
+            raise ValueError("TokenBucket requer rate > 0 e capacity >= 1")
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._tokens = capacity
+        self._updated = clock()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = self._clock()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+def tag_region(payload: dict, region: Region) -> dict:
+    # Marca cada item de cada categoria com a região da captura
+    tag = region_tag(region)
+    for category_data in payload.values():
+        if isinstance(category_data, dict) and isinstance(category_data.get("items"), list):
+            for item in category_data["items"]:
+                if isinstance(item, dict):
+                    item["region"] = tag
+    return payload
+
+
+async def capture_regions(regions: list, collector, rate: float = 1.0, burst: int = 5,
+                          max_concurrency: int = 8) -> list:
+    """
+    Busca o featuredcategories de todas as regiões e retorna um RegionResult por região
+    (na mesma ordem). payload é None quando a API respondeu 304 (nada mudou) ou em erro;
+    nesse caso error traz a exceção. latency é o tempo da requisição em segundos.
+    validators (ETag/Last-Modified) só devem ir para collector.remember() depois que o
+    payload da região foi gravado.
+    """
+    bucket = TokenBucket(rate, burst)
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def _one(region: Region) -> RegionResult:
+        async with semaphore:
+            await bucket.acquire()
+            start = time.perf_counter()
+            try:
+                payload, validators = await asyncio.to_thread(
+                    collector.get_featured, region.cc, region.l, with_validators=True)
+            except Exception as e:
+                return RegionResult(region, None, time.perf_counter() - start, e, None)
+            latency = time.perf_counter() - start
+            if payload is not None:
+                payload = tag_region(payload, region)
+            return RegionResult(region, payload, latency, None, validators)
+
+    return await asyncio.gather(*(_one(region) for region in regions))
+
+
+def latency_summary(results: list) -> dict:
+    latencies = sorted(r.latency for r in results)
+    if not latencies:
+        return {"requests": 0}
+    p95_index = max(0, round(0.95 * len(latencies)) - 1)
+    return {
+        "requests": len(latencies),
+        "errors": sum(1 for r in results if r.error is not None),
+        "p50_ms": round(statistics.median(latencies) * 1000, 1),
+        "p95_ms": round(latencies[p95_index] * 1000, 1),
+        "max_ms": round(latencies[-1] * 1000, 1),
+    }
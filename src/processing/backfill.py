@@ -0,0 +1,364 @@
+# src/processing/backfill.py
+"""
+Reprocessamento histórico do Bronze em paralelo (map-reduce por game_id).
+
+    map    : as capturas do intervalo são divididas em tarefas (task_size capturas cada),
+             processadas em paralelo por process_bronze_file; cada registro vai para o
+             shard hash(game_id) % shards, num arquivo por (tarefa, shard);
+    reduce : cada shard é reduzido de forma independente, em paralelo: vence a captura
+             mais recente de cada game_id (a mesma regra do process_silver), e com
+             history=True todas as observações são gravadas também;
+    commit : (opcional) o resultado de cada shard entra na tabela Silver por MERGE. Os
+             registros do backfill e os do process_silver têm o mesmo captured_at (o horário
+             da captura Bronze): o backfill substitui os registros das mesmas capturas, e
+             registros de capturas mais recentes que o intervalo continuam valendo.
+
+Memória por worker: no map, uma captura por vez; no reduce, os jogos de um shard (mais
+um buffer de HISTORY_FLUSH_ROWS linhas de histórico). Aumentar shards reduz a memória do
+reduce; aumentar workers aumenta a vazão das duas fases.
+
+Saídas em src/processing/_backfill/<nome>/: silver/shard-NNN e gold/shard-NNN (datasets
+particionados por data de captura e categoria) e history/shard-NNN/part-KKKK. O
+enriquecimento por appdetails não é aplicado às linhas fato do backfill.
+
+Retomada: plan.json fixa as capturas e os parâmetros; uma tarefa de map só existe em
+map/task-NNNNN depois de completa (rename atômico) e cada shard reduzido tem um
+checkpoint em reduce/shard-NNN.json (com a versão da tabela, depois do commit). Rodar
+de novo com o mesmo nome pula o que já terminou.
+"""
+import datetime as dt
+import gzip
+import json
+import os
+import shutil
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+
+from src.collectors.steam.Schemas.featured_schema import SCHEMA_VERSION
+from src.collectors.steam.Schemas.record import GameRecord
+from src.processing import bronze_store
+from src.processing import formats
+from src.processing import metrics
+from src.processing import silver_table
+from src.processing import silver_transform
+from src.processing import storage as layer_storage
+from src.processing.gold import aggregator
+
+FUNCTION = "backfill"
+PLAN_NAME = "plan.json"
+
+DEFAULT_SHARDS = 16
+DEFAULT_TASK_SIZE = 8
+HISTORY_FLUSH_ROWS = 200_000
+
+# Parâmetros que precisam ser iguais para retomar um backfill
+_PLAN_PARAMS = ("start", "end", "shards", "task_size", "history", "region")
+
+
+def shard_of(game_id: int, shards: int) -> int:
+    # Hash multiplicativo (Knuth): estável entre processos e execuções e espalha ids sequenciais
+    return (((game_id * 2654435761) & 0xFFFFFFFF) >> 16) % shards
+
+
+def select_captures(captures: list, start: str | None = None, end: str | None = None) -> list:
+    """
+    Capturas com horário em [start, end] (ISO 8601, inclusivo), em ordem cronológica.
+    end é comparado como prefixo, como no catálogo: end="2025-12-11" inclui o dia inteiro.
+    """
+    selected = []
+    for capture in captures:
+        captured_at = bronze_store.capture_time(capture)
+        if start is not None and captured_at < start:
+            continue
+        if end is not None and captured_at[:len(end)] > end:
+            continue
+        selected.append((capture, captured_at))
+    return selected
+
+
+def _task_name(task: int) -> str:
+    return f"task-{task:05d}"
+
+
+def _shard_name(shard: int) -> str:
+    return f"shard-{shard:03d}"
+
+
+def _write_json(path: Path, payload) -> None:
+    # Gravação atômica: um checkpoint nunca fica pela metade
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+# --- map ----------------------------------------------------------------------
+
+def map_task(work_dir: Path, task: int, items: list, shards: int, normalized_ts: str) -> dict:
+    """
+    Processa as capturas da tarefa (lista de [seq, caminho, captured_at]) e distribui os
+    registros pelos shards: map/task-NNNNN/shard-SSS.jsonl.gz, uma linha [seq, valores...]
+    por registro (seq = posição da captura no plano, para o reduce saber qual é a mais recente).
+    """
+    final = work_dir / "map" / _task_name(task)
+    tmp = final.with_name(f".{final.name}.tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+
+    stats = Counter()
+    errors = Counter()
+    unreadable = []
+    writers = {}
+    try:
+        for seq, path, captured_at in items:
+            ok, games, file_errors, file_stats = silver_transform.process_bronze_file(
+                Path(path), normalized_ts, captured_at=captured_at)
+            stats.update(file_stats)
+            errors.update(file_errors)
+            if not ok:
+                # Leitura interrompida: os jogos parciais não entram nos shards (como no process_silver)
+                unreadable.append(path)
+                continue
+            for game_id, record in games.items():
+                shard = shard_of(game_id, shards)
+                writer = writers.get(shard)
+                if writer is None:
+                    writer = writers[shard] = gzip.open(tmp / f"{_shard_name(shard)}.jsonl.gz", "wt",
+                                                        encoding="utf-8", compresslevel=1)
+                writer.write(json.dumps([seq, *record.values()], ensure_ascii=False, separators=(",", ":")))
+                writer.write("\n")
+    finally:
+        for writer in writers.values():
+            writer.close()
+
+    result = {"task": task, "captures": len(items), "stats": dict(stats), "errors": dict(errors),
+              "unreadable": unreadable}
+    _write_json(tmp / "_stats.json", result)
+    # A tarefa só passa a existir completa
+    shutil.rmtree(final, ignore_errors=True)
+    os.replace(tmp, final)
+    return result
+
+
+# --- reduce -------------------------------------------------------------------
+
+def reduce_shard(work_dir: Path, shard: int, tasks: int, history: bool, processing_time: str) -> dict:
+    """
+    Reduz o shard: último registro de cada game_id (maior seq) em silver/shard-SSS, linhas
+    fato correspondentes em gold/shard-SSS e, com history, todas as observações em
+    history/shard-SSS (gravadas a cada HISTORY_FLUSH_ROWS linhas).
+    """
+    name = _shard_name(shard)
+    history_root = work_dir / "history" / name
+    shutil.rmtree(history_root, ignore_errors=True)
+
+    latest = {}
+    buffer = []
+    history_parts = []
+    history_rows = 0
+
+    def flush():
+        part = history_root / f"part-{len(history_parts):04d}"
+        formats.write_dataset(part, buffer, partitioning=formats.SILVER_PARTITIONING)
+        history_parts.append(part)
+
+    for task in range(tasks):
+        path = work_dir / "map" / _task_name(task) / f"{name}.jsonl.gz"
+        if not path.exists():
+            continue
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                row = json.loads(line)
+                game_id = row[1]
+                current = latest.get(game_id)
+                if current is None or row[0] >= current[0]:
+                    latest[game_id] = row
+                if history:
+                    buffer.append(GameRecord(*row[1:]))
+                    if len(buffer) >= HISTORY_FLUSH_ROWS:
+                        history_rows += len(buffer)
+                        flush()
+                        buffer = []
+    if buffer:
+        history_rows += len(buffer)
+        flush()
+
+    records = [GameRecord(*row[1:]) for row in latest.values()]
+    latest.clear()
+    outputs = {}
+    if records:
+        silver_root = work_dir / "silver" / name
+        formats.write_dataset(silver_root, records, partitioning=formats.SILVER_PARTITIONING)
+        facts = aggregator.fact_records(aggregator.build_fact_columns(
+            aggregator.columns_from_records(records), processing_time))
+        gold_root = work_dir / "gold" / name
+        formats.write_dataset(gold_root, facts, partitioning=formats.GOLD_PARTITIONING)
+        outputs = {"silver": str(silver_root.relative_to(work_dir)), "gold": str(gold_root.relative_to(work_dir))}
+    if history_parts:
+        outputs["history"] = str(history_root.relative_to(work_dir))
+
+    checkpoint = {"shard": shard, "games": len(records), "history_rows": history_rows,
+                  "outputs": outputs, "version": None}
+    _write_json(work_dir / "reduce" / f"{name}.json", checkpoint)
+    return checkpoint
+
+
+# --- orquestração -------------------------------------------------------------
+
+def _load_plan(work_dir: Path, params: dict, captures: list) -> dict:
+    path = work_dir / PLAN_NAME
+    if path.exists():
+        plan = json.loads(path.read_text(encoding="utf-8"))
+        changed = [k for k in _PLAN_PARAMS if plan["params"].get(k) != params.get(k)]
+        if changed:
+            raise ValueError(f"backfill {work_dir.name} já existe com outros parâmetros ({', '.join(changed)}); "
+                             "use outro nome")
+        return plan
+
+    work_dir.mkdir(parents=True, exist_ok=True)
+    plan = {
+        "params": params,
+        "created_at": dt.datetime.now(dt.timezone.utc).isoformat(),
+        "captures": [{"name": c.name, "key": key, "captured_at": captured_at} for c, key, captured_at in captures],
+    }
+    _write_json(path, plan)
+    return plan
+
+
+def _run_parallel(workers: int, jobs: list, submit, on_done) -> None:
+    # No máximo 2 * workers tarefas em voo: as entradas de cada uma são preparadas só quando ela é enviada
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = set()
+        jobs = iter(jobs)
+        while True:
+            for job in jobs:
+                pending.add(submit(executor, job))
+                if len(pending) >= 2 * workers:
+                    break
+            if not pending:
+                return
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                on_done(future.result())
+
+
+def run(store, start: str | None = None, end: str | None = None, shards: int = DEFAULT_SHARDS,
+        workers: int | None = None, task_size: int = DEFAULT_TASK_SIZE, history: bool = False,
+        commit: bool = False, name: str | None = None, region: str | None = None) -> dict:
+    """
+    Backfill das capturas Bronze em [start, end]. Retorna um resumo (capturas, registros,
+    jogos por shard, versões gravadas na tabela Silver com commit=True).
+    region: a região principal (regions.primary_region), como no process_silver: capturas
+    de outras regiões ficam de fora.
+    """
+    workers = workers or os.cpu_count() or 1
+    name = name or f"{start or 'inicio'}_{end or 'fim'}".replace(":", "").replace("+", "")
+    work_dir = store.local_path(f"{layer_storage.BACKFILL}/{name}")
+    params = {"start": start, "end": end, "shards": shards, "task_size": task_size, "history": history,
+              "region": region}
+
+    metrics.reset_peak_memory()
+    try:
+        with metrics.span(FUNCTION, "plan"):
+            if (work_dir / PLAN_NAME).exists():
+                plan = _load_plan(work_dir, params, [])
+            else:
+                store.fetch(f"{layer_storage.BRONZE}/{bronze_store.INDEX_NAME}", mutable=True)
+                store.fetch_many(store.list(f"{layer_storage.BRONZE}/raw_featured_"))
+                bronze_dir = store.local_path(layer_storage.BRONZE)
+                bronze_dir.mkdir(parents=True, exist_ok=True)
+                selected = select_captures([c for c in bronze_store.list_captures(bronze_dir)
+                                            if bronze_store.in_region(c, region)], start, end)
+                plan = _load_plan(work_dir, params, [(c, store.key(c.path), t) for c, t in selected])
+
+        captures = plan["captures"]
+        tasks = [list(range(i, min(i + task_size, len(captures)))) for i in range(0, len(captures), task_size)]
+        print(f"[backfill] {name}: {len(captures)} capturas, {len(tasks)} tarefas, {shards} shards, {workers} workers")
+
+        summary = {"name": name, "captures": len(captures), "stats": Counter(), "errors": Counter(),
+                   "unreadable": [], "shards": {}, "versions": []}
+
+        def collect(result):
+            summary["stats"].update(result["stats"])
+            summary["errors"].update(result["errors"])
+            summary["unreadable"].extend(result["unreadable"])
+
+        # Map: tarefas já concluídas (diretório publicado) são só contabilizadas
+        todo = []
+        for task in range(len(tasks)):
+            done = work_dir / "map" / _task_name(task) / "_stats.json"
+            if done.exists():
+                collect(json.loads(done.read_text(encoding="utf-8")))
+            else:
+                todo.append(task)
+        if len(todo) < len(tasks):
+            print(f"[backfill] map: {len(tasks) - len(todo)} tarefas já concluídas")
+
+        def submit_map(executor, task):
+            keys = [captures[seq]["key"] for seq in tasks[task]]
+            store.fetch_many(keys)
+            items = [[seq, str(store.local_path(captures[seq]["key"])), captures[seq]["captured_at"]]
+                     for seq in tasks[task]]
+            return executor.submit(map_task, work_dir, task, items, shards, plan["created_at"])
+
+        with metrics.span(FUNCTION, "map"):
+            _run_parallel(workers, todo, submit_map, collect)
+
+        # Reduce: um shard por tarefa; checkpoints existentes são reaproveitados
+        todo = []
+        for shard in range(shards):
+            path = work_dir / "reduce" / f"{_shard_name(shard)}.json"
+            if path.exists():
+                summary["shards"][shard] = json.loads(path.read_text(encoding="utf-8"))
+            else:
+                todo.append(shard)
+        (work_dir / "reduce").mkdir(parents=True, exist_ok=True)
+
+        def publish(checkpoint):
+            summary["shards"][checkpoint["shard"]] = checkpoint
+            for output in checkpoint["outputs"].values():
+                store.put_tree(store.key(work_dir / output))
+            print(f"[backfill] shard {checkpoint['shard']}: {checkpoint['games']} jogos, "
+                  f"{checkpoint['history_rows']} linhas de histórico")
+
+        with metrics.span(FUNCTION, "reduce"):
+            _run_parallel(workers, todo,
+                          lambda executor, shard: executor.submit(reduce_shard, work_dir, shard, len(tasks),
+                                                                  history, plan["created_at"]),
+                          publish)
+
+        if commit:
+            with metrics.span(FUNCTION, "commit"):
+                _commit_shards(store, work_dir, name, summary)
+
+        games = sum(c["games"] for c in summary["shards"].values())
+        metrics.count("pipeline_records_in_total", summary["stats"]["records"], function=FUNCTION)
+        metrics.count("pipeline_records_out_total", games, function=FUNCTION)
+        metrics.count("pipeline_bytes_read_total", summary["stats"]["bytes"], function=FUNCTION)
+        print(f"[backfill] {summary['stats']['records']} registros lidos, {games} jogos únicos")
+        if summary["unreadable"]:
+            print(f"[backfill] {len(summary['unreadable'])} capturas ilegíveis: {summary['unreadable'][:5]}")
+        summary["games"] = games
+        return summary
+    finally:
+        metrics.export(FUNCTION)
+
+
+def _commit_shards(store, work_dir: Path, name: str, summary: dict) -> None:
+    """
+    MERGE de cada shard na tabela Silver, um commit por shard (os game_ids dos shards não
+    se repetem). A versão fica no checkpoint do shard; se o processo cair entre o commit e
+    o checkpoint, o shard é gravado de novo na retomada, e a leitura da tabela resolve a
+    duplicata (mesmo game_id e captured_at).
+    """
+    table = silver_table.SilverTable(store.local_path(layer_storage.SILVER_TABLE), store)
+    for shard, checkpoint in sorted(summary["shards"].items()):
+        if checkpoint["version"] is not None or "silver" not in checkpoint["outputs"]:
+            continue
+        records = formats.read_dataset(work_dir / checkpoint["outputs"]["silver"])
+        commit = table.merge(records, schema_version=SCHEMA_VERSION, backfill=name)
+        checkpoint["version"] = commit["version"]
+        _write_json(work_dir / "reduce" / f"{_shard_name(shard)}.json", checkpoint)
+        summary["versions"].append(commit["version"])
+        print(f"[backfill] shard {shard}: {silver_table.version_name(commit['version'])} "
+              f"({commit['rows']} registros)")
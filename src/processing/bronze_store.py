@@ -0,0 +1,198 @@
+# src/processing/bronze_store.py
+"""
+Armazenamento endereçado por conteúdo da camada Bronze.
+
+Cada payload da API é serializado de forma compacta, e o SHA-256 desses bytes é a chave
+do objeto: objects/<2 primeiros caracteres>/<hash>.json.zst (ou .json.gz sem zstandard).
+Um índice só de anexação (_index.jsonl) liga cada captura (nome + timestamp) ao hash.
+Capturas idênticas à anterior não gravam um novo objeto, apenas uma linha no índice.
+
+Os arquivos raw_featured_*.json gravados antes deste formato continuam sendo lidos.
+"""
+import datetime as dt
+import gzip
+import hashlib
+import io
+import json
+import os
+from collections import namedtuple
+from pathlib import Path
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+INDEX_NAME = "_index.jsonl"
+OBJECTS_DIR = "objects"
+
+# name: identificador da captura (raw_featured_<ts>[_<região>]), usado pelo manifesto do Silver
+# sha256: hash do payload (None para arquivos antigos, ainda não endereçados por conteúdo)
+Capture = namedtuple("Capture", ["name", "path", "sha256", "region", "captured_at"])
+
+
+def _codec():
+    return ("zst", zstandard.ZstdCompressor(level=10).compress) if zstandard else ("gz", _gzip)
+
+
+def _gzip(data: bytes) -> bytes:
+    # mtime=0: o mesmo conteúdo gera sempre os mesmos bytes
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def serialize_payload(payload: dict) -> bytes:
+    # Compacto e sem reordenar chaves: a ordem das categorias importa para o Silver
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _object_path(root: Path, digest: str, ext: str) -> Path:
+    return root / OBJECTS_DIR / digest[:2] / f"{digest}.json.{ext}"
+
+
+def find_object(root: Path, digest: str) -> Path | None:
+    for ext in ("zst", "gz"):
+        path = _object_path(root, digest, ext)
+        if path.exists():
+            return path
+    return None
+
+
+def put_capture(root: Path, payload: dict, name: str, region: str | None = None,
+                captured_at: str | None = None) -> tuple:
+    """
+    Grava uma captura. Retorna (sha256, novo_objeto): novo_objeto é False quando
+    o mesmo conteúdo já estava armazenado e só o índice foi atualizado.
+    """
+    raw = serialize_payload(payload)
+    digest = hashlib.sha256(raw).hexdigest()
+
+    obj = find_object(root, digest)
+    is_new = obj is None
+    if is_new:
+        ext, compress = _codec()
+        obj = _object_path(root, digest, ext)
+        obj.parent.mkdir(parents=True, exist_ok=True)
+        tmp = obj.with_name(obj.name + ".tmp")
+        tmp.write_bytes(compress(raw))
+        os.replace(tmp, obj)
+
+    entry = {
+        "capture": name,
+        "captured_at": captured_at or dt.datetime.now(dt.timezone.utc).isoformat(),
+        "sha256": digest,
+        "object": obj.relative_to(root).as_posix(),
+        "region": region,
+        "bytes": len(raw),
+        "stored_bytes": obj.stat().st_size,
+    }
+    # O objeto é gravado antes do índice: uma linha do índice nunca aponta para um objeto ausente
+    with (root / INDEX_NAME).open("a", encoding="utf-8") as f:
+        f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+    return digest, is_new
+
+
+def read_index(root: Path) -> list:
+    path = root / INDEX_NAME
+    if not path.exists():
+        return []
+    entries = []
+    with path.open("r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                # Linha parcial (gravação interrompida): ignorada
+                continue
+    return entries
+
+
+def list_captures(root: Path) -> list:
+    """
+    Todas as capturas Bronze, em ordem cronológica (o nome carrega o timestamp):
+    as do índice endereçado por conteúdo e os arquivos raw_featured_*.json antigos.
+    """
+    captures = [
+        Capture(e["capture"], root / e["object"], e["sha256"], e.get("region"), e.get("captured_at"))
+        for e in read_index(root)
+    ]
+    captures += [Capture(p.stem, p, None, None, None) for p in root.glob("raw_featured_*.json")]
+    return sorted(captures, key=lambda c: c.name)
+
+
+def in_region(capture: Capture, region: str | None) -> bool:
+    # Capturas sem região (modo de região única, arquivos antigos) e as da região pedida
+    return capture.region is None or capture.region == region
+
+
+def capture_batch(name: str) -> str:
+    # "raw_featured_20251211_120000_br-portuguese" -> "20251211_120000" (capturas da mesma execução)
+    return name[len("raw_featured_"):][:15]
+
+
+def capture_batches(captures: list) -> list:
+    """Horários de captura de cada execução ({captured_at}, um conjunto por capture_batch), em ordem cronológica."""
+    batches = {}
+    for capture in captures:
+        batches.setdefault(capture_batch(capture.name), set()).add(capture_time(capture))
+    return [batches[batch] for batch in sorted(batches)]
+
+
+def capture_time(capture: Capture) -> str:
+    """
+    Horário da captura: o do índice ou, para arquivos antigos, o timestamp do nome
+    (com o mtime do arquivo como último recurso, se o nome não tiver um timestamp válido).
+    Sempre em UTC com o offset explícito (+00:00): os valores são comparados como texto.
+    """
+    if capture.captured_at:
+        return capture.captured_at
+    try:
+        # O timestamp do nome é UTC (horário do Azure Functions)
+        ts = dt.datetime.strptime(capture_batch(capture.name), "%Y%m%d_%H%M%S")
+        return ts.replace(tzinfo=dt.timezone.utc).isoformat()
+    except ValueError:
+        return dt.datetime.fromtimestamp(capture.path.stat().st_mtime, dt.timezone.utc).isoformat()
+
+
+def repeated_captures(captures: list) -> set:
+    """
+    Nomes das capturas que repetem exatamente a execução anterior (mesmos hashes, na mesma
+    ordem). Reaplicar um bloco idêntico logo em seguida não muda o estado desduplicado do
+    Silver (a última ocorrência de cada game_id é a mesma), então essas capturas podem ser
+    marcadas como processadas sem serem lidas. Arquivos antigos (sem hash) nunca entram.
+    """
+    batches = {}
+    for capture in captures:
+        batches.setdefault(capture_batch(capture.name), []).append(capture)
+
+    repeated = set()
+    previous = None
+    for batch in batches.values():
+        hashes = [c.sha256 for c in batch]
+        if previous is not None and None not in hashes and hashes == previous:
+            repeated.update(c.name for c in batch)
+        previous = hashes
+    return repeated
+
+
+def open_text(path: Path):
+    """Abre um objeto Bronze (.json, .json.gz ou .json.zst) como texto, para leitura em streaming."""
+    name = path.name
+    if name.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8")
+    if name.endswith(".zst"):
+        if zstandard is None:
+            raise RuntimeError(f"{name} requer o pacote zstandard")
+        raw = zstandard.ZstdDecompressor().stream_reader(path.open("rb"), closefd=True)
+        return io.TextIOWrapper(raw, encoding="utf-8")
+    return path.open("r", encoding="utf-8")
+
+
+def load_payload(path: Path) -> dict:
+    with open_text(path) as f:
+        return json.load(f)
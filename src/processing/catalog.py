@@ -0,0 +1,166 @@
+# src/processing/catalog.py
+"""
+Catálogo de partições das camadas Silver e Gold (SQLite).
+
+Cada dataset gravado (silver_featured_<ts>, gold_featured_facts_<ts>, ...) é registrado
+numa única transação, junto com as suas partições: caminho do arquivo, intervalo de
+tempo coberto (mín./máx. do campo de data), quantidade de linhas e versão do schema.
+
+Com isso o process_gold encontra o Silver mais recente com uma consulta indexada, sem
+listar diretórios nem depender do ctime, e pode selecionar as partições de qualquer
+intervalo de tempo.
+"""
+import datetime as dt
+import os
+import sqlite3
+from collections import namedtuple
+from pathlib import Path
+
+from src.processing import formats
+
+Dataset = namedtuple("Dataset", ["id", "layer", "name", "path", "min_time", "max_time",
+                                 "row_count", "schema_version", "created_at"])
+Partition = namedtuple("Partition", ["dataset_id", "partition", "path", "min_time", "max_time", "row_count"])
+
+
+class Catalog:
+    """
+    Catálogo transacional de datasets e partições.
+
+    Os caminhos são guardados relativos a base_dir (raiz do projeto), para que o
+    catálogo continue válido se o projeto for copiado/restaurado em outro lugar.
+    """
+
+    def __init__(self, path: Path, base_dir: Path):
+        self.path = Path(path)
+        self.base_dir = Path(base_dir)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path))
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS datasets ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " layer TEXT NOT NULL,"
+                " name TEXT NOT NULL,"
+                " path TEXT NOT NULL,"
+                " min_time TEXT,"
+                " max_time TEXT,"
+                " row_count INTEGER NOT NULL,"
+                " schema_version INTEGER NOT NULL,"
+                " created_at TEXT NOT NULL,"
+                " UNIQUE (layer, name))"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS partitions ("
+                " dataset_id INTEGER NOT NULL REFERENCES datasets(id) ON DELETE CASCADE,"
+                " partition TEXT NOT NULL,"
+                " path TEXT NOT NULL,"
+                " min_time TEXT,"
+                " max_time TEXT,"
+                " row_count INTEGER NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS ix_datasets_layer ON datasets(layer, id)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS ix_partitions_time ON partitions(dataset_id, min_time, max_time)")
+
+    # --- escrita --------------------------------------------------------------
+
+    def _relative(self, path: Path) -> str:
+        return Path(os.path.relpath(path, self.base_dir)).as_posix()
+
+    def register_dataset(self, layer: str, root: Path, records: list, written: list,
+                         partitioning, time_field: str, schema_version: int) -> int:
+        """
+        Registra um dataset recém-gravado por formats.write_dataset (written = arquivos gravados).
+        As estatísticas por partição são calculadas a partir dos mesmos registros gravados.
+        Regravar um dataset com o mesmo nome substitui o registro anterior.
+        Retorna o id do dataset.
+        """
+        if root.is_file():
+            # Arquivo .json do formato antigo: o arquivo inteiro é uma única "partição"
+            partitioning = ()
+            files = {self._relative(root): root}
+        else:
+            files = {self._relative(f.parent): f for f in written}
+
+        stats = {}
+        for record in records:
+            key = formats.partition_dir(partitioning, record)
+            value = record.get(time_field)
+            entry = stats.setdefault(key, [None, None, 0])
+            if value is not None:
+                entry[0] = value if entry[0] is None else min(entry[0], value)
+                entry[1] = value if entry[1] is None else max(entry[1], value)
+            entry[2] += 1
+
+        partitions = []
+        for key, (min_time, max_time, count) in stats.items():
+            part_path = files[self._relative(root / key)]
+            partitions.append((key, self._relative(part_path), min_time, max_time, count))
+
+        root_rel = self._relative(root)
+        times = [p[2] for p in partitions if p[2] is not None] + [p[3] for p in partitions if p[3] is not None]
+        created_at = dt.datetime.now(dt.timezone.utc).isoformat()
+
+        # Dataset + partições numa única transação: o catálogo nunca fica pela metade
+        with self._conn:
+            self._conn.execute("DELETE FROM datasets WHERE layer = ? AND name = ?", (layer, root.name))
+            cur = self._conn.execute(
+                "INSERT INTO datasets (layer, name, path, min_time, max_time, row_count, schema_version, created_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (layer, root.name, root_rel, min(times, default=None), max(times, default=None),
+                 len(records), schema_version, created_at),
+            )
+            dataset_id = cur.lastrowid
+            self._conn.executemany(
+                "INSERT INTO partitions (dataset_id, partition, path, min_time, max_time, row_count)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                [(dataset_id, *p) for p in partitions],
+            )
+        return dataset_id
+
+    def register_existing(self, layer: str, root: Path, partitioning, time_field: str,
+                          schema_version: int) -> int:
+        """Registra um dataset gravado antes do catálogo (lê os registros para calcular as estatísticas)."""
+        records = formats.read_dataset(root)
+        written = [root] if root.is_file() else formats.list_dataset_files(root)
+        return self.register_dataset(layer, root, records, written, partitioning, time_field, schema_version)
+
+    # --- consultas ------------------------------------------------------------
+
+    def latest_dataset(self, layer: str) -> Dataset | None:
+        """Dataset mais recente da camada (consulta pelo índice (layer, id), sem listar diretórios)."""
+        row = self._conn.execute(
+            f"SELECT {', '.join(Dataset._fields)} FROM datasets WHERE layer = ? ORDER BY id DESC LIMIT 1",
+            (layer,),
+        ).fetchone()
+        return Dataset(*row) if row else None
+
+    def datasets(self, layer: str) -> list:
+        rows = self._conn.execute(
+            f"SELECT {', '.join(Dataset._fields)} FROM datasets WHERE layer = ? ORDER BY id", (layer,))
+        return [Dataset(*row) for row in rows]
+
+    def partitions(self, dataset_id: int, start: str | None = None, end: str | None = None) -> list:
+        """
+        Partições do dataset cujo intervalo de tempo cruza [start, end] (ISO 8601, inclusivo).
+        end é comparado como prefixo: end="2025-12-11" inclui o dia inteiro.
+        Partições sem data (min_time nulo) só entram quando nenhum limite é informado.
+        """
+        sql = f"SELECT {', '.join(Partition._fields)} FROM partitions WHERE dataset_id = ?"
+        params = [dataset_id]
+        if start is not None:
+            sql += " AND max_time >= ?"
+            params.append(start)
+        if end is not None:
+            sql += " AND substr(min_time, 1, length(?)) <= ?"
+            params += [end, end]
+        rows = self._conn.execute(sql + " ORDER BY partition", params)
+        return [Partition(*row) for row in rows]
+
+    def resolve(self, relative_path: str) -> Path:
+        return self.base_dir / relative_path
+
+    def close(self):
+        self._conn.close()
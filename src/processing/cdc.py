@@ -0,0 +1,101 @@
+# src/processing/cdc.py
+"""
+Captura de mudanças (CDC) entre snapshots do Silver, por game_id.
+
+O estado guardado é o da última execução do Gold: para cada jogo em destaque, os campos
+acompanhados (preço, desconto, categoria). Cada novo snapshot é comparado com esse estado:
+
+- insert: jogo que entrou na lista de destaques;
+- update: jogo que continua na lista, com algum campo acompanhado diferente;
+- delete: jogo que saiu da lista (não aparece na captura mais recente).
+
+Jogos sem mudança não geram evento, então a saída do Gold fica proporcional às mudanças
+reais, e não à frequência de captura.
+"""
+import json
+import os
+from pathlib import Path
+
+INSERT = "insert"
+UPDATE = "update"
+DELETE = "delete"
+
+# Campos cuja mudança gera um evento de update
+TRACKED_FIELDS = ("final_price", "original_price", "discount_percent", "is_discounted", "category")
+
+
+def latest_capture(records: list, batches: list | None = None, time_field: str = "captured_at") -> list:
+    """
+    Registros vistos na captura mais recente do snapshot. O Silver acumula todos os jogos
+    já vistos; os que não foram recapturados na última execução saíram dos destaques.
+
+    batches: horários de captura de cada execução do Bronze, em ordem cronológica
+    (bronze_store.capture_batches). Vale a execução mais recente que já chegou ao Silver;
+    uma execução idêntica à anterior (não relida pelo process_silver) ou ainda não
+    processada não aparece nos registros, e a anterior continua valendo. Sem batches, ou
+    se nenhuma execução aparece (Silver gravado com o horário de processamento), vale o
+    maior captured_at.
+    """
+    if batches:
+        seen = {r.get(time_field) for r in records}
+        for times in reversed(batches):
+            if not times.isdisjoint(seen):
+                return [r for r in records if r.get(time_field) in times]
+    latest = max((r.get(time_field) for r in records if r.get(time_field)), default=None)
+    return [r for r in records if r.get(time_field) == latest]
+
+
+def snapshot_state(records: list, fields=TRACKED_FIELDS) -> dict:
+    """{game_id: {campo acompanhado: valor}} dos registros (o que é comparado na próxima execução)."""
+    return {r["game_id"]: {f: r.get(f) for f in fields} for r in records if r.get("game_id") is not None}
+
+
+def _event(op: str, game_id: int, values: dict, previous: dict | None, changed: list, fields) -> dict:
+    event = {"op": op, "game_id": game_id, "changed_fields": ",".join(changed)}
+    event.update((f, values.get(f)) for f in fields)
+    event.update((f"previous_{f}", (previous or {}).get(f)) for f in fields)
+    return event
+
+
+def diff_snapshots(previous: dict, current: dict, fields=TRACKED_FIELDS) -> list:
+    """
+    Compara dois estados {game_id: {campo: valor}} e retorna os eventos de mudança:
+    inserts/updates na ordem de current, seguidos dos deletes na ordem de previous.
+    Para delete, os valores são os últimos conhecidos (iguais a previous_*).
+    """
+    events = []
+    for game_id, values in current.items():
+        old = previous.get(game_id)
+        if old is None:
+            events.append(_event(INSERT, game_id, values, None, list(fields), fields))
+            continue
+        changed = [f for f in fields if old.get(f) != values.get(f)]
+        if changed:
+            events.append(_event(UPDATE, game_id, values, old, changed, fields))
+
+    for game_id, old in previous.items():
+        if game_id not in current:
+            events.append(_event(DELETE, game_id, old, old, [], fields))
+    return events
+
+
+def load_state(path: Path) -> dict:
+    """Estado da última execução ({} se ainda não existir ou estiver corrompido)."""
+    if not path.exists():
+        return {}
+    try:
+        with path.open("r", encoding="utf-8") as f:
+            raw = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    # Chaves JSON são strings; os game_ids do Silver são inteiros
+    return {int(game_id): values for game_id, values in raw.get("games", {}).items()}
+
+
+def save_state(path: Path, state: dict, processed_at: str) -> None:
+    # Gravação atômica, como o manifesto de ingestão: só depois que o Gold foi gravado
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with tmp.open("w", encoding="utf-8") as f:
+        json.dump({"processed_at": processed_at, "games": state}, f, ensure_ascii=False)
+    os.replace(tmp, path)
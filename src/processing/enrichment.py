@@ -0,0 +1,148 @@
+# src/processing/enrichment.py
+"""
+Enriquecimento Silver -> Gold com metadados dos apps (nome, tipo, gêneros).
+
+Os metadados vêm do endpoint appdetails da Steam e ficam num cache persistente em
+SQLite, chaveado por game_id, com validade (TTL) e limite de tamanho (despejo LRU).
+Só os game_ids ausentes ou vencidos no cache são buscados na API, em lote; depois do
+aquecimento, uma execução típica não faz nenhuma chamada de rede.
+"""
+import json
+import sqlite3
+import time
+from pathlib import Path
+
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+DEFAULT_MAX_ENTRIES = 200_000
+
+# Tipo do appdetails ("game", "dlc") -> código usado em game_type no schema
+APP_TYPE_CODES = {"game": 0, "dlc": 1}
+
+
+class AppMetadataCache:
+    """
+    Cache em disco de metadados por game_id.
+
+    get_many() devolve apenas entradas dentro do TTL e atualiza o último acesso;
+    put_many() grava/atualiza entradas e despeja as menos usadas recentemente quando o
+    cache passa de max_entries. Apps inexistentes na loja também são guardados
+    (metadados None), para não serem buscados de novo a cada execução.
+    """
+
+    def __init__(self, path: Path, ttl_seconds: float = DEFAULT_TTL_SECONDS,
+                 max_entries: int = DEFAULT_MAX_ENTRIES, clock=time.time):
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._clock = clock
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path))
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS app_metadata ("
+            " game_id INTEGER PRIMARY KEY,"
+            " metadata TEXT,"
+            " fetched_at REAL NOT NULL,"
+            " last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_app_metadata_last_access ON app_metadata(last_access)")
+        self._conn.commit()
+
+    def get_many(self, game_ids) -> dict:
+        """{game_id: metadados (dict) ou None} para os ids presentes e dentro do TTL."""
+        ids = list(dict.fromkeys(game_ids))
+        now = self._clock()
+        min_fetched_at = now - self.ttl_seconds
+        found = {}
+        # Consulta em blocos para respeitar o limite de parâmetros do SQLite
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            marks = ",".join("?" * len(chunk))
+            rows = self._conn.execute(
+                f"SELECT game_id, metadata FROM app_metadata WHERE fetched_at >= ? AND game_id IN ({marks})",
+                [min_fetched_at, *chunk],
+            )
+            for game_id, metadata in rows:
+                found[game_id] = json.loads(metadata) if metadata else None
+        if found:
+            self._conn.executemany(
+                "UPDATE app_metadata SET last_access = ? WHERE game_id = ?",
+                [(now, game_id) for game_id in found],
+            )
+            self._conn.commit()
+        return found
+
+    def put_many(self, entries: dict) -> None:
+        now = self._clock()
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO app_metadata (game_id, metadata, fetched_at, last_access) VALUES (?, ?, ?, ?)",
+            [(game_id, json.dumps(meta, ensure_ascii=False) if meta is not None else None, now, now)
+             for game_id, meta in entries.items()],
+        )
+        self._evict()
+        self._conn.commit()
+
+    def _evict(self) -> None:
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM app_metadata").fetchone()
+        excess = count - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM app_metadata WHERE game_id IN "
+                "(SELECT game_id FROM app_metadata ORDER BY last_access ASC LIMIT ?)",
+                (excess,),
+            )
+
+    def __len__(self):
+        return self._conn.execute("SELECT COUNT(*) FROM app_metadata").fetchone()[0]
+
+    def close(self):
+        self._conn.close()
+
+
+def _metadata_from_app_details(data: dict | None) -> dict | None:
+    # Guarda só o que o Gold usa, para manter o cache pequeno
+    if not data:
+        return None
+    return {
+        "name": data.get("name"),
+        "type": data.get("type"),
+        "genres": [g.get("description") for g in data.get("genres", []) if g.get("description")],
+    }
+
+
+def enrich_records(records: list, cache: AppMetadataCache, collector=None, max_fetch: int = 100) -> dict:
+    """
+    Preenche game_name, game_type, is_discounted e genres dos registros (in place).
+
+    Valores que já vieram do featuredcategories são mantidos; o cache completa o que falta.
+    Com collector, até max_fetch game_ids ausentes do cache são buscados no appdetails
+    (o restante fica para a próxima execução). Retorna estatísticas da etapa.
+    """
+    game_ids = [r["game_id"] for r in records if r.get("game_id") is not None]
+    metadata = cache.get_many(game_ids)
+    misses = [game_id for game_id in dict.fromkeys(game_ids) if game_id not in metadata]
+    hits = len(metadata)
+
+    fetched = {}
+    if collector is not None and misses and max_fetch > 0:
+        details = collector.get_app_details(misses[:max_fetch])
+        fetched = {game_id: _metadata_from_app_details(data) for game_id, data in details.items()}
+        cache.put_many(fetched)
+        metadata.update(fetched)
+
+    for record in records:
+        meta = metadata.get(record.get("game_id")) or {}
+        if record.get("game_name") is None:
+            record["game_name"] = meta.get("name")
+        if record.get("game_type") is None:
+            record["game_type"] = APP_TYPE_CODES.get(meta.get("type"))
+        if record.get("is_discounted") is None and record.get("discount_percent") is not None:
+            record["is_discounted"] = record["discount_percent"] > 0
+        record["genres"] = meta.get("genres")
+
+    return {
+        "records": len(records),
+        "cache_hits": hits,
+        "cache_misses": len(misses),
+        "fetched": len(fetched),
+    }
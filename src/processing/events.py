@@ -0,0 +1,90 @@
+# src/processing/events.py
+"""
+Mensagens de fila que encadeiam as etapas do pipeline.
+
+    capture_daily --(bronze-captured)--> process_silver --(silver-published)--> process_gold
+
+Cada etapa publica o objeto exato que produziu (a captura Bronze, o dataset Silver).
+O processamento é idempotente: uma mensagem repetida (reentrega da fila) encontra o
+objeto já processado e não produz nada. Mensagens que falham maxDequeueCount vezes
+(host.json) vão para <fila>-poison, cujas funções registram o conteúdo em
+src/processing/_dead_letters/ (pelo armazenamento das camadas, um objeto por mensagem)
+para inspeção e reenvio manual (scripts/queue_tool.py).
+"""
+import datetime as dt
+import json
+import uuid
+
+from src.processing import storage as layer_storage
+
+BRONZE_QUEUE = "bronze-captured"
+SILVER_QUEUE = "silver-published"
+POISON_SUFFIX = "-poison"
+
+MESSAGE_VERSION = 1
+
+
+class InvalidMessage(ValueError):
+    """Mensagem que nunca vai ser processada com sucesso (JSON inválido, tipo desconhecido)."""
+
+
+def _message(kind: str, **fields) -> str:
+    return json.dumps({"type": kind, "version": MESSAGE_VERSION, **fields}, ensure_ascii=False)
+
+
+def bronze_captured(capture: str, sha256: str, region: str | None = None) -> str:
+    return _message(BRONZE_QUEUE, capture=capture, sha256=sha256, region=region)
+
+
+def silver_published(dataset: str, rows: int) -> str:
+    return _message(SILVER_QUEUE, dataset=dataset, rows=rows)
+
+
+def parse(body, expected: str) -> dict:
+    """Decodifica o corpo da mensagem; levanta InvalidMessage se não for do tipo esperado."""
+    if isinstance(body, bytes):
+        body = body.decode("utf-8", errors="replace")
+    try:
+        message = json.loads(body)
+    except ValueError as e:
+        raise InvalidMessage(f"mensagem não é JSON: {body[:200]!r}") from e
+    if not isinstance(message, dict) or message.get("type") != expected:
+        raise InvalidMessage(f"tipo de mensagem inesperado (esperado {expected}): {body[:200]!r}")
+    return message
+
+
+def record_dead_letter(store, queue: str, body, dequeue_count=None, reason: str | None = None,
+                       message_id: str | None = None) -> str:
+    """
+    Grava a mensagem descartada como um objeto JSON próprio em DEAD_LETTERS e retorna a chave.
+    Um objeto por mensagem: instâncias diferentes nunca disputam o mesmo arquivo, e a mesma
+    mensagem (message_id) entregue de novo não gera uma segunda entrada.
+    """
+    if isinstance(body, bytes):
+        body = body.decode("utf-8", errors="replace")
+    now = dt.datetime.now(dt.timezone.utc)
+    entry = {
+        "queue": queue,
+        "body": body,
+        "dequeue_count": dequeue_count,
+        "reason": reason,
+        "recorded_at": now.isoformat(),
+    }
+    key = f"{layer_storage.DEAD_LETTERS}/{queue}_{message_id or uuid.uuid4().hex}.json"
+    path = store.local_path(key)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", encoding="utf-8") as f:
+        json.dump(entry, f, ensure_ascii=False)
+    store.put(key, if_absent=True)
+    return key
+
+
+def list_dead_letters(store) -> list:
+    """[(chave, entrada)] dos dead letters registrados, do mais antigo ao mais recente."""
+    keys = store.list(f"{layer_storage.DEAD_LETTERS}/")
+    store.fetch_many(keys)
+    letters = []
+    for key in keys:
+        with store.local_path(key).open("r", encoding="utf-8") as f:
+            letters.append((key, json.load(f)))
+    return sorted(letters, key=lambda item: item[1].get("recorded_at") or "")
@@ -0,0 +1,279 @@
+# src/processing/formats.py
+"""
+Formatos de armazenamento das camadas Silver e Gold.
+
+Cada execução grava um "dataset": um diretório particionado no estilo Hive
+(ex: capture_date=2025-12-11/category=specials/part-00000.parquet), com um
+arquivo por partição. O formato do arquivo é plugável:
+
+- parquet  : colunar via pyarrow (padrão quando o pyarrow está instalado)
+- columnar : colunar em JSON compactado com gzip (sem dependências externas)
+- json     : lista de registros indentada, útil para depuração
+
+Selecione com a variável de ambiente PIPELINE_STORAGE_FORMAT.
+"""
+import gzip
+import json
+import os
+import shutil
+from pathlib import Path
+from urllib.parse import quote, unquote
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+NULL_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+
+
+def _columns(records: list, columns: list, constants: dict | None = None) -> dict:
+    # Registros (dicts ou GameRecord) -> colunas; constants: colunas com o mesmo valor em todas as linhas
+    constants = constants or {}
+    return {c: [constants[c]] * len(records) if c in constants else [r.get(c) for r in records]
+            for c in columns}
+
+
+class JsonFormat:
+    """Lista de dicionários indentada (formato antigo, legível para depuração)."""
+    name = "json"
+    extension = ".json"
+
+    def write(self, path: Path, records: list, columns: list, constants: dict | None = None) -> None:
+        constants = constants or {}
+        rows = [{c: constants[c] if c in constants else r.get(c) for c in columns} for r in records]
+        with path.open("w", encoding="utf-8") as f:
+            json.dump(rows, f, ensure_ascii=False, indent=2)
+
+    def read(self, path: Path, columns=None) -> list:
+        with path.open("r", encoding="utf-8") as f:
+            rows = json.load(f)
+        # Compatibilidade com o Silver antigo: {"items": [...]}
+        if isinstance(rows, dict):
+            rows = rows.get("items", [])
+        if columns is None:
+            return rows
+        return [{c: r.get(c) for c in columns} for r in rows]
+
+    def read_columns(self, path: Path, columns=None) -> dict:
+        rows = self.read(path, columns)
+        names = columns or list(dict.fromkeys(key for r in rows for key in r))
+        return {c: [r.get(c) for r in rows] for c in names}
+
+
+class ColumnarFormat:
+    """
+    Colunas em JSON compactado com gzip: {"columns": [...], "data": {coluna: [valores]}}.
+    As chaves aparecem uma única vez por arquivo em vez de uma vez por registro.
+    """
+    name = "columnar"
+    extension = ".columnar.json.gz"
+
+    def write(self, path: Path, records: list, columns: list, constants: dict | None = None) -> None:
+        data = _columns(records, columns, constants)
+        payload = json.dumps({"columns": columns, "data": data}, ensure_ascii=False, separators=(",", ":"))
+        with gzip.open(path, "wb", compresslevel=6) as f:
+            f.write(payload.encode("utf-8"))
+
+    def read_columns(self, path: Path, columns=None) -> dict:
+        with gzip.open(path, "rb") as f:
+            payload = json.loads(f.read())
+        data = payload["data"]
+        names = payload["columns"] if columns is None else [c for c in columns if c in data]
+        return {c: data[c] for c in names}
+
+    def read(self, path: Path, columns=None) -> list:
+        data = self.read_columns(path, columns)
+        if not data:
+            return []
+        names = list(data)
+        return [dict(zip(names, row)) for row in zip(*data.values())]
+
+
+class ParquetFormat:
+    """Parquet (pyarrow) com compressão zstd e leitura apenas das colunas pedidas."""
+    name = "parquet"
+    extension = ".parquet"
+
+    def write(self, path: Path, records: list, columns: list, constants: dict | None = None) -> None:
+        table = pa.table(_columns(records, columns, constants))
+        pq.write_table(table, path, compression="zstd")
+
+    def _read_table(self, path: Path, columns=None):
+        # ParquetFile lê só o arquivo: pq.read_table inferiria colunas de partição Hive do
+        # caminho (category=<x>/), em conflito com as mesmas colunas gravadas no arquivo
+        parquet_file = pq.ParquetFile(path)
+        if columns is not None:
+            available = set(parquet_file.schema_arrow.names)
+            columns = [c for c in columns if c in available]
+        return parquet_file.read(columns=columns)
+
+    def read_columns(self, path: Path, columns=None) -> dict:
+        return self._read_table(path, columns).to_pydict()
+
+    def read(self, path: Path, columns=None) -> list:
+        return self._read_table(path, columns).to_pylist()
+
+
+FORMATS = {"json": JsonFormat(), "columnar": ColumnarFormat()}
+if pa is not None:
+    FORMATS["parquet"] = ParquetFormat()
+
+
+def get_format(name: str | None = None):
+    """
+    Retorna o formato pedido (ou o da variável PIPELINE_STORAGE_FORMAT).
+    Sem configuração, usa parquet se o pyarrow estiver disponível, senão columnar.
+    """
+    name = name or os.getenv("PIPELINE_STORAGE_FORMAT") or ("parquet" if "parquet" in FORMATS else "columnar")
+    if name not in FORMATS:
+        raise ValueError(f"Formato de armazenamento desconhecido ou indisponível: {name}")
+    return FORMATS[name]
+
+
+def _format_for_file(path: Path):
+    # Detecta o formato pela extensão, para ler datasets gravados com formatos diferentes
+    for fmt in sorted(FORMATS.values(), key=lambda f: len(f.extension), reverse=True):
+        if path.name.endswith(fmt.extension):
+            return fmt
+    return None
+
+
+def _date_part(value) -> str | None:
+    # "2025-12-11T18:31:47+00:00" -> "2025-12-11"
+    return value[:10] if isinstance(value, str) and len(value) >= 10 else None
+
+
+def partition_by_capture(date_field: str):
+    """Particionamento padrão: data da captura + categoria."""
+    return (
+        ("capture_date", lambda r: _date_part(r.get(date_field))),
+        ("category", lambda r: r.get("category")),
+    )
+
+
+SILVER_PARTITIONING = partition_by_capture("captured_at")
+GOLD_PARTITIONING = partition_by_capture("capture_date_utc")
+
+
+def _encode_partition_value(value) -> str:
+    if value is None or value == "":
+        return NULL_PARTITION
+    return quote(str(value), safe="")
+
+
+def _decode_partition_value(value: str):
+    return None if value == NULL_PARTITION else unquote(value)
+
+
+def partition_dir(partitioning, record: dict) -> str:
+    # Caminho relativo da partição do registro: "capture_date=2025-12-11/category=specials"
+    return "/".join(f"{name}={_encode_partition_value(fn(record))}" for name, fn in partitioning)
+
+
+def write_dataset(root: Path, records: list, partitioning=SILVER_PARTITIONING, fmt=None) -> list:
+    """
+    Grava os registros em root/<col>=<valor>/.../part-00000<ext>, um arquivo por partição.
+    O dataset é montado em um diretório temporário e publicado com um rename atômico,
+    então leitores nunca enxergam um dataset pela metade.
+    Retorna a lista de arquivos gravados.
+    """
+    fmt = fmt or get_format()
+    staging = root.parent / f".{root.name}.tmp"
+    if staging.exists():
+        shutil.rmtree(staging)
+    staging.mkdir(parents=True)
+
+    # Ordem das colunas: a ordem de chegada das chaves (igual à do schema)
+    columns = list(dict.fromkeys(key for r in records for key in r))
+
+    partitions = {}
+    for record in records:
+        partitions.setdefault(partition_dir(partitioning, record), []).append(record)
+
+    written = []
+    for key, rows in partitions.items():
+        part_dir = staging / key
+        part_dir.mkdir(parents=True, exist_ok=True)
+        outfile = part_dir / f"part-00000{fmt.extension}"
+        fmt.write(outfile, rows, columns)
+        written.append(root / outfile.relative_to(staging))
+
+    if root.exists():
+        # Mesmo nome (ex: duas execuções no mesmo segundo): substitui o dataset anterior
+        retired = root.parent / f".{root.name}.old"
+        shutil.rmtree(retired, ignore_errors=True)
+        os.replace(root, retired)
+        os.replace(staging, root)
+        shutil.rmtree(retired, ignore_errors=True)
+    else:
+        os.replace(staging, root)
+    return written
+
+
+def list_dataset_files(root: Path, partition_filter: dict | None = None) -> list:
+    """
+    Lista os arquivos de dados do dataset. Diretórios de partição que não passam no
+    filtro {coluna_de_partição: conjunto de valores aceitos} nem chegam a ser percorridos.
+    """
+    partition_filter = partition_filter or {}
+    files = []
+
+    def _walk(directory: Path):
+        for child in sorted(directory.iterdir()):
+            if child.is_dir():
+                name, sep, value = child.name.partition("=")
+                if sep and name in partition_filter and _decode_partition_value(value) not in partition_filter[name]:
+                    continue
+                _walk(child)
+            elif child.name.startswith("part-") and _format_for_file(child) is not None:
+                files.append(child)
+
+    _walk(root)
+    return files
+
+
+def read_dataset(root: Path, columns=None, partition_filter: dict | None = None) -> list:
+    """
+    Lê um dataset (ou um arquivo JSON do formato antigo) e retorna a lista de registros.
+    columns restringe as colunas lidas (projeção); partition_filter poda partições.
+    """
+    if root.is_file():
+        return JsonFormat().read(root, columns)
+
+    records = []
+    for path in list_dataset_files(root, partition_filter):
+        records.extend(_format_for_file(path).read(path, columns))
+    return records
+
+
+def read_files(paths, columns=None) -> list:
+    """Lê uma lista de arquivos de partição (ex: selecionados pelo catálogo) como registros."""
+    records = []
+    for path in paths:
+        records.extend(_format_for_file(Path(path)).read(Path(path), columns))
+    return records
+
+
+def read_dataset_columns(root: Path, columns=None, partition_filter: dict | None = None) -> dict:
+    """
+    Igual a read_dataset, mas retorna o dataset em colunas {coluna: [valores]},
+    sem materializar um dicionário por registro (caminho mais rápido para agregações).
+    """
+    if root.is_file():
+        return JsonFormat().read_columns(root, columns)
+
+    result = {c: [] for c in columns} if columns else {}
+    total_rows = 0
+    for path in list_dataset_files(root, partition_filter):
+        part = _format_for_file(path).read_columns(path, columns)
+        n_rows = len(next(iter(part.values()), []))
+        # Colunas ausentes em parte dos arquivos são completadas com None
+        for name in part:
+            result.setdefault(name, [None] * total_rows)
+        for name, values in result.items():
+            values.extend(part.get(name, [None] * n_rows))
+        total_rows += n_rows
+    return result
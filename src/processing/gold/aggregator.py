@@ -0,0 +1,210 @@
+# src/processing/gold/aggregator.py
+"""
+Agregação Silver -> Gold em colunas (NumPy).
+
+Os registros do Silver são convertidos uma única vez em arrays por coluna; a construção
+das linhas fato (fact_id, preços, desconto) e os agregados por categoria são operações
+vetorizadas sobre esses arrays, sem laços Python por registro. O custo cresce de forma
+linear com o número de linhas (ver benchmarks/bench_aggregator.py).
+"""
+import numpy as np
+
+# NumPy 2: strings de tamanho variável (np.strings) são bem mais rápidas que np.char
+_STRINGS = getattr(np, "strings", np.char)
+_STR_DTYPE = np.dtypes.StringDType() if hasattr(np.dtypes, "StringDType") else str
+
+# Versão do schema Gold registrada no catálogo de partições (incrementar ao mudar as colunas)
+SCHEMA_VERSION = 2
+
+# Colunas da tabela fato, na ordem em que são gravadas no Gold
+FACT_FIELDS = (
+    "fact_id", "game_id", "game_name", "game_type", "genres", "is_discounted", "discount_percent",
+    "original_price", "final_price", "category", "source", "capture_date_utc", "processing_date_utc",
+)
+
+# Colunas do Silver lidas pela agregação (genres vem do enriquecimento, não do Silver)
+SILVER_FIELDS = (
+    "game_id", "game_name", "game_type", "genres", "is_discounted", "discount_percent",
+    "original_price", "final_price", "category", "source", "captured_at",
+)
+
+# Faixas da distribuição de desconto: (nome da coluna, limite inferior inclusivo)
+DISCOUNT_BUCKETS = (
+    ("discount_0", 0), ("discount_1_24", 1), ("discount_25_49", 25),
+    ("discount_50_74", 50), ("discount_75_100", 75),
+)
+
+
+def columns_from_records(records: list, fields=SILVER_FIELDS) -> dict:
+    """{campo: [valores]} a partir de uma lista de registros (None para campos ausentes)."""
+    return {field: [r.get(field) for r in records] for field in fields}
+
+
+def _objects(values) -> np.ndarray:
+    # Array de objetos 1-D, mesmo quando os valores são listas/tuplas
+    arr = np.empty(len(values), dtype=object)
+    arr[:] = values
+    return arr
+
+
+def _floats(values) -> np.ndarray:
+    # None -> NaN
+    return np.array(values, dtype=np.float64) if len(values) else np.empty(0, dtype=np.float64)
+
+
+def _nullable_to_list(values: np.ndarray, missing: np.ndarray) -> list:
+    # Converte para tipos Python (int/float/bool) com None nas posições ausentes
+    out = values.astype(object)
+    out[missing] = None
+    return out.tolist()
+
+
+def build_fact_columns(columns: dict, processing_time: str) -> dict:
+    """
+    Constrói as colunas da tabela fato a partir das colunas do Silver.
+
+    - Linhas sem game_id são descartadas.
+    - fact_id = "<game_id>_<processing_time>".
+    - discount_percent ausente é derivado dos preços, quando ambos existem.
+    - is_discounted ausente é derivado de discount_percent > 0.
+    Retorna {coluna: array}, com NaN (numéricos) ou None (objetos) nos valores ausentes;
+    fact_id é um array de strings do NumPy.
+    """
+    game_ids = _objects(columns.get("game_id") or [])
+    keep = game_ids != None  # noqa: E711 (comparação elemento a elemento)
+    n = int(keep.sum())
+    # Caso comum (todas as linhas têm game_id): evita copiar cada coluna pela máscara
+    keep_all = n == len(game_ids)
+
+    def column(name, convert=_objects):
+        values = columns.get(name)
+        arr = convert(values) if values is not None else convert([None] * len(game_ids))
+        return arr if keep_all else arr[keep]
+
+    ids = (game_ids if keep_all else game_ids[keep]).astype(np.int64)
+    original = column("original_price", _floats)
+    final = column("final_price", _floats)
+    discount = column("discount_percent", _floats)
+
+    # Desconto derivado dos preços onde a API não enviou o percentual
+    derivable = np.isnan(discount) & ~np.isnan(original) & ~np.isnan(final) & (original > 0)
+    derived = np.rint(100.0 * (1.0 - final[derivable] / original[derivable]))
+    discount[derivable] = np.clip(derived, 0, 100)
+
+    is_discounted = column("is_discounted")
+    missing_flag = (is_discounted == None) & ~np.isnan(discount)  # noqa: E711
+    is_discounted[missing_flag] = (discount[missing_flag] > 0).tolist()
+
+    fact_ids = _STRINGS.add(ids.astype(_STR_DTYPE), "_" + processing_time)
+
+    return {
+        "fact_id": fact_ids,
+        "game_id": ids,
+        "game_name": column("game_name"),
+        "game_type": column("game_type"),
+        "genres": column("genres"),
+        "is_discounted": is_discounted,
+        "discount_percent": discount,
+        "original_price": original,
+        "final_price": final,
+        "category": column("category"),
+        "source": column("source"),
+        "capture_date_utc": column("captured_at"),
+        "processing_date_utc": np.full(n, processing_time, dtype=object),
+    }
+
+
+def fact_records(facts: dict) -> list:
+    """Materializa as colunas fato como lista de dicionários (formato gravado no Gold)."""
+    discount = facts["discount_percent"]
+    discount_missing = np.isnan(discount)
+    columns = {name: values.tolist() for name, values in facts.items() if values.dtype == object}
+    columns["fact_id"] = facts["fact_id"].tolist()
+    columns["game_id"] = facts["game_id"].tolist()
+    columns["discount_percent"] = _nullable_to_list(
+        np.where(discount_missing, 0, discount).astype(np.int64), discount_missing)
+    for name in ("original_price", "final_price"):
+        columns[name] = _nullable_to_list(facts[name], np.isnan(facts[name]))
+
+    names = list(FACT_FIELDS)
+    return [dict(zip(names, row)) for row in zip(*(columns[name] for name in names))]
+
+
+def _factorize(values: np.ndarray):
+    # Códigos inteiros por valor distinto, na ordem da primeira ocorrência (O(n))
+    uniques = list(dict.fromkeys(values.tolist()))
+    index = {value: i for i, value in enumerate(uniques)}
+    codes = np.fromiter(map(index.__getitem__, values.tolist()), dtype=np.intp, count=len(values))
+    return uniques, codes
+
+
+def category_aggregates(facts: dict, processing_time: str | None = None) -> list:
+    """
+    Agregados por categoria sobre as colunas fato:
+    quantidade de itens, itens com desconto, preço final médio e mínimo,
+    desconto médio e distribuição de descontos por faixa (DISCOUNT_BUCKETS).
+    Preços/descontos ausentes não entram nas médias; média sem valores é None.
+    """
+    categories, codes = _factorize(facts["category"])
+    k = len(categories)
+    if k == 0:
+        return []
+
+    items = np.bincount(codes, minlength=k)
+    discounted = np.bincount(codes, weights=(facts["is_discounted"] == True), minlength=k)  # noqa: E712
+
+    final = facts["final_price"]
+    has_price = ~np.isnan(final)
+    price_codes = codes[has_price]
+    price_count = np.bincount(price_codes, minlength=k)
+    price_sum = np.bincount(price_codes, weights=final[has_price], minlength=k)
+    price_min = np.full(k, np.inf)
+    np.minimum.at(price_min, price_codes, final[has_price])
+
+    discount = facts["discount_percent"]
+    has_discount = ~np.isnan(discount)
+    discount_codes = codes[has_discount]
+    discount_values = discount[has_discount]
+    discount_count = np.bincount(discount_codes, minlength=k)
+    discount_sum = np.bincount(discount_codes, weights=discount_values, minlength=k)
+
+    bounds = np.array([lower for _, lower in DISCOUNT_BUCKETS[1:]])
+    buckets = np.searchsorted(bounds, discount_values, side="right")
+    histogram = np.bincount(discount_codes * len(DISCOUNT_BUCKETS) + buckets,
+                            minlength=k * len(DISCOUNT_BUCKETS)).reshape(k, len(DISCOUNT_BUCKETS))
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        price_avg = price_sum / price_count
+        discount_avg = discount_sum / discount_count
+
+    rows = []
+    for i, category in enumerate(categories):
+        row = {
+            "category": category,
+            "items": int(items[i]),
+            "discounted_items": int(discounted[i]),
+            "avg_final_price": round(float(price_avg[i]), 2) if price_count[i] else None,
+            "min_final_price": float(price_min[i]) if price_count[i] else None,
+            "avg_discount_percent": round(float(discount_avg[i]), 2) if discount_count[i] else None,
+        }
+        row.update((name, int(count)) for (name, _), count in zip(DISCOUNT_BUCKETS, histogram[i]))
+        if processing_time is not None:
+            row["processing_date_utc"] = processing_time
+        rows.append(row)
+    return rows
+
+
+def aggregate_featured_columns(columns: dict, processing_time: str):
+    """Caminho em colunas: retorna (colunas fato, agregados por categoria)."""
+    facts = build_fact_columns(columns, processing_time)
+    return facts, category_aggregates(facts, processing_time)
+
+
+def aggregate_featured_games(data: list, processing_time: str) -> list:
+    """
+    Gera as linhas fato do Gold (uma por jogo do Silver), no formato de FACT_FIELDS.
+    Mantido com a mesma assinatura usada pela Function process_gold.
+    """
+    if not data:
+        return []
+    return fact_records(build_fact_columns(columns_from_records(data), processing_time))
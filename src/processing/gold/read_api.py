@@ -0,0 +1,292 @@
+# src/processing/gold/read_api.py
+"""
+API de leitura do Gold: o estado atual dos jogos em destaque em memória, com índices.
+
+O estado é a linha fato mais recente de cada game_id nos datasets gold_featured_facts
+do catálogo (o CDC grava só jogos novos/alterados), restrito aos jogos que continuam em
+destaque segundo o estado do CDC. Sobre ele são montados índices secundários:
+
+- por game_id (dict) e por categoria;
+- listas ordenadas por discount_percent e por final_price (geral e por categoria),
+  usadas por top-N e por consultas de intervalo com bisect.
+
+As respostas (JSON já serializado) passam por um cache LRU. O catálogo é consultado no
+máximo a cada refresh_seconds; quando um dataset Gold novo é publicado, só ele é lido,
+os índices são remontados e o cache é esvaziado.
+
+    reader = GoldReader(store)
+    status, body = reader.handle("top", {"by": "discount_percent", "n": "10", "category": "specials"})
+"""
+import bisect
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from src.processing import catalog as partition_catalog
+from src.processing import cdc
+from src.processing import formats
+from src.processing import storage as layer_storage
+
+# Colunas ordenáveis (índices para top-N e intervalos)
+SORTED_FIELDS = ("discount_percent", "final_price")
+
+DEFAULT_CACHE_SIZE = 1024
+DEFAULT_REFRESH_SECONDS = 5.0
+MAX_LIMIT = 1000
+
+
+class BadRequest(ValueError):
+    """Parâmetros inválidos na consulta (resposta 400)."""
+
+
+class LRUCache:
+    """Respostas por chave de consulta, com despejo da menos usada recentemente."""
+
+    def __init__(self, max_entries: int = DEFAULT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class GoldSnapshot:
+    """Linhas fato atuais e os seus índices (imutável: uma versão nova substitui a anterior)."""
+
+    def __init__(self, rows: list, version=None):
+        self.version = version
+        self.rows = rows
+        self.by_game = {r["game_id"]: r for r in rows}
+        self.by_category = {}
+        for r in rows:
+            self.by_category.setdefault(r.get("category"), []).append(r)
+
+        # {campo: {categoria (None = todas): (chaves ordenadas, linhas na mesma ordem)}}
+        self.sorted = {}
+        for field in SORTED_FIELDS:
+            groups = {None: rows, **self.by_category}
+            self.sorted[field] = {category: self._sort(group, field) for category, group in groups.items()}
+
+    @staticmethod
+    def _sort(rows: list, field: str) -> tuple:
+        # Linhas sem o valor ficam de fora do índice; empate pelo game_id (ordem estável)
+        ordered = sorted((r for r in rows if r.get(field) is not None), key=lambda r: (r[field], r["game_id"]))
+        return [r[field] for r in ordered], ordered
+
+    def _index(self, field: str, category):
+        if field not in SORTED_FIELDS:
+            raise BadRequest(f"campo não indexado: {field} (disponíveis: {', '.join(SORTED_FIELDS)})")
+        if category is not None and category not in self.by_category:
+            return [], []
+        return self.sorted[field][category]
+
+    def lookup(self, game_id: int) -> dict | None:
+        return self.by_game.get(game_id)
+
+    def top(self, field: str, n: int = 10, category: str | None = None, descending: bool = True) -> list:
+        """Os n jogos com maior (ou menor) valor do campo, opcionalmente só de uma categoria."""
+        _, ordered = self._index(field, category)
+        if descending:
+            return ordered[:-n - 1:-1] if n else []
+        return ordered[:n]
+
+    def range(self, field: str, low=None, high=None, category: str | None = None, limit: int = 100) -> list:
+        """Jogos com low <= campo <= high (limites opcionais), em ordem crescente do campo."""
+        keys, ordered = self._index(field, category)
+        start = bisect.bisect_left(keys, low) if low is not None else 0
+        end = bisect.bisect_right(keys, high) if high is not None else len(keys)
+        return ordered[start:min(end, start + limit)]
+
+    def categories(self) -> dict:
+        return {category: len(rows) for category, rows in self.by_category.items() if category is not None}
+
+
+class GoldReader:
+    """
+    Mantém o GoldSnapshot atualizado a partir do catálogo e responde às consultas.
+    Seguro para uso por várias threads: a troca de snapshot é atômica e o cache tem lock.
+    """
+
+    def __init__(self, store, refresh_seconds: float = DEFAULT_REFRESH_SECONDS,
+                 cache_size: int = DEFAULT_CACHE_SIZE, clock=time.monotonic):
+        self.store = store
+        self.refresh_seconds = refresh_seconds
+        self.cache = LRUCache(cache_size)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._checked_at = None
+        self._loaded_id = 0
+        self._latest = {}  # game_id -> linha fato mais recente, de todos os datasets lidos
+        self.snapshot = GoldSnapshot([])
+        self.loaded_at = None
+
+    # --- atualização ----------------------------------------------------------
+
+    def refresh(self, force: bool = False) -> bool:
+        """Lê os datasets Gold publicados desde a última leitura. Retorna True se o snapshot mudou."""
+        now = self._clock()
+        if not force and self._checked_at is not None and now - self._checked_at < self.refresh_seconds:
+            return False
+        with self._lock:
+            if not force and self._checked_at is not None and now - self._checked_at < self.refresh_seconds:
+                return False  # outra thread acabou de atualizar
+            self._checked_at = now
+            return self._load()
+
+    def _load(self) -> bool:
+        store = self.store
+        store.fetch(layer_storage.CATALOG, mutable=True)
+        catalog = partition_catalog.Catalog(store.local_path(layer_storage.CATALOG), store.local_path())
+        try:
+            datasets = [d for d in catalog.datasets("gold_facts") if d.id > self._loaded_id]
+            changes = catalog.latest_dataset("gold_changes")
+            version = (datasets[-1].id if datasets else self._loaded_id, changes.id if changes else 0)
+            if version == self.snapshot.version:
+                return False
+
+            for dataset in datasets:
+                partitions = catalog.partitions(dataset.id)
+                store.fetch_many(p.path for p in partitions)
+                self._fold(formats.read_files([catalog.resolve(p.path) for p in partitions]))
+            if not self._latest:
+                self._fold(self._legacy_facts())
+        finally:
+            catalog.close()
+        if datasets:
+            self._loaded_id = datasets[-1].id
+
+        # Jogos que saíram dos destaques (delete no CDC) deixam de ser servidos
+        store.fetch(layer_storage.GOLD_CDC_STATE, mutable=True)
+        featured = cdc.load_state(store.local_path(layer_storage.GOLD_CDC_STATE))
+        rows = [r for game_id, r in self._latest.items() if not featured or game_id in featured]
+
+        self.snapshot = GoldSnapshot(rows, version)
+        self.loaded_at = time.time()
+        self.cache.clear()
+        logging.info('[gold_api] Gold recarregado: %d jogos (datasets até %s)', len(rows), version[0])
+        return True
+
+    def _legacy_facts(self) -> list:
+        # Gold gravado antes do catálogo: o gold_featured_facts_<ts>.json mais recente (o nome é cronológico)
+        store = self.store
+        names = sorted(n for n in store.list_children(layer_storage.GOLD)
+                       if n.startswith("gold_featured_facts_") and n.endswith(".json"))
+        if not names:
+            return []
+        key = f"{layer_storage.GOLD}/{names[-1]}"
+        store.fetch(key)
+        return formats.read_dataset(store.local_path(key))
+
+    def _fold(self, records: list) -> None:
+        # Vence a captura mais recente; empate fica com o dataset mais novo (lido por último)
+        latest = self._latest
+        for r in records:
+            game_id = r.get("game_id")
+            if game_id is None:
+                continue
+            current = latest.get(game_id)
+            if current is None or (r.get("capture_date_utc") or "") >= (current.get("capture_date_utc") or ""):
+                latest[game_id] = r
+
+    # --- consultas ------------------------------------------------------------
+
+    def handle(self, action: str, params: dict) -> tuple:
+        """(status HTTP, corpo JSON em bytes) da consulta; respostas 200 vêm do cache LRU quando possível."""
+        self.refresh()
+        if action == "status":
+            return 200, self._json(self._status())
+
+        # Um único snapshot por consulta; a versão na chave impede que uma resposta calculada
+        # sobre o snapshot anterior seja servida depois de um refresh concorrente
+        snapshot = self.snapshot
+        key = (snapshot.version, action, tuple(sorted(params.items())))
+        body = self.cache.get(key)
+        if body is not None:
+            return 200, body
+        try:
+            status, payload = self._query(snapshot, action, params)
+        except BadRequest as e:
+            return 400, self._json({"error": str(e)})
+        body = self._json(payload)
+        if status == 200:
+            self.cache.put(key, body)
+        return status, body
+
+    @staticmethod
+    def _json(payload) -> bytes:
+        return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    def _status(self) -> dict:
+        return {"games": len(self.snapshot.rows), "version": self.snapshot.version, "loaded_at": self.loaded_at,
+                "cache": {"entries": len(self.cache), "hits": self.cache.hits, "misses": self.cache.misses}}
+
+    def _query(self, snapshot: GoldSnapshot, action: str, params: dict) -> tuple:
+        category = params.get("category") or None
+        if action == "game":
+            row = snapshot.lookup(_int(params, "game_id"))
+            return (200, row) if row is not None else (404, {"error": "game_id não encontrado"})
+        if action == "top":
+            order = params.get("order", "desc")
+            if order not in ("asc", "desc"):
+                raise BadRequest("order deve ser asc ou desc")
+            rows = snapshot.top(params.get("by", "discount_percent"), _int(params, "n", 10), category,
+                                descending=order == "desc")
+            return 200, {"items": rows}
+        if action == "range":
+            rows = snapshot.range(params.get("by", "final_price"), _float(params, "min"), _float(params, "max"),
+                                  category, _int(params, "limit", 100))
+            return 200, {"items": rows}
+        if action == "categories":
+            return 200, snapshot.categories()
+        return 404, {"error": f"consulta desconhecida: {action}"}
+
+
+def _int(params: dict, name: str, default: int | None = None) -> int:
+    value = params.get(name)
+    if value in (None, ""):
+        if default is None:
+            raise BadRequest(f"parâmetro obrigatório: {name}")
+        return default
+    try:
+        number = int(value)
+    except ValueError:
+        raise BadRequest(f"{name} deve ser inteiro") from None
+    if name != "game_id" and not 0 <= number <= MAX_LIMIT:
+        raise BadRequest(f"{name} deve estar entre 0 e {MAX_LIMIT}")
+    return number
+
+
+def _float(params: dict, name: str) -> float | None:
+    value = params.get(name)
+    if value in (None, ""):
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        raise BadRequest(f"{name} deve ser numérico") from None
@@ -0,0 +1,403 @@
+# src/processing/gold/views.py
+"""
+Visões agregadas do Gold, mantidas de forma incremental (SQLite).
+
+Cada execução do process_gold aplica o seu lote de linhas fato (um registro por jogo,
+com o horário da captura) e as visões são atualizadas só nas chaves que o lote tocou,
+sem reler o histórico:
+
+- daily_prices    : por jogo e dia, preço final mín./máx./médio, observações com desconto,
+                    maior desconto e a categoria da última captura do dia;
+- game_stats      : por jogo, frequência de desconto (observações e dias com desconto) e
+                    menor preço já visto (all-time low, e quando);
+- rolling_windows : por jogo, janelas de 7 e 30 dias terminando em cada dia observado;
+- leaderboards    : por dia e categoria, os LEADERBOARD_SIZE maiores descontos.
+
+As observações aplicadas ficam no log (observations), chaveado por (game_id, captured_at):
+reaplicar o mesmo lote (mensagem reentregue, Silver reprocessado) não conta nada duas
+vezes, e verify() recalcula todas as visões do zero a partir do log para conferir o
+estado incremental. rebuild() substitui as visões pelo recálculo completo.
+"""
+import bisect
+import datetime as dt
+import math
+import sqlite3
+from pathlib import Path
+
+# Versão das tabelas derivadas: se mudar, as visões são recalculadas a partir do log ao abrir
+VIEWS_VERSION = 1
+
+WINDOWS = (7, 30)
+LEADERBOARD_SIZE = 10
+
+_DAILY_FIELDS = ("game_id", "day", "category", "last_captured_at", "observations", "price_count", "price_sum",
+                 "min_price", "max_price", "discounted_observations", "max_discount")
+_STATS_FIELDS = ("game_id", "first_seen", "last_seen", "observations", "discounted_observations",
+                 "days_seen", "days_discounted", "low_price", "low_captured_at")
+_WINDOW_FIELDS = ("game_id", "window_days", "day", "days_seen", "days_discounted", "observations",
+                  "price_count", "price_sum", "min_price", "max_price")
+_BOARD_FIELDS = ("day", "category", "rank", "game_id", "discount_percent", "final_price")
+
+# Chave de cada visão (colunas do início da linha) e tabela correspondente
+VIEWS = {
+    "daily_prices": (_DAILY_FIELDS, 2),
+    "game_stats": (_STATS_FIELDS, 1),
+    "rolling_windows": (_WINDOW_FIELDS, 3),
+    "leaderboards": (_BOARD_FIELDS, 3),
+}
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS observations ("
+    " game_id INTEGER NOT NULL, captured_at TEXT NOT NULL, day TEXT NOT NULL, category TEXT,"
+    " final_price REAL, original_price REAL, discount_percent INTEGER, is_discounted INTEGER NOT NULL,"
+    " PRIMARY KEY (game_id, captured_at)) WITHOUT ROWID",
+    "CREATE TABLE IF NOT EXISTS daily_prices ("
+    " game_id INTEGER NOT NULL, day TEXT NOT NULL, category TEXT, last_captured_at TEXT NOT NULL,"
+    " observations INTEGER NOT NULL, price_count INTEGER NOT NULL, price_sum REAL NOT NULL,"
+    " min_price REAL, max_price REAL, discounted_observations INTEGER NOT NULL, max_discount INTEGER,"
+    " PRIMARY KEY (game_id, day)) WITHOUT ROWID",
+    "CREATE INDEX IF NOT EXISTS ix_daily_prices_category ON daily_prices(day, category)",
+    "CREATE TABLE IF NOT EXISTS game_stats ("
+    " game_id INTEGER PRIMARY KEY, first_seen TEXT NOT NULL, last_seen TEXT NOT NULL,"
+    " observations INTEGER NOT NULL, discounted_observations INTEGER NOT NULL,"
+    " days_seen INTEGER NOT NULL, days_discounted INTEGER NOT NULL, low_price REAL, low_captured_at TEXT)",
+    "CREATE TABLE IF NOT EXISTS rolling_windows ("
+    " game_id INTEGER NOT NULL, window_days INTEGER NOT NULL, day TEXT NOT NULL,"
+    " days_seen INTEGER NOT NULL, days_discounted INTEGER NOT NULL, observations INTEGER NOT NULL,"
+    " price_count INTEGER NOT NULL, price_sum REAL NOT NULL, min_price REAL, max_price REAL,"
+    " PRIMARY KEY (game_id, window_days, day)) WITHOUT ROWID",
+    "CREATE TABLE IF NOT EXISTS leaderboards ("
+    " day TEXT NOT NULL, category TEXT NOT NULL, rank INTEGER NOT NULL, game_id INTEGER NOT NULL,"
+    " discount_percent INTEGER NOT NULL, final_price REAL,"
+    " PRIMARY KEY (day, category, rank)) WITHOUT ROWID",
+)
+
+
+def _number(value) -> float | None:
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or math.isnan(value):
+        return None
+    return float(value)
+
+
+def _observation(record, time_field: str) -> tuple | None:
+    # Linha fato (ou registro do Silver) -> linha do log; sem game_id ou data, fica de fora
+    game_id = record.get("game_id")
+    captured_at = record.get(time_field)
+    if game_id is None or not captured_at:
+        return None
+    discount = record.get("discount_percent")
+    discount = int(discount) if _number(discount) is not None else None
+    flag = record.get("is_discounted")
+    is_discounted = bool(flag) if flag is not None else (discount or 0) > 0
+    return (int(game_id), captured_at, captured_at[:10], record.get("category"),
+            _number(record.get("final_price")), _number(record.get("original_price")),
+            discount, int(is_discounted))
+
+
+def _shift(day: str, days: int) -> str:
+    return (dt.date.fromisoformat(day) + dt.timedelta(days=days)).isoformat()
+
+
+def _fold_daily(row: list | None, obs: tuple) -> list:
+    # Acrescenta uma observação à linha diária (lista na ordem de _DAILY_FIELDS)
+    game_id, captured_at, day, category, price, _, discount, is_discounted = obs
+    if row is None:
+        row = [game_id, day, category, captured_at, 0, 0, 0.0, None, None, 0, None]
+    elif captured_at > row[3]:
+        row[2], row[3] = category, captured_at
+    row[4] += 1
+    if price is not None:
+        row[5] += 1
+        row[6] += price
+        row[7] = price if row[7] is None else min(row[7], price)
+        row[8] = price if row[8] is None else max(row[8], price)
+    row[9] += is_discounted
+    if discount is not None:
+        row[10] = discount if row[10] is None else max(row[10], discount)
+    return row
+
+
+def _fold_stats(row: list | None, obs: tuple) -> list:
+    # Acrescenta uma observação às estatísticas do jogo (sem os dias, tratados à parte)
+    game_id, captured_at, _, _, price, _, _, is_discounted = obs
+    if row is None:
+        row = [game_id, captured_at, captured_at, 0, 0, 0, 0, None, None]
+    row[1], row[2] = min(row[1], captured_at), max(row[2], captured_at)
+    row[3] += 1
+    row[4] += is_discounted
+    # Menor preço: empate fica com a observação mais antiga (independe da ordem dos lotes)
+    if price is not None and (row[7] is None or price < row[7] or (price == row[7] and captured_at < row[8])):
+        row[7], row[8] = price, captured_at
+    return row
+
+
+def _board_order(row: tuple):
+    # Maior desconto primeiro; empate pelo menor preço do dia e depois pelo game_id
+    game_id, discount, price = row
+    return -discount, price if price is not None else math.inf, game_id
+
+
+def recompute(observations) -> dict:
+    """
+    Todas as visões calculadas do zero a partir das observações (linhas do log), sem
+    nenhum estado incremental: {visão: {chave: linha}}. É a referência de verify().
+    """
+    daily = {}
+    days = {}
+    for obs in observations:
+        days.setdefault((obs[0], obs[2]), []).append(obs)
+
+    for key, group in days.items():
+        group.sort(key=lambda o: o[1])
+        prices = [o[4] for o in group if o[4] is not None]
+        discounts = [o[6] for o in group if o[6] is not None]
+        daily[key] = (key[0], key[1], group[-1][3], group[-1][1], len(group), len(prices), math.fsum(prices),
+                      min(prices, default=None), max(prices, default=None),
+                      sum(o[7] for o in group), max(discounts, default=None))
+
+    stats = {}
+    by_game = {}
+    for (game_id, day), group in days.items():
+        stats.setdefault(game_id, []).extend(group)
+        by_game.setdefault(game_id, []).append(daily[(game_id, day)])
+    game_stats = {}
+    for game_id, group in stats.items():
+        priced = [o for o in group if o[4] is not None]
+        low = min(priced, key=lambda o: (o[4], o[1]), default=None)
+        game_days = by_game[game_id]
+        game_stats[(game_id,)] = (
+            game_id, min(o[1] for o in group), max(o[1] for o in group), len(group), sum(o[7] for o in group),
+            len(game_days), sum(1 for row in game_days if row[9] > 0),
+            low[4] if low else None, low[1] if low else None)
+
+    rolling = {}
+    for game_id, rows in by_game.items():
+        rows.sort(key=lambda r: r[1])
+        game_days = [r[1] for r in rows]
+        for end, end_row in enumerate(rows, 1):
+            for window in WINDOWS:
+                in_window = rows[bisect.bisect_left(game_days, _shift(end_row[1], -(window - 1))):end]
+                mins = [r[7] for r in in_window if r[7] is not None]
+                maxs = [r[8] for r in in_window if r[8] is not None]
+                rolling[(game_id, window, end_row[1])] = (
+                    game_id, window, end_row[1], len(in_window), sum(1 for r in in_window if r[9] > 0),
+                    sum(r[4] for r in in_window), sum(r[5] for r in in_window),
+                    math.fsum(r[6] for r in in_window), min(mins, default=None), max(maxs, default=None))
+
+    groups = {}
+    for row in daily.values():
+        if row[2] is not None and row[10] is not None and row[10] > 0:
+            groups.setdefault((row[1], row[2]), []).append((row[0], row[10], row[7]))
+    leaderboards = {}
+    for (day, category), entries in groups.items():
+        for rank, (game_id, discount, price) in enumerate(sorted(entries, key=_board_order)[:LEADERBOARD_SIZE], 1):
+            leaderboards[(day, category, rank)] = (day, category, rank, game_id, discount, price)
+
+    return {"daily_prices": daily, "game_stats": game_stats,
+            "rolling_windows": rolling, "leaderboards": leaderboards}
+
+
+def _same(a, b) -> bool:
+    # Somas de preços podem diferir no último bit conforme a ordem em que foram acumuladas
+    if isinstance(a, float) and isinstance(b, float):
+        return math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-6)
+    return a == b
+
+
+class GoldViews:
+    """
+    Visões agregadas do Gold num arquivo SQLite.
+
+    apply() grava as observações novas do lote e atualiza as visões: as linhas diárias e as
+    estatísticas por jogo recebem só as observações novas; as janelas móveis e os rankings
+    são recalculados apenas para os jogos/dias/categorias afetados, a partir das linhas
+    diárias (no máximo 30 linhas por janela, alguns jogos por ranking).
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path))
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        with self._conn:
+            for statement in _SCHEMA:
+                self._conn.execute(statement)
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        if version != VIEWS_VERSION:
+            # Banco novo (log vazio) ou visões de uma versão anterior: recalcula a partir do log
+            self.rebuild()
+
+    # --- atualização incremental ----------------------------------------------
+
+    def apply(self, records, time_field: str = "capture_date_utc") -> int:
+        """
+        Aplica um lote de linhas fato (game_id, categoria, preços, desconto, time_field).
+        Observações já aplicadas (mesmo game_id e horário de captura) são ignoradas.
+        Retorna quantas observações novas entraram nas visões.
+        """
+        rows = [obs for obs in (_observation(r, time_field) for r in records) if obs is not None]
+        with self._conn:
+            new = []
+            for obs in rows:
+                cur = self._conn.execute("INSERT OR IGNORE INTO observations VALUES (?, ?, ?, ?, ?, ?, ?, ?)", obs)
+                if cur.rowcount:
+                    new.append(obs)
+            if not new:
+                return 0
+
+            touched = {}
+            for obs in new:
+                touched.setdefault((obs[0], obs[2]), []).append(obs)
+
+            boards = set()
+            for (game_id, day), group in touched.items():
+                old = self._row("daily_prices", (game_id, day))
+                if old is not None:
+                    boards.add((day, old[2]))
+                row = list(old) if old is not None else None
+                for obs in group:
+                    row = _fold_daily(row, obs)
+                self._upsert("daily_prices", row)
+                boards.add((day, row[2]))
+                self._update_stats(game_id, group, new_day=old is None,
+                                   newly_discounted=row[9] > 0 and (old is None or old[9] == 0))
+
+            self._refresh_windows(touched)
+            for day, category in boards:
+                if category is not None:
+                    self._refresh_board(day, category)
+        return len(new)
+
+    def _row(self, view: str, key: tuple):
+        fields, key_len = VIEWS[view]
+        where = " AND ".join(f"{f} = ?" for f in fields[:key_len])
+        return self._conn.execute(f"SELECT {', '.join(fields)} FROM {view} WHERE {where}", key).fetchone()
+
+    def _upsert(self, view: str, row) -> None:
+        fields, _ = VIEWS[view]
+        self._conn.execute(f"INSERT OR REPLACE INTO {view} ({', '.join(fields)}) "
+                           f"VALUES ({', '.join('?' * len(fields))})", tuple(row))
+
+    def _update_stats(self, game_id: int, group: list, new_day: bool, newly_discounted: bool) -> None:
+        old = self._row("game_stats", (game_id,))
+        row = list(old) if old is not None else None
+        for obs in group:
+            row = _fold_stats(row, obs)
+        row[5] += new_day
+        row[6] += newly_discounted
+        self._upsert("game_stats", row)
+
+    def _refresh_windows(self, touched: dict) -> None:
+        # Um dia novo afeta as janelas que terminam nele e nos window-1 dias seguintes
+        targets = set()
+        for game_id, day in touched:
+            for window in WINDOWS:
+                for (end_day,) in self._conn.execute(
+                        "SELECT day FROM daily_prices WHERE game_id = ? AND day BETWEEN ? AND ?",
+                        (game_id, day, _shift(day, window - 1))):
+                    targets.add((game_id, window, end_day))
+
+        for game_id, window, end_day in targets:
+            aggregate = self._conn.execute(
+                "SELECT COUNT(*), SUM(discounted_observations > 0), SUM(observations), SUM(price_count),"
+                " TOTAL(price_sum), MIN(min_price), MAX(max_price)"
+                " FROM daily_prices WHERE game_id = ? AND day BETWEEN ? AND ?",
+                (game_id, _shift(end_day, -(window - 1)), end_day)).fetchone()
+            self._upsert("rolling_windows", (game_id, window, end_day, *aggregate))
+
+    def _refresh_board(self, day: str, category: str) -> None:
+        entries = self._conn.execute(
+            "SELECT game_id, max_discount, min_price FROM daily_prices"
+            " WHERE day = ? AND category = ? AND max_discount > 0", (day, category)).fetchall()
+        self._conn.execute("DELETE FROM leaderboards WHERE day = ? AND category = ?", (day, category))
+        for rank, (game_id, discount, price) in enumerate(sorted(entries, key=_board_order)[:LEADERBOARD_SIZE], 1):
+            self._upsert("leaderboards", (day, category, rank, game_id, discount, price))
+
+    # --- verificação ----------------------------------------------------------
+
+    def observations(self) -> list:
+        return self._conn.execute("SELECT * FROM observations").fetchall()
+
+    def verify(self) -> list:
+        """
+        Compara as visões incrementais com o recálculo completo a partir do log.
+        Retorna as divergências ({view, key, stored, expected}); lista vazia = visões corretas.
+        """
+        expected = recompute(self.observations())
+        mismatches = []
+        for view, (fields, key_len) in VIEWS.items():
+            stored = {row[:key_len]: row for row in self._conn.execute(f"SELECT {', '.join(fields)} FROM {view}")}
+            for key in stored.keys() | expected[view].keys():
+                a, b = stored.get(key), expected[view].get(key)
+                if a is None or b is None or not all(map(_same, a, b)):
+                    mismatches.append({"view": view, "key": key, "stored": a, "expected": b})
+        return mismatches
+
+    def rebuild(self) -> None:
+        """Substitui todas as visões pelo recálculo completo a partir do log."""
+        expected = recompute(self.observations())
+        with self._conn:
+            for view, rows in expected.items():
+                self._conn.execute(f"DELETE FROM {view}")
+                for row in rows.values():
+                    self._upsert(view, row)
+            self._conn.execute(f"PRAGMA user_version = {VIEWS_VERSION}")
+
+    # --- consultas ------------------------------------------------------------
+
+    @staticmethod
+    def _dict(fields, row) -> dict | None:
+        return dict(zip(fields, row)) if row is not None else None
+
+    @staticmethod
+    def _with_mean(row: dict | None) -> dict | None:
+        if row is not None:
+            count = row.pop("price_count")
+            total = row.pop("price_sum")
+            row["mean_price"] = round(total / count, 2) if count else None
+        return row
+
+    def daily(self, game_id: int, start: str | None = None, end: str | None = None) -> list:
+        """Preço mín./máx./médio por dia do jogo, em ordem cronológica (start/end: datas ISO, inclusivas)."""
+        rows = self._conn.execute(
+            f"SELECT {', '.join(_DAILY_FIELDS)} FROM daily_prices WHERE game_id = ? AND day BETWEEN ? AND ?"
+            " ORDER BY day", (game_id, start or "", end or "9999-12-31"))
+        return [self._with_mean(self._dict(_DAILY_FIELDS, row)) for row in rows]
+
+    def window(self, game_id: int, days: int = 30, as_of: str | None = None) -> dict | None:
+        """
+        Janela de `days` dias (7 ou 30) terminando no último dia observado do jogo até as_of
+        (data ISO; padrão: o mais recente). O campo day indica em que dia a janela termina.
+        """
+        if days not in WINDOWS:
+            raise ValueError(f"janela não materializada: {days} dias (disponíveis: {WINDOWS})")
+        row = self._conn.execute(
+            f"SELECT {', '.join(_WINDOW_FIELDS)} FROM rolling_windows WHERE game_id = ? AND window_days = ?"
+            " AND day <= ? ORDER BY day DESC LIMIT 1", (game_id, days, as_of or "9999-12-31")).fetchone()
+        return self._with_mean(self._dict(_WINDOW_FIELDS, row))
+
+    def discount_frequency(self, game_id: int) -> dict | None:
+        """Estatísticas do jogo, com a fração de observações e de dias em que estava com desconto."""
+        row = self._dict(_STATS_FIELDS, self._row("game_stats", (game_id,)))
+        if row is not None:
+            row["observation_frequency"] = round(row["discounted_observations"] / row["observations"], 4)
+            row["day_frequency"] = round(row["days_discounted"] / row["days_seen"], 4)
+        return row
+
+    def all_time_low(self, game_id: int) -> dict | None:
+        row = self._row("game_stats", (game_id,))
+        if row is None or row[7] is None:
+            return None
+        return {"game_id": game_id, "final_price": row[7], "captured_at": row[8]}
+
+    def leaderboard(self, category: str, day: str | None = None) -> list:
+        """Maiores descontos da categoria no dia (padrão: o último dia com ranking da categoria)."""
+        if day is None:
+            day = self._conn.execute("SELECT MAX(day) FROM leaderboards WHERE category = ?", (category,)).fetchone()[0]
+        rows = self._conn.execute(
+            f"SELECT {', '.join(_BOARD_FIELDS)} FROM leaderboards WHERE day = ? AND category = ? ORDER BY rank",
+            (day, category))
+        return [self._dict(_BOARD_FIELDS, row) for row in rows]
+
+    def close(self):
+        self._conn.close()
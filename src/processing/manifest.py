@@ -0,0 +1,99 @@
+# src/processing/manifest.py
+
+import json
+import hashlib
+import os
+from pathlib import Path
+
+MANIFEST_VERSION = 1
+
+
+def _empty_manifest() -> dict:
+    return {"version": MANIFEST_VERSION, "files": {}}
+
+
+def load_manifest(path: Path) -> dict:
+    """
+    Lê o manifesto de ingestão (arquivos Bronze já processados).
+    Retorna um manifesto vazio se o arquivo não existir ou estiver corrompido.
+    """
+    if not path.exists():
+        return _empty_manifest()
+    try:
+        with path.open("r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return _empty_manifest()
+
+    if not isinstance(manifest, dict) or not isinstance(manifest.get("files"), dict):
+        return _empty_manifest()
+    return manifest
+
+
+def save_manifest(path: Path, manifest: dict) -> None:
+    """
+    Grava o manifesto de forma atômica (arquivo temporário + os.replace),
+    para que uma execução interrompida nunca deixe um manifesto pela metade.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with tmp.open("w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, path)
+
+
+def content_hash(path: Path, chunk_size: int = 1 << 20) -> str:
+    # SHA-256 calculado em blocos para não carregar o arquivo inteiro na memória
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def file_fingerprint(path: Path, with_hash: bool = True) -> dict:
+    st = path.stat()
+    fingerprint = {"size": st.st_size, "mtime": st.st_mtime_ns}
+    if with_hash:
+        fingerprint["sha256"] = content_hash(path)
+    return fingerprint
+
+
+def pending_files(files, manifest: dict) -> list:
+    """
+    Filtra a lista de arquivos Bronze, retornando apenas os que ainda não foram processados.
+    Retorna uma lista de tuplas (path, fingerprint).
+
+    - Tamanho e mtime iguais ao manifesto: arquivo ignorado sem ler o conteúdo.
+    - Tamanho/mtime diferentes, mas mesmo hash: apenas atualiza tamanho/mtime no manifesto.
+    - Hash diferente (ou arquivo novo): arquivo pendente.
+    """
+    known = manifest.setdefault("files", {})
+    pending = []
+
+    for path in files:
+        entry = known.get(path.name)
+        stat_only = file_fingerprint(path, with_hash=False)
+
+        if entry and entry.get("size") == stat_only["size"] and entry.get("mtime") == stat_only["mtime"]:
+            continue
+
+        fingerprint = file_fingerprint(path)
+        if entry and entry.get("sha256") == fingerprint["sha256"]:
+            # Conteúdo idêntico (ex: arquivo copiado/restaurado): não reprocessa
+            entry.update(size=fingerprint["size"], mtime=fingerprint["mtime"])
+            continue
+
+        pending.append((path, fingerprint))
+
+    return pending
+
+
+def mark_processed(manifest: dict, name: str, fingerprint: dict, processed_at: str) -> None:
+    # name: nome do arquivo Bronze antigo ou da captura endereçada por conteúdo
+    manifest.setdefault("files", {})[name] = {
+        "size": fingerprint["size"],
+        "mtime": fingerprint["mtime"],
+        "sha256": fingerprint["sha256"],
+        "processed_at": processed_at,
+    }
@@ -0,0 +1,262 @@
+# src/processing/metrics.py
+"""
+Métricas das etapas do pipeline no formato texto do Prometheus (para o Grafana).
+
+    with metrics.span("process_silver", "parse_validate"):
+        ...
+    metrics.count("pipeline_records_rejected_total", n, function="process_silver", reason="game_id")
+    metrics.export("process_silver")
+
+Métricas registradas pelas funções:
+- pipeline_stage_duration_seconds (histograma): duração de cada trecho (span);
+- pipeline_records_in_total / pipeline_records_out_total / pipeline_records_rejected_total{reason};
+- pipeline_values_discarded_total{field}: valores inválidos descartados (o registro continua);
+- pipeline_bytes_read_total / pipeline_bytes_written_total;
+- pipeline_http_request_duration_seconds{endpoint, status} (histograma) e
+  pipeline_http_response_bytes_total das chamadas à API da Steam (cada tentativa conta);
+- pipeline_peak_rss_bytes: pico de memória do processo na última execução (sem /proc nem
+  resource, vem do psutil; omitido se ele não estiver instalado);
+- pipeline_last_run_timestamp_seconds.
+
+Desligado por padrão: sem PIPELINE_METRICS_DIR nem PIPELINE_METRICS_PUSHGATEWAY, span()
+devolve um context manager vazio compartilhado e as demais funções retornam na primeira
+linha. Ligado, export() grava steam_pipeline.prom em PIPELINE_METRICS_DIR (textfile
+collector do node_exporter / Grafana Agent) e/ou envia ao Pushgateway. O registro é do
+processo (as funções compartilham o worker), por isso o arquivo traz todas as funções.
+"""
+import contextlib
+import os
+import socket
+import sys
+import threading
+import time
+import urllib.request
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:
+    # Windows: sem getrusage; o pico de memória vem do psutil, se instalado
+    resource = None
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+_HELP = {
+    "pipeline_stage_duration_seconds": ("histogram", "Duração de cada trecho das funções do pipeline"),
+    "pipeline_http_request_duration_seconds": ("histogram", "Latência das requisições à API da Steam"),
+    "pipeline_http_response_bytes_total": ("counter", "Bytes recebidos da API da Steam"),
+    "pipeline_records_in_total": ("counter", "Registros lidos pela etapa"),
+    "pipeline_records_out_total": ("counter", "Registros gravados pela etapa"),
+    "pipeline_records_rejected_total": ("counter", "Registros descartados, por motivo"),
+    "pipeline_values_discarded_total": ("counter", "Valores descartados na validação, por campo"),
+    "pipeline_bytes_read_total": ("counter", "Bytes lidos da camada anterior"),
+    "pipeline_bytes_written_total": ("counter", "Bytes gravados na camada"),
+    "pipeline_peak_rss_bytes": ("gauge", "Pico de memória residente do processo na última execução"),
+    "pipeline_last_run_timestamp_seconds": ("gauge", "Horário do fim da última execução"),
+}
+
+_NULL_SPAN = contextlib.nullcontext()
+
+_lock = threading.Lock()
+_counters = {}     # (nome, labels) -> valor
+_gauges = {}       # (nome, labels) -> valor
+_histograms = {}   # (nome, labels) -> [contagens por bucket..., soma, total]
+
+_enabled = False
+_metrics_dir = None
+_pushgateway = None
+
+
+def configure(metrics_dir: str | Path | None = None, pushgateway: str | None = None) -> None:
+    """Liga as métricas se algum destino for informado (chamado no import com as variáveis de ambiente)."""
+    global _enabled, _metrics_dir, _pushgateway
+    _metrics_dir = Path(metrics_dir) if metrics_dir else None
+    _pushgateway = pushgateway.rstrip("/") if pushgateway else None
+    _enabled = _metrics_dir is not None or _pushgateway is not None
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def _key(name: str, labels: dict) -> tuple:
+    return name, tuple(sorted(labels.items()))
+
+
+def count(name: str, value: float = 1, **labels) -> None:
+    if not _enabled or not value:
+        return
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def gauge(name: str, value: float, **labels) -> None:
+    if not _enabled:
+        return
+    with _lock:
+        _gauges[_key(name, labels)] = value
+
+
+def observe(name: str, value: float, **labels) -> None:
+    if not _enabled:
+        return
+    key = _key(name, labels)
+    with _lock:
+        hist = _histograms.get(key)
+        if hist is None:
+            hist = _histograms[key] = [0] * len(DURATION_BUCKETS) + [0.0, 0]
+        for i, bound in enumerate(DURATION_BUCKETS):
+            if value <= bound:
+                hist[i] += 1
+        hist[-2] += value
+        hist[-1] += 1
+
+
+class _Span:
+    __slots__ = ("function", "name", "start")
+
+    def __init__(self, function: str, name: str):
+        self.function = function
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observe("pipeline_stage_duration_seconds", time.perf_counter() - self.start,
+                function=self.function, span=self.name)
+        return False
+
+
+def span(function: str, name: str):
+    """Mede a duração do bloco como pipeline_stage_duration_seconds{function, span}."""
+    return _Span(function, name) if _enabled else _NULL_SPAN
+
+
+def tree_size(path: Path) -> int:
+    """Bytes de um arquivo ou de um dataset (diretório); 0 se desligado, para não percorrer o disco."""
+    if not _enabled or not path.exists():
+        return 0
+    if path.is_file():
+        return path.stat().st_size
+    return sum(f.stat().st_size for f in path.rglob("*") if f.is_file())
+
+
+# --- memória ------------------------------------------------------------------
+
+def reset_peak_memory() -> None:
+    """Zera o pico de RSS do processo (Linux), para medir só a execução atual."""
+    if not _enabled:
+        return
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def _peak_rss_bytes() -> int | None:
+    """Pico de RSS do processo, ou None se a plataforma não informar."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    if resource is not None:
+        # ru_maxrss: KiB no Linux, bytes no macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+    try:
+        import psutil
+    except ImportError:
+        return None
+    # Windows: peak_wset é o pico do working set
+    info = psutil.Process().memory_info()
+    return getattr(info, "peak_wset", info.rss)
+
+
+# --- exportação ---------------------------------------------------------------
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: tuple, extra: tuple = ()) -> str:
+    items = labels + extra
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in items) + "}"
+
+
+def _number(value) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render() -> str:
+    """Todas as métricas registradas, no formato texto do Prometheus (0.0.4)."""
+    with _lock:
+        counters, gauges = dict(_counters), dict(_gauges)
+        histograms = {k: list(v) for k, v in _histograms.items()}
+
+    by_name = {}
+    for (name, labels), value in sorted(counters.items()):
+        by_name.setdefault(name, []).append(f"{name}{_format_labels(labels)} {_number(value)}")
+    for (name, labels), value in sorted(gauges.items()):
+        by_name.setdefault(name, []).append(f"{name}{_format_labels(labels)} {_number(value)}")
+    for (name, labels), hist in sorted(histograms.items()):
+        lines = by_name.setdefault(name, [])
+        for bound, n in zip(DURATION_BUCKETS, hist):
+            lines.append(f"{name}_bucket{_format_labels(labels, (('le', _number(float(bound))),))} {n}")
+        lines.append(f"{name}_bucket{_format_labels(labels, (('le', '+Inf'),))} {hist[-1]}")
+        lines.append(f"{name}_sum{_format_labels(labels)} {_number(hist[-2])}")
+        lines.append(f"{name}_count{_format_labels(labels)} {hist[-1]}")
+
+    out = []
+    for name in sorted(by_name):
+        kind, help_text = _HELP.get(name, ("untyped", name))
+        out.append(f"# HELP {name} {help_text}")
+        out.append(f"# TYPE {name} {kind}")
+        out.extend(by_name[name])
+    return "\n".join(out) + "\n"
+
+
+def export(function: str) -> None:
+    """
+    Fim da execução de uma função: registra pico de memória e horário, e publica as métricas.
+    Falhas de exportação são só registradas: nunca derrubam a execução do pipeline.
+    """
+    if not _enabled:
+        return
+    peak = _peak_rss_bytes()
+    if peak is not None:
+        gauge("pipeline_peak_rss_bytes", peak, function=function)
+    gauge("pipeline_last_run_timestamp_seconds", round(time.time(), 3), function=function)
+    body = render()
+
+    if _metrics_dir is not None:
+        try:
+            _metrics_dir.mkdir(parents=True, exist_ok=True)
+            # Gravação atômica: o coletor nunca lê um arquivo pela metade
+            path = _metrics_dir / "steam_pipeline.prom"
+            tmp = path.with_suffix(f".prom.{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_text(body, encoding="utf-8")
+            os.replace(tmp, path)
+        except OSError as e:
+            print(f"[metrics] falha ao gravar métricas de {function}: {e}")
+
+    if _pushgateway is not None:
+        url = f"{_pushgateway}/metrics/job/steam_pipeline/instance/{socket.gethostname()}"
+        request = urllib.request.Request(url, data=body.encode("utf-8"), method="PUT",
+                                         headers={"Content-Type": "text/plain; version=0.0.4"})
+        try:
+            with urllib.request.urlopen(request, timeout=5):
+                pass
+        except OSError as e:
+            print(f"[metrics] falha ao enviar métricas de {function} ao Pushgateway: {e}")
+
+
+configure(os.getenv("PIPELINE_METRICS_DIR") or None, os.getenv("PIPELINE_METRICS_PUSHGATEWAY") or None)
@@ -0,0 +1,377 @@
+# src/processing/price_history.py
+"""
+Histórico de preços por game_id, alimentado pelo Silver.
+
+O Silver guarda só o último registro de cada jogo; aqui cada observação nova é anexada
+a um log binário de registros de tamanho fixo, lido via mmap:
+
+    game_id | anterior | captured_at (µs) | final_price | original_price | desconto | categoria
+
+"anterior" é o offset do registro anterior do mesmo jogo, formando uma lista encadeada
+de trás para frente. O índice (index.bin) guarda, por game_id, o offset do registro mais
+recente, a quantidade de registros e o menor preço final já visto. Assim:
+
+- histórico de um jogo: segue a cadeia a partir do índice (só os registros do jogo);
+- menor preço histórico / último preço: direto do índice, sem ler os dados.
+
+O log é dividido em segmentos imutáveis (prices-<início>-<fim>-<hash>.dat: offsets do
+log e os primeiros bytes do SHA-256 do conteúdo): cada commit grava um segmento novo só
+com as suas observações, então o Blob Storage recebe só a cauda nova em vez do histórico
+inteiro. Segmentos pequenos do fim são fundidos até SEGMENT_BYTES (segmentos desse
+tamanho não mudam mais), o que mantém poucos arquivos sem regravar o histórico antigo.
+
+O escritor é o process_silver. Como o nome inclui o hash do conteúdo, duas instâncias
+concorrentes que gravam os mesmos offsets geram segmentos diferentes e nenhuma sobrescreve
+(nem aproveita) os bytes da outra; só o índice decide quais valem, e o índice é estado
+mutável (a segunda instância recebe StorageConflict ao publicá-lo). Arquivos fora do
+índice (gravação interrompida, segmentos já fundidos, escritor que perdeu a corrida) são
+ignorados. O prices.dat do formato anterior (índice versão 1) é lido como o primeiro
+segmento e, no primeiro commit, copiado para um segmento com nome (só a parte
+confirmada); os segmentos do índice versão 2 (nome sem hash) continuam válidos.
+"""
+import bisect
+import datetime as dt
+import hashlib
+import json
+import math
+import mmap
+import os
+import struct
+from pathlib import Path
+
+DATA_NAME = "prices.dat"  # arquivo único do formato anterior (índice versão 1)
+INDEX_NAME = "index.bin"
+CATEGORIES_NAME = "categories.json"
+SEGMENT_PREFIX = "prices-"
+
+# Tamanho a partir do qual um segmento não é mais fundido com os seguintes
+SEGMENT_BYTES = 8 * 1024 * 1024
+
+_RECORD = struct.Struct("<qqqddhh4x")   # 48 bytes por observação
+_INDEX_HEADER_V1 = struct.Struct("<8sIqq")  # magic, versão, bytes confirmados, nº de jogos
+_INDEX_HEADER = struct.Struct("<8sIqqq")    # magic, versão, bytes confirmados, nº de jogos, nº de segmentos
+_SEGMENT_ENTRY_V2 = struct.Struct("<qq")    # início, fim (offsets do log)
+_SEGMENT_ENTRY = struct.Struct("<qq8s")     # início, fim, hash do conteúdo (zerado: segmento da versão 2)
+_INDEX_ENTRY = struct.Struct("<qqqqdq")  # game_id, último offset, contagem, último ts, menor preço, offset do menor
+_MAGIC = b"PRICEIDX"
+_VERSION = 3
+_NO_DIGEST = bytes(_SEGMENT_ENTRY.size - _SEGMENT_ENTRY_V2.size)
+
+_NO_OFFSET = -1
+_NO_INT = -1
+
+
+def _to_micros(value: str) -> int | None:
+    try:
+        ts = dt.datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=dt.timezone.utc)
+    return int(round(ts.timestamp() * 1_000_000))
+
+
+def _from_micros(micros: int) -> str:
+    return (dt.datetime(1970, 1, 1, tzinfo=dt.timezone.utc) + dt.timedelta(microseconds=micros)).isoformat()
+
+
+def _float(value) -> float:
+    return float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else math.nan
+
+
+def _nullable(value: float):
+    return None if math.isnan(value) else value
+
+
+def segment_name(start: int, end: int, digest: bytes = _NO_DIGEST) -> str:
+    # Offsets com largura fixa: a ordem dos nomes é a ordem do log
+    if digest == _NO_DIGEST:
+        return f"{SEGMENT_PREFIX}{start:016d}-{end:016d}.dat"
+    return f"{SEGMENT_PREFIX}{start:016d}-{end:016d}-{digest.hex()}.dat"
+
+
+class PriceHistoryStore:
+    """
+    Série temporal de preços por game_id, só de anexação.
+
+    append() recebe registros do Silver e grava apenas observações novas: captured_at
+    posterior à última gravada para o jogo e preço/desconto/categoria diferentes dela.
+    Realimentar o mesmo Silver (ou reprocessá-lo do zero) não duplica nada; o histórico
+    guarda os pontos de mudança, e cada ponto vale até a próxima observação.
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._index = {}
+        self._categories = []
+        self._category_codes = {}
+        # Segmentos confirmados, em ordem: [início, fim, nome, hash]; mmaps abertos sob demanda
+        self._segments = []
+        self._starts = []
+        self._mmaps = {}
+        self._committed = 0
+        # Observações anexadas e ainda não confirmadas por commit()
+        self._staged = []
+        self._staged_offset = 0
+        self._load()
+
+    # --- persistência ---------------------------------------------------------
+
+    def _load(self) -> None:
+        committed = 0
+        index_path = self.root / INDEX_NAME
+        if index_path.exists():
+            raw = index_path.read_bytes()
+            magic, version = _INDEX_HEADER_V1.unpack_from(raw, 0)[:2]
+            if magic != _MAGIC or version not in (1, 2, _VERSION):
+                raise ValueError(f"índice de histórico de preços inválido: {index_path}")
+            if version == 1:
+                _, _, committed, count = _INDEX_HEADER_V1.unpack_from(raw, 0)
+                pos = _INDEX_HEADER_V1.size
+                self._segments = [[0, committed, DATA_NAME, _NO_DIGEST]] if committed else []
+            else:
+                _, _, committed, count, segments = _INDEX_HEADER.unpack_from(raw, 0)
+                pos = _INDEX_HEADER.size
+                layout = _SEGMENT_ENTRY if version == _VERSION else _SEGMENT_ENTRY_V2
+                for start, end, *digest in layout.iter_unpack(raw[pos:pos + segments * layout.size]):
+                    digest = digest[0] if digest else _NO_DIGEST
+                    self._segments.append([start, end, segment_name(start, end, digest), digest])
+                pos += segments * layout.size
+            for entry in _INDEX_ENTRY.iter_unpack(raw[pos:pos + count * _INDEX_ENTRY.size]):
+                self._index[entry[0]] = list(entry[1:])
+
+        categories_path = self.root / CATEGORIES_NAME
+        if categories_path.exists():
+            self._categories = json.loads(categories_path.read_text(encoding="utf-8"))
+            self._category_codes = {c: i for i, c in enumerate(self._categories)}
+
+        self._starts = [s[0] for s in self._segments]
+        self._committed = self._staged_offset = committed
+
+    def _map(self, name: str):
+        mm = self._mmaps.get(name)
+        if mm is None:
+            with (self.root / name).open("rb") as f:
+                mm = self._mmaps[name] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return mm
+
+    def _unmap(self) -> None:
+        for mm in self._mmaps.values():
+            mm.close()
+        self._mmaps = {}
+
+    def _save_index(self, committed: int) -> None:
+        parts = [_INDEX_HEADER.pack(_MAGIC, _VERSION, committed, len(self._index), len(self._segments))]
+        parts += [_SEGMENT_ENTRY.pack(start, end, digest) for start, end, _, digest in self._segments]
+        parts += [_INDEX_ENTRY.pack(game_id, *entry) for game_id, entry in self._index.items()]
+        tmp = self.root / (INDEX_NAME + ".tmp")
+        tmp.write_bytes(b"".join(parts))
+        os.replace(tmp, self.root / INDEX_NAME)
+
+    def _write_segment(self, start: int, end: int, chunks) -> list:
+        # Gravação atômica e com fsync: o índice só passa a apontar para o segmento depois.
+        # O nome só é conhecido no fim (hash do conteúdo)
+        sha = hashlib.sha256()
+        tmp = self.root / (segment_name(start, end) + ".tmp")
+        with tmp.open("wb") as f:
+            for chunk in chunks:
+                sha.update(chunk)
+                f.write(chunk)
+            f.flush()
+            os.fsync(f.fileno())
+        digest = sha.digest()[:len(_NO_DIGEST)]
+        name = segment_name(start, end, digest)
+        os.replace(tmp, self.root / name)
+        return [start, end, name, digest]
+
+    def _segment_chunks(self, name: str, size: int, block: int = 1024 * 1024):
+        # Só a parte confirmada (o prices.dat antigo pode ter bytes de uma gravação interrompida)
+        with (self.root / name).open("rb") as f:
+            while size > 0:
+                chunk = f.read(min(block, size))
+                if not chunk:
+                    break
+                size -= len(chunk)
+                yield chunk
+
+    def _merge_tail(self) -> list:
+        """
+        Funde os dois últimos segmentos enquanto o penúltimo não for maior que o último e a
+        fusão não passar de SEGMENT_BYTES. Retorna os nomes substituídos, a apagar depois
+        que o índice novo estiver gravado.
+        """
+        replaced = []
+        while len(self._segments) >= 2:
+            (start, mid, first, _), (_, end, second, _) = self._segments[-2:]
+            if mid - start > end - mid or end - start > SEGMENT_BYTES:
+                break
+            self._segments[-2:] = [self._write_segment(start, end, [*self._segment_chunks(first, mid - start),
+                                                                   *self._segment_chunks(second, end - mid)])]
+            replaced += [first, second]
+        return replaced
+
+    def segment_names(self) -> list:
+        """Arquivos de dados confirmados (os que precisam estar presentes para a leitura)."""
+        return [segment[2] for segment in self._segments]
+
+    def _category_code(self, category) -> int:
+        if category is None:
+            return _NO_INT
+        code = self._category_codes.get(category)
+        if code is None:
+            code = self._category_codes[category] = len(self._categories)
+            self._categories.append(category)
+        return code
+
+    # --- escrita --------------------------------------------------------------
+
+    def append(self, records, captured_at: str | None = None) -> int:
+        """
+        Prepara as observações novas dos registros do Silver; só são gravadas em commit().
+        captured_at (opcional) substitui o captured_at dos registros (ex: horário da captura Bronze).
+        Retorna quantas observações foram aceitas.
+        """
+        batch_ts = _to_micros(captured_at) if captured_at else None
+        accepted = 0
+
+        for record in records:
+            game_id = record.get("game_id")
+            ts = batch_ts or _to_micros(record.get("captured_at"))
+            if game_id is None or ts is None:
+                continue
+            entry = self._index.get(game_id)
+            if entry is not None and ts <= entry[2]:
+                continue  # observação já gravada (ou mais antiga que a última)
+
+            final_price = _float(record.get("final_price"))
+            discount = record.get("discount_percent")
+            values = (
+                final_price,
+                _float(record.get("original_price")),
+                discount if isinstance(discount, int) and not isinstance(discount, bool) else _NO_INT,
+                self._category_code(record.get("category")),
+            )
+            if entry is not None and self._same_values(values, self._read(entry[0])[3:]):
+                continue  # sem mudança de preço/desconto/categoria desde a última observação
+
+            offset = self._staged_offset
+            self._staged.append(_RECORD.pack(game_id, entry[0] if entry else _NO_OFFSET, ts, *values))
+            self._staged_offset += _RECORD.size
+            accepted += 1
+
+            if entry is None:
+                entry = self._index[game_id] = [offset, 0, ts, math.nan, _NO_OFFSET]
+            entry[0], entry[2] = offset, ts
+            entry[1] += 1
+            # Menor preço: o primeiro a atingir o valor é mantido (empates não trocam)
+            if not math.isnan(final_price) and (math.isnan(entry[3]) or final_price < entry[3]):
+                entry[3], entry[4] = final_price, offset
+
+        return accepted
+
+    def commit(self) -> int:
+        """
+        Grava as observações preparadas num segmento novo. Retorna quantas foram gravadas.
+        Os segmentos substituídos por fusão são apagados; segment_names() antes e depois do
+        commit diz o que enviar e o que remover do armazenamento.
+        """
+        if not self._staged:
+            return 0
+
+        tmp = self.root / (CATEGORIES_NAME + ".tmp")
+        tmp.write_text(json.dumps(self._categories, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, self.root / CATEGORIES_NAME)
+
+        # Dados primeiro (com fsync), índice depois: o índice nunca aponta para dados ausentes
+        self._unmap()
+        replaced = []
+        if self._segments and self._segments[0][2] == DATA_NAME:
+            # Formato anterior: o prices.dat vira o primeiro segmento (o índice novo não o referencia)
+            start, end = self._segments[0][:2]
+            self._segments[0] = self._write_segment(start, end, self._segment_chunks(DATA_NAME, end - start))
+            replaced.append(DATA_NAME)
+        self._segments.append(self._write_segment(self._committed, self._staged_offset, self._staged))
+        replaced += self._merge_tail()
+        self._save_index(self._staged_offset)
+        for old in replaced:
+            if old not in self.segment_names():
+                (self.root / old).unlink(missing_ok=True)
+
+        written = len(self._staged)
+        self._staged = []
+        self._starts = [s[0] for s in self._segments]
+        self._committed = self._staged_offset
+        return written
+
+    @staticmethod
+    def _same_values(a: tuple, b: tuple) -> bool:
+        # NaN (preço ausente) é tratado como igual a NaN
+        return all(x == y or (x != x and y != y) for x, y in zip(a, b))
+
+    # --- consultas ------------------------------------------------------------
+
+    def _read(self, offset: int) -> tuple:
+        committed = self._committed
+        if offset >= committed:
+            # Observação preparada e ainda não gravada
+            return _RECORD.unpack(self._staged[(offset - committed) // _RECORD.size])
+        start, _, name, _ = self._segments[bisect.bisect_right(self._starts, offset) - 1]
+        return _RECORD.unpack_from(self._map(name), offset - start)
+
+    def _as_dict(self, row: tuple) -> dict:
+        _, _, ts, final_price, original_price, discount, category = row
+        return {
+            "captured_at": _from_micros(ts),
+            "final_price": _nullable(final_price),
+            "original_price": _nullable(original_price),
+            "discount_percent": None if discount == _NO_INT else discount,
+            "category": None if category == _NO_INT else self._categories[category],
+        }
+
+    def history(self, game_id: int, start: str | None = None, end: str | None = None) -> list:
+        """Observações do jogo em ordem cronológica, opcionalmente restritas a [start, end]."""
+        entry = self._index.get(game_id)
+        if entry is None:
+            return []
+        start_ts = _to_micros(start) if start else None
+        end_ts = _to_micros(end) if end else None
+
+        rows = []
+        offset = entry[0]
+        while offset != _NO_OFFSET:
+            row = self._read(offset)
+            ts = row[2]
+            if start_ts is not None and ts < start_ts:
+                break  # a cadeia vai do mais recente ao mais antigo
+            if end_ts is None or ts <= end_ts:
+                rows.append(self._as_dict(row))
+            offset = row[1]
+        rows.reverse()
+        return rows
+
+    def all_time_low(self, game_id: int) -> dict | None:
+        """Menor preço final já observado (e quando), direto do índice."""
+        entry = self._index.get(game_id)
+        if entry is None or entry[4] == _NO_OFFSET:
+            return None
+        return self._as_dict(self._read(entry[4]))
+
+    def latest(self, game_id: int) -> dict | None:
+        entry = self._index.get(game_id)
+        return self._as_dict(self._read(entry[0])) if entry else None
+
+    def observations(self, game_id: int) -> int:
+        entry = self._index.get(game_id)
+        return entry[1] if entry else 0
+
+    def game_ids(self) -> list:
+        return list(self._index)
+
+    def __len__(self):
+        # Observações confirmadas
+        return self._committed // _RECORD.size
+
+    def close(self):
+        # Observações não confirmadas com commit() são descartadas
+        self._unmap()
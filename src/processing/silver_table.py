@@ -0,0 +1,390 @@
+# src/processing/silver_table.py
+"""
+Tabela Silver transacional, no estilo do Delta Lake (src/processing/silver/featured_table).
+
+    featured_table/
+      _log/00000000000000000000.json               um commit por versão
+      _log/00000000000000000010.checkpoint.json    arquivos ativos (a cada CHECKPOINT_INTERVAL)
+      capture_date=2025-12-11/category=specials/part-00003-<id>.parquet
+
+- Commit atômico: a versão N passa a existir quando _log/N.json é criado, e só um escritor
+  consegue criá-lo (link exclusivo no disco, criação condicional no Blob). Quem perde a
+  corrida grava de novo como N+1. Arquivos de dados fora do log nunca são lidos, então um
+  leitor sempre enxerga um snapshot consistente.
+- MERGE por game_id: cada commit grava só os registros novos (custo proporcional a eles).
+  A leitura resolve as versões de cada jogo: vence o maior captured_at e, no empate, a
+  versão de commit mais recente (coluna _version, gravada junto com os dados).
+- Snapshots: snapshot(version=...) ou snapshot(timestamp=...) leem a tabela como estava.
+- compact() reescreve as partições com vários arquivos ou com registros já superados;
+  vacuum() apaga os arquivos que saíram do log há mais de retention_hours (versões mais
+  antigas que isso deixam de poder ser lidas).
+"""
+import datetime as dt
+import json
+import os
+import uuid
+from collections import Counter, namedtuple
+from pathlib import Path
+
+from src.processing import formats
+from src.processing import storage as layer_storage
+
+TABLE_NAME = "silver_featured"
+LOG_DIR = "_log"
+VERSION_COLUMN = "_version"
+CHECKPOINT_INTERVAL = 10
+COMMIT_RETRIES = 5
+DEFAULT_RETENTION_HOURS = 7 * 24
+
+MERGE = "merge"
+OVERWRITE = "overwrite"
+COMPACT = "compact"
+
+# files: {caminho relativo à tabela: entrada "add" do commit que o incluiu}
+# data_version: último commit que mudou dados (compactação não muda)
+Snapshot = namedtuple("Snapshot", ["version", "timestamp", "data_version", "files"])
+
+
+class CommitConflict(layer_storage.StorageConflict):
+    """Outro escritor criou a mesma versão primeiro."""
+
+
+def version_name(version: int) -> str:
+    # Nome publicado em silver-published: "silver_featured@v12"
+    return f"{TABLE_NAME}@v{version}"
+
+
+def parse_version_name(name) -> int | None:
+    prefix = f"{TABLE_NAME}@v"
+    if isinstance(name, str) and name.startswith(prefix) and name[len(prefix):].isdigit():
+        return int(name[len(prefix):])
+    return None
+
+
+def _now_iso() -> str:
+    return dt.datetime.now(dt.timezone.utc).isoformat()
+
+
+def _parse_time(value) -> dt.datetime:
+    if not isinstance(value, dt.datetime):
+        value = dt.datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    return value if value.tzinfo else value.replace(tzinfo=dt.timezone.utc)
+
+
+class SilverTable:
+    """
+    Tabela sobre o armazenamento das camadas (store: LocalStorage ou BlobStorage).
+    Sem store, a tabela fica só no disco local, em root.
+    """
+
+    def __init__(self, root: Path, store=None, key_field: str = "game_id", time_field: str = "captured_at",
+                 partitioning=formats.SILVER_PARTITIONING):
+        self.root = Path(root)
+        self.store = store or layer_storage.LocalStorage(self.root)
+        self.key_field = key_field
+        self.time_field = time_field
+        self.partitioning = partitioning
+
+    def _key(self, relative: str) -> str:
+        return self.store.key(self.root / relative)
+
+    @staticmethod
+    def _log_name(version: int, checkpoint: bool = False) -> str:
+        return f"{LOG_DIR}/{version:020d}{'.checkpoint' if checkpoint else ''}.json"
+
+    # --- log ------------------------------------------------------------------
+
+    def _log_versions(self) -> tuple:
+        """(versões com commit, versões com checkpoint), em ordem crescente."""
+        commits, checkpoints = [], []
+        for key in self.store.list(self._key(LOG_DIR) + "/"):
+            stem, _, ext = key.rsplit("/", 1)[-1].partition(".")
+            if not stem.isdigit():
+                continue
+            if ext == "json":
+                commits.append(int(stem))
+            elif ext == "checkpoint.json":
+                checkpoints.append(int(stem))
+        return sorted(commits), sorted(checkpoints)
+
+    def _read_log(self, names: list) -> list:
+        # Arquivos do log são imutáveis: no Blob, só os que não estão no cache são baixados
+        self.store.fetch_many(self._key(n) for n in names)
+        entries = []
+        for name in names:
+            with (self.root / name).open("r", encoding="utf-8") as f:
+                entries.append(json.load(f))
+        return entries
+
+    def exists(self) -> bool:
+        return bool(self._log_versions()[0])
+
+    def history(self) -> list:
+        """Commits da tabela (sem as listas de arquivos), do mais antigo ao mais novo."""
+        commits, _ = self._log_versions()
+        history = []
+        for commit in self._read_log([self._log_name(v) for v in commits]):
+            entry = {k: v for k, v in commit.items() if k not in ("add", "remove")}
+            entry.update(added=len(commit["add"]), removed=len(commit["remove"]))
+            history.append(entry)
+        return history
+
+    def snapshot(self, version: int | None = None, timestamp=None) -> Snapshot:
+        """
+        Estado da tabela na versão pedida, no último commit até timestamp, ou no mais recente.
+        Parte do último checkpoint anterior e aplica só os commits seguintes.
+        """
+        commits, checkpoints = self._log_versions()
+        if not commits:
+            if version is not None or timestamp is not None:
+                raise ValueError("a tabela Silver ainda não tem versões")
+            return Snapshot(-1, None, -1, {})
+
+        if timestamp is not None:
+            limit = _parse_time(timestamp)
+            eligible = [c["version"] for c in self._read_log([self._log_name(v) for v in commits])
+                        if _parse_time(c["timestamp"]) <= limit]
+            if not eligible:
+                raise ValueError(f"nenhuma versão da tabela Silver até {timestamp}")
+            version = eligible[-1]
+        if version is None:
+            version = commits[-1]
+        if version not in commits:
+            raise ValueError(f"versão {version} da tabela Silver não existe")
+
+        files, data_version, timestamp = {}, -1, None
+        base = max((c for c in checkpoints if c <= version), default=None)
+        if base is not None:
+            checkpoint = self._read_log([self._log_name(base, checkpoint=True)])[0]
+            files, data_version, timestamp = checkpoint["files"], checkpoint["data_version"], checkpoint["timestamp"]
+
+        start = -1 if base is None else base
+        for commit in self._read_log([self._log_name(v) for v in commits if start < v <= version]):
+            for path in commit["remove"]:
+                files.pop(path, None)
+            for entry in commit["add"]:
+                files[entry["path"]] = entry
+            if commit["operation"] != COMPACT:
+                data_version = commit["version"]
+            timestamp = commit["timestamp"]
+        return Snapshot(version, timestamp, data_version, files)
+
+    def _commit(self, version: int, operation: str, add: list, remove: list, **info) -> dict:
+        commit = {"version": version, "timestamp": _now_iso(), "operation": operation, **info,
+                  "add": add, "remove": remove}
+        name = self._log_name(version)
+        key = self._key(name)
+        # fetch mutável: no Blob, o put abaixo só cria o blob se ele ainda não existir
+        if self.store.fetch(key, mutable=True) is not None:
+            raise CommitConflict(f"versão {version} da tabela Silver já existe")
+
+        path = self.root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+        tmp.write_text(json.dumps(commit, ensure_ascii=False), encoding="utf-8")
+        try:
+            # Link exclusivo: falha se outro escritor criou a versão no meio do caminho
+            os.link(tmp, path)
+        except FileExistsError:
+            raise CommitConflict(f"versão {version} da tabela Silver já existe")
+        finally:
+            tmp.unlink()
+        try:
+            self.store.put(key)
+        except layer_storage.StorageConflict:
+            path.unlink(missing_ok=True)
+            raise CommitConflict(f"versão {version} da tabela Silver foi criada por outra instância")
+
+        if version and version % CHECKPOINT_INTERVAL == 0:
+            self._write_checkpoint(version)
+        return commit
+
+    def _write_checkpoint(self, version: int) -> None:
+        snapshot = self.snapshot(version)
+        path = self.root / self._log_name(version, checkpoint=True)
+        tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+        tmp.write_text(json.dumps(snapshot._asdict(), ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, path)
+        self.store.put(self._key(self._log_name(version, checkpoint=True)), if_absent=True)
+
+    # --- dados ----------------------------------------------------------------
+
+    def _write_files(self, rows: list, version: int, stamp: bool = False) -> list:
+        """
+        Grava os registros em um arquivo novo por partição; retorna as entradas add.
+        stamp=True grava _version = version em todas as linhas (sem copiar os registros);
+        senão os registros já trazem a própria _version (compactação).
+        """
+        fmt = formats.get_format()
+        columns = list(dict.fromkeys(key for r in rows for key in r))
+        constants = {VERSION_COLUMN: version} if stamp else None
+        if stamp and VERSION_COLUMN not in columns:
+            columns.append(VERSION_COLUMN)
+        partitions = {}
+        for record in rows:
+            partitions.setdefault(formats.partition_dir(self.partitioning, record), []).append(record)
+
+        token = uuid.uuid4().hex[:12]
+        add = []
+        for partition, part_rows in sorted(partitions.items()):
+            relative = f"{partition}/" if partition else ""
+            relative += f"part-{version:05d}-{token}{fmt.extension}"
+            path = self.root / relative
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f".{path.name}.tmp")
+            fmt.write(tmp, part_rows, columns, constants)
+            os.replace(tmp, path)
+            times = [r[self.time_field] for r in part_rows if r.get(self.time_field) is not None]
+            add.append({"path": relative, "partition": partition, "version": version, "rows": len(part_rows),
+                        "min_time": min(times, default=None), "max_time": max(times, default=None),
+                        "bytes": path.stat().st_size})
+        self.store.put_many([self._key(a["path"]) for a in add], if_absent=True)
+        return add
+
+    def _delete_files(self, paths) -> None:
+        for path in paths:
+            self.store.delete(self._key(path))
+
+    def files(self, snapshot: Snapshot | None = None, start: str | None = None, end: str | None = None) -> list:
+        """
+        Entradas add do snapshot cujo intervalo de captura cruza [start, end], na ordem dos
+        commits (mesma regra de Catalog.partitions: end é comparado como prefixo).
+        """
+        snapshot = snapshot or self.snapshot()
+        selected = []
+        for entry in snapshot.files.values():
+            if start is not None and (entry["max_time"] is None or entry["max_time"] < start):
+                continue
+            if end is not None and (entry["min_time"] is None or entry["min_time"][:len(end)] > end):
+                continue
+            selected.append(entry)
+        return sorted(selected, key=lambda e: (e["version"], e["path"]))
+
+    def _resolve(self, entries: list, columns=None) -> dict:
+        """{game_id: (ordem, registro, arquivo)} com a versão vencedora de cada jogo."""
+        self.store.fetch_many(self._key(e["path"]) for e in entries)
+        wanted = None if columns is None else list(dict.fromkeys(
+            [*columns, self.key_field, self.time_field, VERSION_COLUMN]))
+        best = {}
+        for entry in entries:
+            for record in formats.read_files([self.root / entry["path"]], wanted):
+                key = record.get(self.key_field)
+                if key is None:
+                    continue
+                rank = (record.get(self.time_field) or "", record.get(VERSION_COLUMN) or 0)
+                current = best.get(key)
+                if current is None or rank >= current[0]:
+                    best[key] = (rank, record, entry["path"])
+        return best
+
+    def read(self, snapshot: Snapshot | None = None, columns=None, start: str | None = None,
+             end: str | None = None) -> list:
+        """Registros do snapshot (o mais recente, se omitido), um por game_id."""
+        records = []
+        for _, record, _ in self._resolve(self.files(snapshot, start, end), columns).values():
+            record.pop(VERSION_COLUMN, None)
+            records.append(record if columns is None else {c: record.get(c) for c in columns})
+        return records
+
+    # --- escrita --------------------------------------------------------------
+
+    def merge(self, records, **info) -> dict | None:
+        """
+        MERGE por game_id: grava os registros como uma nova versão. Dentro do lote vence o
+        maior captured_at (empate: a última ocorrência); contra a tabela, a regra é aplicada
+        na leitura. Retorna o commit, ou None se não havia registros.
+        """
+        return self._write_commit(MERGE, records, info)
+
+    def overwrite(self, records, **info) -> dict:
+        """Substitui todo o conteúdo da tabela (reprocessamento completo) numa única versão."""
+        return self._write_commit(OVERWRITE, records, info)
+
+    def _write_commit(self, operation: str, records, info: dict) -> dict | None:
+        latest = {}
+        for record in records:
+            key = record.get(self.key_field)
+            if key is None:
+                continue
+            current = latest.get(key)
+            if current is None or (record.get(self.time_field) or "") >= (current.get(self.time_field) or ""):
+                latest[key] = record
+        if not latest and operation == MERGE:
+            return None
+
+        for _ in range(COMMIT_RETRIES):
+            snapshot = self.snapshot()
+            version = snapshot.version + 1
+            add = self._write_files(list(latest.values()), version, stamp=True)
+            remove = sorted(snapshot.files) if operation == OVERWRITE else []
+            try:
+                return self._commit(version, operation, add, remove, rows=len(latest), **info)
+            except CommitConflict:
+                # Os arquivos levam a versão nos dados: regrava como a próxima
+                self._delete_files(a["path"] for a in add)
+        raise CommitConflict(f"não foi possível gravar na tabela Silver após {COMMIT_RETRIES} tentativas")
+
+    def compact(self) -> dict | None:
+        """
+        Reescreve as partições com mais de um arquivo ou com registros já superados por
+        versões mais novas: um arquivo por partição, só com os registros vigentes (com a
+        _version original). Leitores de versões anteriores não são afetados.
+        Retorna o commit, ou None se não havia nada a compactar.
+        """
+        snapshot = self.snapshot()
+        entries = self.files(snapshot)
+        best = self._resolve(entries)
+        live = Counter(path for _, _, path in best.values())
+
+        by_partition = {}
+        for entry in entries:
+            by_partition.setdefault(entry["partition"], []).append(entry)
+        targets = {partition for partition, group in by_partition.items()
+                   if len(group) > 1 or any(live[e["path"]] < e["rows"] for e in group)}
+        if not targets:
+            return None
+
+        remove = sorted(e["path"] for e in entries if e["partition"] in targets)
+        rows = [record for _, record, path in best.values() if snapshot.files[path]["partition"] in targets]
+        version = snapshot.version + 1
+        add = self._write_files(rows, version) if rows else []
+
+        for _ in range(COMMIT_RETRIES):
+            try:
+                return self._commit(version, COMPACT, add, remove, rows=len(rows))
+            except CommitConflict:
+                current = self.snapshot()
+                if any(path not in current.files for path in remove):
+                    # Outra compactação já reescreveu essas partições
+                    break
+                version = current.version + 1
+                for entry in add:
+                    entry["version"] = version
+        self._delete_files(a["path"] for a in add)
+        return None
+
+    def vacuum(self, retention_hours: float = DEFAULT_RETENTION_HOURS, now=None) -> list:
+        """
+        Apaga os arquivos removidos do log (por compactação ou overwrite) há mais de
+        retention_hours e, no disco local, arquivos de dados que nunca entraram num commit
+        (escritas interrompidas) mais antigos que isso. Retorna os caminhos apagados.
+        """
+        cutoff = _parse_time(now or _now_iso()) - dt.timedelta(hours=retention_hours)
+        commits, _ = self._log_versions()
+        removed_at, referenced = {}, set()
+        for commit in self._read_log([self._log_name(v) for v in commits]):
+            for path in commit["remove"]:
+                removed_at[path] = commit["timestamp"]
+            for entry in commit["add"]:
+                removed_at.pop(entry["path"], None)
+                referenced.add(entry["path"])
+
+        doomed = [path for path, ts in removed_at.items() if _parse_time(ts) < cutoff]
+        if self.store.kind == "local" and self.root.exists():
+            for path in self.root.rglob("part-*"):
+                relative = path.relative_to(self.root).as_posix()
+                mtime = dt.datetime.fromtimestamp(path.stat().st_mtime, dt.timezone.utc)
+                if relative not in referenced and mtime < cutoff:
+                    doomed.append(relative)
+        self._delete_files(doomed)
+        return sorted(doomed)
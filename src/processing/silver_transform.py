@@ -0,0 +1,117 @@
+# src/processing/silver_transform.py
+"""
+Transformação Bronze -> Silver de um arquivo de captura.
+
+As funções deste módulo não dependem do Azure Functions e podem rodar em processos
+separados (ProcessPoolExecutor): cada arquivo Bronze é lido, normalizado, validado e
+desduplicado localmente, e os resultados são mesclados na ordem dos arquivos.
+"""
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice, repeat
+from pathlib import Path
+
+from src.collectors.steam import parser
+from src.processing import bronze_store
+from src.collectors.steam.Schemas.record import GameRecord
+from src.collectors.steam.Schemas.validator import FEATURED_GAME_VALIDATOR
+
+# Quantidade de jogos validados por vez (limita a memória usada pelo lote em colunas)
+VALIDATION_BATCH_SIZE = 5000
+
+# Arquivos Bronze enviados a cada worker por tarefa no modo paralelo
+DEFAULT_CHUNK_SIZE = 4
+
+if tuple(FEATURED_GAME_VALIDATOR.fields) != GameRecord._fields:
+    raise ImportError("GameRecord e o validador divergem na ordem dos campos do schema")
+
+
+def _merge_batch(games: list, unique_games: dict, metadata: dict, errors: Counter, stats: Counter) -> None:
+    # Valida o lote em colunas; os metadados são iguais para todo o arquivo Bronze
+    batch = FEATURED_GAME_VALIDATOR.validate_batch(games, constants=metadata)
+    errors.update(batch.errors)
+    stats["records"] += len(games)
+    stats["rejected"] += batch.rejected
+
+    # As colunas vêm na ordem do schema, a mesma dos campos do GameRecord (registro com
+    # __slots__, bem menor que um dict por jogo)
+    for row in zip(*batch.columns.values()):
+        # row[0] é o game_id. Isso desduplica: se o jogo já estiver no dict, ele será sobrescrito.
+        if row[0]:
+            unique_games[row[0]] = GameRecord(*row)
+
+
+def process_bronze_file(bf: Path, normalized_ts: str, captured_at: str | None = None):
+    """
+    Lê um arquivo Bronze e retorna (ok, jogos, erros, contagens):
+    - jogos: {game_id: GameRecord validado}, desduplicado dentro do arquivo (última ocorrência vence)
+    - erros: Counter de valores descartados na validação, por campo
+    - contagens: Counter com records (jogos lidos), rejected (sem game_id válido) e bytes (do arquivo)
+    - ok: False se o arquivo não pôde ser processado (jogos lidos até o erro são mantidos)
+    captured_at (opcional, ex: horário da captura Bronze no backfill) substitui normalized_ts
+    no captured_at dos registros.
+    """
+    # Metadados adicionados pelo pipeline: os mesmos para todos os jogos do arquivo
+    metadata = {
+        "source": "steam",
+        "endpoint": "featuredcategories",
+        "captured_at": captured_at or normalized_ts,
+        "normalized_at": normalized_ts,
+    }
+    unique_games = {}
+    errors = Counter()
+    stats = Counter()
+
+    try:
+        stats["bytes"] = bf.stat().st_size
+        # Leitura em streaming: um jogo normalizado por vez, sem carregar o payload inteiro
+        # (objetos endereçados por conteúdo são descomprimidos em streaming)
+        with bronze_store.open_text(bf) as fp:
+            games = parser.iter_featured_games(fp)
+            while True:
+                batch = []
+                for category_name, game in islice(games, VALIDATION_BATCH_SIZE):
+                    game["category"] = category_name
+                    batch.append(game)
+                if not batch:
+                    break
+                _merge_batch(batch, unique_games, metadata, errors, stats)
+
+    except Exception as e:
+        print(f"[process_silver] error reading or parsing {bf}: {e}")
+        return False, unique_games, errors, stats
+
+    return True, unique_games, errors, stats
+
+
+def iter_processed_files(bronze_files: list, normalized_ts: str, workers: int = 1,
+                         chunk_size: int = DEFAULT_CHUNK_SIZE, captured_at: list | None = None):
+    """
+    Gera (arquivo, ok, jogos, erros, contagens) para cada arquivo Bronze, SEMPRE na ordem recebida.
+
+    captured_at (opcional): o horário de captura de cada arquivo, na mesma ordem
+    (bronze_store.capture_time); sem ele, os registros recebem normalized_ts.
+    workers <= 1 processa em série no processo atual. Com workers > 1 os arquivos são
+    distribuídos em blocos de chunk_size para um ProcessPoolExecutor; como os resultados
+    voltam na ordem original, a mesclagem é determinística e igual à do modo serial.
+    """
+    captured_at = captured_at if captured_at is not None else [None] * len(bronze_files)
+    if workers <= 1 or len(bronze_files) <= 1:
+        for bf, file_captured_at in zip(bronze_files, captured_at):
+            yield (bf, *process_bronze_file(bf, normalized_ts, file_captured_at))
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(process_bronze_file, bronze_files, repeat(normalized_ts), captured_at,
+                               chunksize=max(1, chunk_size))
+        for bf, result in zip(bronze_files, results):
+            yield (bf, *result)
+
+
+def merge_games(unique_games_dict: dict, file_games: dict) -> None:
+    """
+    Mescla os jogos de um arquivo no estado desduplicado. Aplicado na ordem dos arquivos
+    (ordem de captura), o último arquivo vence para cada game_id e a ordem das chaves
+    é a da primeira ocorrência, exatamente como no processamento serial.
+    """
+    unique_games_dict.update(file_games)
@@ -0,0 +1,399 @@
+# src/processing/storage.py
+"""
+Armazenamento das camadas do pipeline: sistema de arquivos local ou Azure Blob Storage.
+
+As etapas continuam lendo e gravando arquivos locais (mmap, SQLite, datasets
+particionados), a partir de uma raiz de trabalho; as chaves são os caminhos relativos a
+essa raiz ("src/processing/silver/featured_table/..."), os mesmos guardados no
+catálogo de partições.
+
+- LocalStorage: a raiz de trabalho é a raiz do projeto; fetch/put não fazem nada.
+- BlobStorage: a raiz de trabalho é um diretório local (PIPELINE_CACHE_DIR) que funciona
+  como cache de leitura limitado por tamanho (LRU). fetch() baixa o blob só se ele não
+  estiver no cache; put() envia o arquivo local (em blocos paralelos, se for grande).
+
+Arquivos de estado (manifesto, catálogo, índice Bronze, histórico de preços...) são
+mutáveis: fetch(mutable=True) revalida pelo ETag, e put() só grava se o blob não mudou
+desde a leitura. Se outra instância gravou antes, put() levanta StorageConflict e a
+execução falha (a fila tenta de novo com o estado atualizado).
+
+Configuração: PIPELINE_STORAGE=local|blob, PIPELINE_BLOB_CONNECTION (padrão:
+AzureWebJobsStorage, ou o Azurite), PIPELINE_BLOB_CONTAINER, PIPELINE_CACHE_DIR,
+PIPELINE_CACHE_MB e PIPELINE_UPLOAD_CONCURRENCY.
+"""
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Chaves das camadas e dos arquivos de estado (relativas à raiz do projeto)
+BRONZE = "src/processing/bronze"
+SILVER = "src/processing/silver"
+SILVER_TABLE = f"{SILVER}/featured_table"
+GOLD = "gold_output"
+GOLD_CDC_STATE = f"{GOLD}/_cdc_state.json"
+GOLD_VIEWS = f"{GOLD}/_views.sqlite"
+CATALOG = "src/processing/_catalog.sqlite"
+PRICES = "src/processing/prices"
+BACKFILL = "src/processing/_backfill"
+DEAD_LETTERS = "src/processing/_dead_letters"
+METADATA_CACHE = "src/processing/cache/app_metadata.sqlite"
+
+DEFAULT_CONTAINER = "steam-pipeline"
+DEFAULT_CACHE_MB = 512
+DEFAULT_UPLOAD_CONCURRENCY = 4
+# Acima de BLOCK_SIZE o SDK divide o upload em blocos, enviados em paralelo
+BLOCK_SIZE = 4 * 1024 * 1024
+
+
+class StorageConflict(RuntimeError):
+    """O blob de estado foi alterado por outra instância desde a leitura."""
+
+
+class LocalStorage:
+    """Camadas no sistema de arquivos local (desenvolvimento e instância única)."""
+
+    kind = "local"
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+
+    def local_path(self, key: str = "") -> Path:
+        return self.root / key if key else self.root
+
+    def key(self, path: Path) -> str:
+        return Path(os.path.relpath(path, self.root)).as_posix()
+
+    def fetch(self, key: str, mutable: bool = False) -> Path | None:
+        path = self.local_path(key)
+        return path if path.exists() else None
+
+    def fetch_many(self, keys) -> list:
+        return [self.fetch(k) for k in keys]
+
+    def fetch_prefix(self, prefix: str) -> list:
+        return self.fetch_many(self.list(prefix))
+
+    def list(self, prefix: str) -> list:
+        """Chaves dos arquivos sob o prefixo (prefixo de diretório ou de nome de arquivo)."""
+        base = self.local_path(prefix)
+        if base.is_dir():
+            return sorted(self.key(p) for p in base.rglob("*") if p.is_file())
+        if base.is_file():
+            return [prefix]
+        parent = base.parent
+        if not parent.is_dir():
+            return []
+        keys = []
+        for child in parent.glob(base.name + "*"):
+            keys += [self.key(p) for p in child.rglob("*") if p.is_file()] if child.is_dir() else [self.key(child)]
+        return sorted(keys)
+
+    def list_children(self, prefix: str) -> list:
+        """Nomes imediatamente abaixo do diretório prefix (sem percorrer as partições)."""
+        base = self.local_path(prefix)
+        return sorted(p.name for p in base.iterdir()) if base.is_dir() else []
+
+    def put(self, key: str, if_absent: bool = False) -> None:
+        # O arquivo já está no lugar definitivo
+        pass
+
+    def put_many(self, keys, if_absent: bool = False) -> None:
+        pass
+
+    def put_tree(self, prefix: str) -> None:
+        pass
+
+    def delete(self, key: str) -> None:
+        try:
+            self.local_path(key).unlink()
+        except FileNotFoundError:
+            pass
+
+    def close(self) -> None:
+        pass
+
+
+class _ReadThroughCache:
+    """
+    Índice LRU dos arquivos da raiz de trabalho, limitado a max_bytes.
+    Arquivos em uso na execução atual (pinned) não são removidos; o limite pode ser
+    excedido enquanto isso, e é restabelecido no fim da execução (trim).
+    Cada entrada guarda o ETag do blob e o mtime da cópia local: uma cópia alterada
+    localmente e não enviada (execução que falhou) não é confundida com a do servidor.
+    """
+
+    def __init__(self, root: Path, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()   # chave -> (tamanho, etag, mtime_ns)
+        self._size = 0
+        self._lock = threading.Lock()
+        # Reaproveita o que já estava no disco (instância reiniciada), do mais antigo ao mais novo
+        files = [p for p in root.rglob("*") if p.is_file() and not p.name.endswith(".tmp")] if root.exists() else []
+        for path in sorted(files, key=lambda p: p.stat().st_mtime):
+            self._add(path.relative_to(root).as_posix(), None)
+
+    def _add(self, key: str, etag) -> None:
+        st = (self.root / key).stat()
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._size -= old[0]
+        self._entries[key] = (st.st_size, etag, st.st_mtime_ns)
+        self._size += st.st_size
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or not (self.root / key).exists():
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def is_clean(self, key: str, entry) -> bool:
+        st = (self.root / key).stat()
+        return (st.st_size, st.st_mtime_ns) == (entry[0], entry[2])
+
+    def add(self, key: str, etag, pinned=()) -> None:
+        with self._lock:
+            self._add(key, etag)
+            self._evict(set(pinned) | {key})
+
+    def trim(self) -> None:
+        with self._lock:
+            self._evict(set())
+
+    def discard(self, key: str) -> None:
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._size -= entry[0]
+            try:
+                (self.root / key).unlink()
+            except FileNotFoundError:
+                pass
+
+    def _evict(self, pinned: set) -> None:
+        for key in list(self._entries):
+            if self._size <= self.max_bytes:
+                break
+            if key in pinned:
+                continue
+            self._size -= self._entries.pop(key)[0]
+            try:
+                (self.root / key).unlink()
+            except FileNotFoundError:
+                pass
+
+
+_SERVICE_CLIENTS = {}
+_SERVICE_LOCK = threading.Lock()
+
+
+def _service_client(connection_string: str):
+    """Um BlobServiceClient por processo e conexão: o pool de conexões HTTP é reaproveitado."""
+    from azure.storage.blob import BlobServiceClient
+
+    with _SERVICE_LOCK:
+        client = _SERVICE_CLIENTS.get(connection_string)
+        if client is None:
+            client = _SERVICE_CLIENTS[connection_string] = BlobServiceClient.from_connection_string(
+                connection_string, max_block_size=BLOCK_SIZE, max_single_put_size=BLOCK_SIZE)
+        return client
+
+
+class BlobStorage:
+    """Camadas num container do Azure Blob Storage (ou Azurite), com cache local de leitura."""
+
+    kind = "blob"
+
+    def __init__(self, container_client, work_dir: Path, cache_bytes: int = DEFAULT_CACHE_MB * 1024 * 1024,
+                 upload_concurrency: int = DEFAULT_UPLOAD_CONCURRENCY):
+        self.container = container_client
+        self.root = Path(work_dir)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.upload_concurrency = upload_concurrency
+        self._cache = _ReadThroughCache(self.root, cache_bytes)
+        # ETag lido de cada arquivo de estado (put condicional)
+        self._etags = {}
+        # Chaves lidas/gravadas na execução atual: não saem do cache até close()
+        self._pinned = set()
+
+    @classmethod
+    def from_connection_string(cls, connection_string: str, container: str, work_dir: Path, **kwargs):
+        container_client = _service_client(connection_string).get_container_client(container)
+        if not container_client.exists():
+            container_client.create_container()
+        return cls(container_client, work_dir, **kwargs)
+
+    def local_path(self, key: str = "") -> Path:
+        return self.root / key if key else self.root
+
+    def key(self, path: Path) -> str:
+        return Path(os.path.relpath(path, self.root)).as_posix()
+
+    # --- leitura --------------------------------------------------------------
+
+    def _download(self, key: str, etag=None) -> Path | None:
+        from azure.core import MatchConditions
+        from azure.core.exceptions import ResourceNotFoundError, ResourceNotModifiedError
+
+        path = self.local_path(key)
+        blob = self.container.get_blob_client(key)
+        try:
+            if etag is not None:
+                # Só baixa se mudou (304 -> ResourceNotModifiedError)
+                stream = blob.download_blob(etag=etag, match_condition=MatchConditions.IfModified,
+                                            max_concurrency=self.upload_concurrency)
+            else:
+                stream = blob.download_blob(max_concurrency=self.upload_concurrency)
+        except ResourceNotModifiedError:
+            return path
+        except ResourceNotFoundError:
+            if path.exists():
+                path.unlink()
+            return None
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        with tmp.open("wb") as f:
+            stream.readinto(f)
+        os.replace(tmp, path)
+        self._cache.add(key, stream.properties.etag, pinned=self._pinned)
+        return path
+
+    def fetch(self, key: str, mutable: bool = False) -> Path | None:
+        """
+        Caminho local da chave, baixando o blob se não estiver no cache.
+        Chaves imutáveis (objetos Bronze, partições) são servidas do cache sem acessar a rede;
+        as mutáveis são revalidadas pelo ETag. Retorna None se o blob não existir.
+        """
+        self._pinned.add(key)
+        cached = self._cache.get(key)
+        if cached is not None and not mutable:
+            return self.local_path(key)
+        etag = cached[1] if cached is not None and self._cache.is_clean(key, cached) else None
+        path = self._download(key, etag=etag)
+        if mutable:
+            entry = self._cache.get(key) if path is not None else None
+            self._etags[key] = entry[1] if entry else None
+        return path
+
+    def fetch_many(self, keys) -> list:
+        """Baixa as chaves em paralelo."""
+        keys = list(keys)
+        self._pinned.update(keys)     # antes das threads: o conjunto não muda durante o lote
+        with ThreadPoolExecutor(max_workers=self.upload_concurrency) as pool:
+            return list(pool.map(self.fetch, keys))
+
+    def fetch_prefix(self, prefix: str) -> list:
+        return self.fetch_many(self.list(prefix))
+
+    def list(self, prefix: str) -> list:
+        # Listagem paginada pelo servidor, já filtrada pelo prefixo
+        return sorted(self.container.list_blob_names(name_starts_with=prefix, results_per_page=5000))
+
+    def list_children(self, prefix: str) -> list:
+        """Nomes imediatamente abaixo de prefix: delimitador "/" evita listar todas as partições."""
+        prefix = prefix.rstrip("/") + "/"
+        names = {item.name[len(prefix):].rstrip("/") for item in self.container.walk_blobs(name_starts_with=prefix)}
+        return sorted(names)
+
+    # --- escrita --------------------------------------------------------------
+
+    def put(self, key: str, if_absent: bool = False) -> None:
+        """
+        Envia o arquivo local da chave. if_absent: não regrava se o blob já existir
+        (objetos endereçados por conteúdo). Arquivos de estado lidos com fetch(mutable=True)
+        só são gravados se ninguém os alterou desde então.
+        """
+        from azure.core import MatchConditions
+        from azure.core.exceptions import ResourceExistsError, ResourceModifiedError
+
+        self._pinned.add(key)
+        path = self.local_path(key)
+        kwargs = {"overwrite": True, "max_concurrency": self.upload_concurrency}
+        if if_absent:
+            kwargs["overwrite"] = False
+        elif key in self._etags:
+            etag = self._etags[key]
+            if etag is None:
+                kwargs["overwrite"] = False      # não existia na leitura
+            else:
+                kwargs.update(etag=etag, match_condition=MatchConditions.IfNotModified)
+
+        blob = self.container.get_blob_client(key)
+        try:
+            with path.open("rb") as f:
+                result = blob.upload_blob(f, **kwargs)
+        except ResourceExistsError:
+            if if_absent:
+                return
+            raise StorageConflict(f"{key} foi criado por outra instância")
+        except ResourceModifiedError:
+            raise StorageConflict(f"{key} foi alterado por outra instância")
+
+        etag = result.get("etag")
+        if key in self._etags:
+            self._etags[key] = etag
+        self._cache.add(key, etag, pinned=self._pinned)
+
+    def put_many(self, keys, if_absent: bool = False) -> None:
+        keys = list(keys)
+        self._pinned.update(keys)
+        with ThreadPoolExecutor(max_workers=self.upload_concurrency) as pool:
+            list(pool.map(lambda k: self.put(k, if_absent=if_absent), keys))
+
+    def put_tree(self, prefix: str) -> None:
+        """Envia todos os arquivos locais sob prefix (um dataset recém-gravado)."""
+        base = self.local_path(prefix)
+        files = [base] if base.is_file() else [p for p in base.rglob("*") if p.is_file()]
+        self.put_many(self.key(p) for p in files)
+
+    def delete(self, key: str) -> None:
+        """Remove o blob e a cópia local (ausente não é erro)."""
+        from azure.core.exceptions import ResourceNotFoundError
+
+        try:
+            self.container.delete_blob(key)
+        except ResourceNotFoundError:
+            pass
+        self._etags.pop(key, None)
+        self._cache.discard(key)
+
+    def close(self) -> None:
+        # Fim da execução: o que foi usado volta a poder sair do cache, do menos recente ao mais
+        self._etags.clear()
+        self._pinned.clear()
+        self._cache.trim()
+
+
+_STORAGES = {}
+
+
+def get_storage(project_root: Path):
+    """
+    Armazenamento configurado por PIPELINE_STORAGE (padrão: local), um por processo:
+    o cliente Blob e o cache local são reaproveitados entre execuções no mesmo worker.
+    """
+    kind = os.getenv("PIPELINE_STORAGE", "local").lower()
+    if kind == "local":
+        return LocalStorage(project_root)
+    if kind != "blob":
+        raise ValueError(f"PIPELINE_STORAGE desconhecido: {kind}")
+
+    connection_string = (os.getenv("PIPELINE_BLOB_CONNECTION") or os.getenv("AzureWebJobsStorage")
+                         or "UseDevelopmentStorage=true")
+    container = os.getenv("PIPELINE_BLOB_CONTAINER", DEFAULT_CONTAINER)
+    work_dir = Path(os.getenv("PIPELINE_CACHE_DIR") or Path(tempfile.gettempdir()) / "steam_pipeline" / container)
+    key = (connection_string, container, str(work_dir))
+    storage = _STORAGES.get(key)
+    if storage is None:
+        storage = _STORAGES[key] = BlobStorage.from_connection_string(
+            connection_string, container, work_dir,
+            cache_bytes=int(os.getenv("PIPELINE_CACHE_MB", DEFAULT_CACHE_MB)) * 1024 * 1024,
+            upload_concurrency=int(os.getenv("PIPELINE_UPLOAD_CONCURRENCY", DEFAULT_UPLOAD_CONCURRENCY)),
+        )
+    return storage
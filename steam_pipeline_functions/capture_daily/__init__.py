@@ -1,9 +1,11 @@
 import logging
-import json
+import os
+import asyncio
 import datetime as dt
 from pathlib import Path
 import azure.functions as func
 import sys
+import typing
 
 # CRÍTICO: Configuração do PATH
 root = Path(__file__).resolve().parents[2]
@@ -12,42 +14,160 @@ sys.path.append(str(root))
 # Importa o cliente real. SE FALHAR, É ERRO DE PATH OU DEPENDÊNCIA.
 # Não há mais DummyClient aqui.
 from src.collectors.steam import client as steam_client 
+from src.collectors.steam import regions as steam_regions
+from src.processing import bronze_store
+from src.processing import events
+from src.processing import metrics
+from src.processing import storage as layer_storage
+
+HTTP_STATE = f"{layer_storage.BRONZE}/_http_state.json"
+BRONZE_INDEX = f"{layer_storage.BRONZE}/{bronze_store.INDEX_NAME}"
+FUNCTION = "capture_daily"
+
+
+def _storage():
+    # Disco local ou Blob Storage (PIPELINE_STORAGE); a raiz do projeto só é usada no modo local
+    return layer_storage.get_storage(Path(__file__).resolve().parents[2])
 
 
 def _bronze_dir():
     # Define o diretório de saída para o Bronze
-    return Path(__file__).resolve().parents[2] / "src" / "processing" / "bronze"
+    return _storage().local_path(layer_storage.BRONZE)
+
+
+_collector = None
+
+
+def _get_collector():
+    # Cliente HTTP reaproveitado entre execuções no mesmo worker (pool de conexões).
+    # Os validadores ETag/Last-Modified ficam ao lado do Bronze para sobreviver a reinícios.
+    global _collector
+    if _collector is None:
+        _collector = steam_client.SteamCollector(state_path=_storage().fetch(HTTP_STATE, mutable=True)
+                                                 or _storage().local_path(HTTP_STATE))
+    return _collector
 
 
-def _save_bronze(data):
-    # Salva o dicionário de dados da API na camada Bronze
+def _save_bronze(data, ts=None, suffix=None):
+    # Salva o dicionário de dados da API na camada Bronze (armazenamento endereçado por conteúdo)
+    # (suffix identifica a região no modo multi-região: raw_featured_<ts>_<cc>-<l>)
     out_dir = _bronze_dir()
     out_dir.mkdir(parents=True, exist_ok=True)
-    ts = dt.datetime.now().strftime("%Y%m%d_%H%M%S")
-    outfile = out_dir / f"raw_featured_{ts}.json"
-    
+    ts = ts or dt.datetime.now(dt.timezone.utc).strftime("%Y%m%d_%H%M%S")
+    name = f"raw_featured_{ts}_{suffix}" if suffix else f"raw_featured_{ts}"
+
     # SALVA O DICIONÁRIO COMPLETO DA RESPOSTA DA API
-    with outfile.open("w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
-        
-    logging.info(f"[capture_daily] Dados salvos em: {outfile}")
-    return outfile
+    digest, is_new = bronze_store.put_capture(out_dir, data, name=name, region=suffix)
+    # O objeto sobe antes do índice (_publish_bronze): o índice nunca aponta para um objeto ausente
+    store = _storage()
+    obj = bronze_store.find_object(out_dir, digest)
+    store.put(store.key(obj), if_absent=True)
+    metrics.count("pipeline_records_out_total", function=FUNCTION)
+    if is_new:
+        metrics.count("pipeline_bytes_written_total", metrics.tree_size(obj), function=FUNCTION)
+
+    if is_new:
+        logging.info(f"[capture_daily] Dados salvos em: {name} (objeto {digest[:12]})")
+    else:
+        logging.info(f"[capture_daily] Conteúdo idêntico a uma captura anterior: {name} -> objeto {digest[:12]} (só o índice foi atualizado)")
+    # Mensagem para o process_silver com a captura exata que foi gravada
+    return events.bronze_captured(name, digest, region=suffix)
+
+
+def _capture_regions(regions):
+    """
+    Modo multi-região: busca todas as regiões de forma concorrente, respeitando o limite
+    de taxa (STEAM_RATE_PER_SEC, STEAM_RATE_BURST) e de concorrência (STEAM_MAX_CONCURRENCY).
+    Grava um arquivo Bronze por região e registra a latência de cada requisição.
+    Retorna as mensagens bronze-captured das capturas gravadas.
+    """
+    results = asyncio.run(steam_regions.capture_regions(
+        regions,
+        _get_collector(),
+        rate=float(os.getenv("STEAM_RATE_PER_SEC", "1.0")),
+        burst=int(os.getenv("STEAM_RATE_BURST", "5")),
+        max_concurrency=int(os.getenv("STEAM_MAX_CONCURRENCY", "8")),
+    ))
+
+    ts = dt.datetime.now(dt.timezone.utc).strftime("%Y%m%d_%H%M%S")
+    messages = []
+    for result in results:
+        tag = steam_regions.region_tag(result.region)
+        latency_ms = round(result.latency * 1000, 1)
+        if result.error is not None:
+            logging.error(f"[capture_daily] região {tag}: ERRO após {latency_ms} ms: {result.error}")
+        elif result.payload is None:
+            logging.info(f"[capture_daily] região {tag}: inalterada (304) em {latency_ms} ms")
+        else:
+            messages.append(_save_bronze(result.payload, ts=ts, suffix=tag))
+            # Validadores só depois da captura gravada: se a gravação falhar, a próxima
+            # execução baixa o conteúdo de novo em vez de receber 304
+            _get_collector().remember(result.validators)
+            logging.info(f"[capture_daily] região {tag}: capturada em {latency_ms} ms")
+
+    logging.info(f"[capture_daily] latência por requisição: {steam_regions.latency_summary(results)}")
+    return messages
+
+
+def _publish(outmsg, messages) -> None:
+    if messages:
+        store = _storage()
+        store.put(BRONZE_INDEX)
+        if store.local_path(HTTP_STATE).exists():
+            store.put(HTTP_STATE)
+    # Sem binding de saída (execução manual), as capturas ficam para a próxima mensagem/execução
+    if outmsg is not None and messages:
+        outmsg.set(messages)
+        logging.info(f"[capture_daily] {len(messages)} mensagens publicadas em {events.BRONZE_QUEUE}")
 
 
 # FUNÇÃO PRINCIPAL: Usa 'timer'
-def main(timer: func.TimerRequest) -> None:
+# outmsg: fila bronze-captured (function.json), uma mensagem por captura gravada
+def main(timer: func.TimerRequest, outmsg: func.Out[typing.List[str]] = None) -> None:
     logging.info('Python timer trigger function capture_daily started at %s', dt.datetime.utcnow().isoformat())
-    
+    metrics.reset_peak_memory()
+    try:
+        with metrics.span(FUNCTION, "total"):
+            _main(outmsg)
+    finally:
+        metrics.export(FUNCTION)
+
+
+def _main(outmsg) -> None:
+    # Índice Bronze atualizado antes de anexar as capturas desta execução
+    _storage().fetch(BRONZE_INDEX, mutable=True)
+
+    # STEAM_REGIONS="br:portuguese,us:english,..." ativa a captura multi-região
+    regions = steam_regions.parse_regions(os.getenv("STEAM_REGIONS", ""))
+    if regions:
+        try:
+            with metrics.span(FUNCTION, "capture_regions"):
+                messages = _capture_regions(regions)
+            _publish(outmsg, messages)
+            logging.info("[capture_daily] Coleta de dados Bronze (multi-região) finalizada.")
+        except Exception as e:
+            logging.error(f"[capture_daily] ERRO FATAL NA CAPTURA MULTI-REGIÃO: {e}")
+        return
+
     try:
         # 1. Coleta dos dados (Chamará a API real via api.py)
-        featured_data = steam_client.get_featured_games()
-        
+        with metrics.span(FUNCTION, "fetch"):
+            featured_data, validators = _get_collector().get_featured(with_validators=True)
+
+        if featured_data is None:
+            # HTTP 304: o conteúdo não mudou desde a última captura, nada a salvar
+            logging.info("[capture_daily] Conteúdo da API inalterado desde a última captura. Pulando o salvamento.")
+            return
+
         if not featured_data or not isinstance(featured_data, dict):
             logging.warning("[capture_daily] Coleta de dados falhou ou não retornou um dicionário. Pulando o salvamento.")
             return
 
-        # 2. Salva na camada Bronze
-        _save_bronze(featured_data)
+        # 2. Salva na camada Bronze e avisa o process_silver
+        # (os validadores ETag/Last-Modified só são guardados depois da captura gravada)
+        message = _save_bronze(featured_data)
+        _get_collector().remember(validators)
+        _publish(outmsg, [message])
         
         logging.info("[capture_daily] Coleta de dados Bronze finalizada.")
         
@@ -0,0 +1,45 @@
+import logging
+import os
+from pathlib import Path
+import azure.functions as func
+import sys
+
+# CRÍTICO: Configuração do PATH (mesma raiz usada pelas outras funções)
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from src.processing import metrics
+from src.processing import silver_table
+from src.processing import storage as layer_storage
+
+FUNCTION = "compact_silver"
+
+
+def run(retention_hours: float = silver_table.DEFAULT_RETENTION_HOURS) -> None:
+    """
+    Manutenção da tabela Silver: compacta as partições com vários arquivos pequenos (ou
+    com registros superados) e apaga os arquivos fora do log há mais de retention_hours.
+    Pode rodar junto com o process_silver: os commits concorrentes são resolvidos pelo log.
+    """
+    store = layer_storage.get_storage(Path(__file__).resolve().parents[2])
+    table = silver_table.SilverTable(store.local_path(layer_storage.SILVER_TABLE), store)
+    metrics.reset_peak_memory()
+    try:
+        with metrics.span(FUNCTION, "compact"):
+            commit = table.compact()
+        if commit is None:
+            logging.info("[compact_silver] nada a compactar")
+        else:
+            logging.info(f"[compact_silver] {silver_table.version_name(commit['version'])}: "
+                         f"{len(commit['remove'])} arquivos -> {len(commit['add'])} ({commit['rows']} registros)")
+        with metrics.span(FUNCTION, "vacuum"):
+            deleted = table.vacuum(retention_hours)
+        logging.info(f"[compact_silver] vacuum: {len(deleted)} arquivos apagados")
+    finally:
+        store.close()
+        metrics.export(FUNCTION)
+
+
+# FUNÇÃO PRINCIPAL: timer diário (function.json)
+# SILVER_VACUUM_RETENTION_HOURS: por quanto tempo versões antigas continuam legíveis (padrão: 7 dias)
+def main(timer: func.TimerRequest) -> None:
+    run(retention_hours=float(os.getenv("SILVER_VACUUM_RETENTION_HOURS", silver_table.DEFAULT_RETENTION_HOURS)))
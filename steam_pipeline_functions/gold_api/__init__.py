@@ -0,0 +1,40 @@
+import os
+from pathlib import Path
+import azure.functions as func
+import sys
+
+# CRÍTICO: Configuração do PATH (mesma raiz usada pelas outras funções)
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from src.processing.gold import read_api
+from src.processing import storage as layer_storage
+
+_reader = None
+
+
+def get_reader() -> read_api.GoldReader:
+    """
+    Leitor compartilhado pelo worker: o Gold fica em memória entre as requisições.
+    GOLD_API_REFRESH_SECONDS: intervalo mínimo entre consultas ao catálogo (padrão: 5s)
+    GOLD_API_CACHE_SIZE: respostas guardadas no cache LRU (padrão: 1024)
+    """
+    global _reader
+    if _reader is None:
+        store = layer_storage.get_storage(Path(__file__).resolve().parents[2])
+        _reader = read_api.GoldReader(
+            store,
+            refresh_seconds=float(os.getenv("GOLD_API_REFRESH_SECONDS", read_api.DEFAULT_REFRESH_SECONDS)),
+            cache_size=int(os.getenv("GOLD_API_CACHE_SIZE", read_api.DEFAULT_CACHE_SIZE)),
+        )
+    return _reader
+
+
+# FUNÇÃO PRINCIPAL: GET /gold/{action}
+#   /gold/game?game_id=570                               jogo pelo game_id
+#   /gold/top?by=discount_percent&n=10&category=specials  top-N (order=asc|desc)
+#   /gold/range?by=final_price&min=0&max=5&limit=100      intervalo, em ordem crescente
+#   /gold/categories                                     jogos por categoria
+#   /gold/status                                         versão carregada e uso do cache
+def main(req: func.HttpRequest) -> func.HttpResponse:
+    status, body = get_reader().handle(req.route_params.get("action", ""), dict(req.params))
+    return func.HttpResponse(body, status_code=status, mimetype="application/json")
@@ -0,0 +1,41 @@
+# Servidor HTTP local da API de leitura do Gold, fora do host do Azure Functions:
+#   python -m gold_api --port 8080
+#   curl "http://127.0.0.1:8080/gold/top?by=discount_percent&n=5"
+import argparse
+import logging
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+from . import get_reader
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        parts = url.path.strip("/").split("/")
+        if len(parts) != 2 or parts[0] != "gold":
+            status, body = 404, b'{"error":"use /gold/<consulta>"}'
+        else:
+            status, body = get_reader().handle(parts[1], dict(parse_qsl(url.query)))
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logging.debug(format, *args)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="API de leitura do Gold (servidor local)")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8080)
+    args = ap.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    get_reader().refresh(force=True)
+    server = ThreadingHTTPServer((args.host, args.port), Handler)
+    logging.info("[gold_api] http://%s:%d/gold/status", args.host, args.port)
+    server.serve_forever()
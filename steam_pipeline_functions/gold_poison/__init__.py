@@ -0,0 +1,18 @@
+import logging
+from pathlib import Path
+import azure.functions as func
+import sys
+
+# CRÍTICO: Configuração do PATH (mesma raiz usada pelas outras funções)
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from src.processing import events
+from src.processing import storage as layer_storage
+
+
+# FUNÇÃO PRINCIPAL: mensagens do process_gold que falharam maxDequeueCount vezes (host.json)
+def main(msg: func.QueueMessage) -> None:
+    store = layer_storage.get_storage(Path(__file__).resolve().parents[2])
+    key = events.record_dead_letter(store, events.SILVER_QUEUE, msg.get_body(), msg.dequeue_count,
+                                    reason="maxDequeueCount atingido", message_id=msg.id)
+    logging.error(f"[gold_poison] mensagem {msg.id} de {events.SILVER_QUEUE} registrada em {key}: {msg.get_body()[:200]!r}")
@@ -1,85 +1,366 @@
 import logging
-import json
 import azure.functions as func
 from datetime import datetime
 import os
-import glob
+from collections import Counter
 from pathlib import Path
 import sys
 
 # CRÍTICO: Configuração do PATH para encontrar o módulo 'src'
-# Assegura que o módulo 'src' seja acessível, subindo 4 níveis do arquivo __init__.py
-sys.path.append(str(Path(__file__).resolve().parent.parent.parent.parent))
-
-# Importação do módulo de processamento Gold
-try:
-    from src.processing.gold.aggregator import aggregate_featured_games
-    logging.info("Módulo 'aggregate_featured_games' importado com sucesso.")
-except ImportError as e:
-    logging.error(f"ERRO DE IMPORTAÇÃO: {e}")
-    # Função dummy para evitar quebrar o programa se o import falhar
-    def aggregate_featured_games(data, time): return []
-
-
-# FUNÇÃO PRINCIPAL: Usa 'timer' para corresponder ao function.json
-#def main(timer: func.TimerRequest) -> None:
-#    utc_timestamp = datetime.utcnow().isoformat()
-def main(timer: func.TimerRequest = None) -> None: 
+# Assegura que o módulo 'src' seja acessível: a raiz do projeto fica 3 níveis acima do __init__.py
+# (mesma raiz usada por capture_daily e process_silver)
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+# Importação do módulo de processamento Gold (agregação vetorizada em NumPy)
+from src.processing.gold import aggregator
+from src.processing.gold import views as gold_views
+from src.collectors.steam import client as steam_client
+from src.collectors.steam.Schemas.featured_schema import SCHEMA_VERSION as SILVER_SCHEMA_VERSION
+from src.processing import formats
+from src.processing import bronze_store
+from src.processing import catalog as partition_catalog
+from src.processing import enrichment
+from src.processing import cdc
+from src.processing import events as pipeline_events
+from src.processing import metrics
+from src.processing import silver_table
+from src.processing import storage as layer_storage
+
+CDC_STATE = layer_storage.GOLD_CDC_STATE
+FUNCTION = "process_gold"
+
+
+def _storage():
+    # Disco local ou Blob Storage (PIPELINE_STORAGE); a raiz do projeto só é usada no modo local
+    return layer_storage.get_storage(Path(__file__).resolve().parents[2])
+
+
+def _open_catalog(store):
+    # Catálogo de partições compartilhado com o process_silver
+    store.fetch(layer_storage.CATALOG, mutable=True)
+    return partition_catalog.Catalog(store.local_path(layer_storage.CATALOG), store.local_path())
+
+
+def _read_silver(store, catalog, silver_path: Path, start, end, dataset):
+    """
+    Registros do Silver a processar, ou None se não há nada (ou a mensagem ficou obsoleta).
+
+    Tabela Silver: lê o snapshot mais recente (um registro por game_id), só dos arquivos
+    cujo intervalo de captura cruza [start, end]. Uma mensagem de versão anterior à última
+    que mudou dados é ignorada: a mensagem da versão mais nova cobre as duas.
+    Antes do primeiro commit da tabela, lê o último dataset Silver do catálogo, como antes.
+    """
+    table = silver_table.SilverTable(store.local_path(layer_storage.SILVER_TABLE), store)
+    snapshot = table.snapshot()
+    if snapshot.version < 0:
+        return _read_silver_dataset(store, catalog, silver_path, start, end, dataset)
+
+    requested = silver_table.parse_version_name(dataset)
+    if requested is not None and requested < snapshot.data_version:
+        logging.info('Silver %s já foi substituído por %s; mensagem ignorada.',
+                     dataset, silver_table.version_name(snapshot.data_version))
+        return None
+
+    files = table.files(snapshot, start, end)
+    logging.info('Processando %s: %d arquivos (intervalo %s .. %s)', silver_table.version_name(snapshot.version),
+                 len(files), start or "início", end or "fim")
+    if not files:
+        logging.warning("Nenhum arquivo Silver no intervalo pedido. Pulando processamento Gold.")
+        return None
+    games_list = table.read(snapshot, start=start, end=end)
+    metrics.count("pipeline_bytes_read_total", sum(f["bytes"] for f in files), function=FUNCTION)
+    return games_list
+
+
+def _read_silver_dataset(store, catalog, silver_path: Path, start, end, dataset):
+    # Silver no formato anterior à tabela: um dataset completo por execução, pelo catálogo
+    silver = _latest_silver(catalog, silver_path)
+
+    if silver is None:
+        logging.warning("Nenhum arquivo Silver encontrado. Pulando processamento Gold.")
+        return None
+
+    if dataset is not None and silver.name != dataset:
+        logging.info('Silver %s já foi substituído por %s; mensagem ignorada.', dataset, silver.name)
+        return None
+
+    partitions = catalog.partitions(silver.id, start, end)
+    logging.info('Processando Silver %s: %d de %d linhas em %d partições (intervalo %s .. %s)',
+                 silver.name, sum(p.row_count for p in partitions), silver.row_count,
+                 len(partitions), start or "início", end or "fim")
+
+    if not partitions:
+        logging.warning("Nenhuma partição Silver no intervalo pedido. Pulando processamento Gold.")
+        return None
+
+    # Partições fora do cache local são baixadas em paralelo (as já baixadas não acessam a rede)
+    store.fetch_many(p.path for p in partitions)
+    files = [catalog.resolve(p.path) for p in partitions]
+    games_list = formats.read_files(files)
+    metrics.count("pipeline_bytes_read_total", sum(metrics.tree_size(f) for f in files), function=FUNCTION)
+    return games_list
+
+
+def _latest_silver(catalog, silver_path: Path):
+    """
+    Dataset Silver mais recente segundo o catálogo. Se o catálogo ainda não tiver nenhum
+    (Silver gravado antes do catálogo), registra o mais recente pelo nome (o timestamp no
+    nome é cronológico) para que as próximas execuções não precisem listar o diretório.
+    """
+    latest = catalog.latest_dataset("silver")
+    if latest is not None:
+        return latest
+
+    store = _storage()
+    candidates = sorted(n for n in store.list_children(store.key(silver_path))
+                        if n.startswith("silver_featured_") and not n.endswith(".tmp"))
+    if not candidates:
+        return None
+    logging.info('Silver %s ainda não está no catálogo; registrando.', candidates[-1])
+    store.fetch_prefix(store.key(silver_path / candidates[-1]))
+    catalog.register_existing("silver", silver_path / candidates[-1], formats.SILVER_PARTITIONING,
+                              "captured_at", SILVER_SCHEMA_VERSION)
+    return catalog.latest_dataset("silver")
+
+
+def _capture_batches(store) -> list:
+    # Execuções de captura do Bronze (índice + arquivos antigos), para o conjunto ativo do CDC
+    store.fetch(f"{layer_storage.BRONZE}/{bronze_store.INDEX_NAME}", mutable=True)
+    store.fetch_many(store.list(f"{layer_storage.BRONZE}/raw_featured_"))
+    bronze_dir = store.local_path(layer_storage.BRONZE)
+    if not bronze_dir.is_dir():
+        return []
+    return bronze_store.capture_batches(bronze_store.list_captures(bronze_dir))
+
+
+def _update_views(store, games_list: list, processing_time: str, verify: bool = False) -> int:
+    """
+    Aplica o snapshot às visões agregadas do Gold (só as observações ainda não vistas entram).
+    verify=True confere as visões com o recálculo completo e, se divergirem, as recalcula.
+    """
+    store.fetch(layer_storage.GOLD_VIEWS, mutable=True)
+    views = gold_views.GoldViews(store.local_path(layer_storage.GOLD_VIEWS))
+    try:
+        facts = aggregator.fact_records(aggregator.build_fact_columns(
+            aggregator.columns_from_records(games_list), processing_time))
+        applied = views.apply(facts)
+        rebuilt = False
+        if verify:
+            mismatches = views.verify()
+            if mismatches:
+                logging.error('Visões Gold divergem do recálculo completo em %d linhas (ex: %s); recalculando.',
+                              len(mismatches), mismatches[:3])
+                views.rebuild()
+                rebuilt = True
+            else:
+                logging.info('Visões Gold conferidas com o recálculo completo: sem divergências.')
+    finally:
+        views.close()
+    if applied or rebuilt:
+        store.put(layer_storage.GOLD_VIEWS)
+    return applied
+
+
+def run(start: str | None = None, end: str | None = None, full_snapshot: bool = False,
+        dataset: str | None = None, verify_views: bool = False) -> None:
+    """
+    Processamento Silver -> Gold.
+
+    Lê as partições do Silver mais recente (localizado pelo catálogo) cujo intervalo de
+    captura cruza [start, end] (datas/horários ISO 8601; sem limites, o dataset inteiro),
+    e grava as linhas fato e os agregados por categoria, registrando ambos no catálogo.
+
+    Sem intervalo, o Gold é incremental (CDC): o snapshot é comparado com o estado da
+    execução anterior e só os jogos que entraram ou mudaram geram linhas fato; os eventos
+    (insert/update/delete) são gravados em gold_featured_changes_<ts>. Com intervalo ou
+    full_snapshot=True, todas as linhas do Silver geram fatos, como antes.
+
+    dataset (versão da tabela Silver que disparou a execução) é ignorado se já não for a
+    mais recente: a mensagem da versão mais nova cobre as mudanças das duas.
+
+    Em todos os modos, as observações novas do snapshot atualizam as visões agregadas
+    (src/processing/gold/views.py); verify_views=True as confere com o recálculo completo.
+
+    Falhas ao ler o Silver ou ao gravar fatos/eventos propagam (a mensagem volta para a
+    fila); o estado do CDC só é publicado depois que fatos e eventos foram gravados.
+    """
     utc_timestamp = datetime.utcnow().isoformat()
     processing_time = utc_timestamp
-    logging.info('Python timer trigger function process_gold started at %s', processing_time)
+    logging.info('process_gold started at %s', processing_time)
+
+    store = _storage()
+    metrics.reset_peak_memory()
+    try:
+        with metrics.span(FUNCTION, "total"):
+            catalog = _open_catalog(store)
+            try:
+                state_saved = _process(store, catalog, processing_time, start, end, full_snapshot, dataset,
+                                       verify_views)
+            finally:
+                catalog.close()
+            # Catálogo publicado depois dos datasets que ele referencia; o estado do CDC por último
+            store.put(layer_storage.CATALOG)
+            if state_saved:
+                store.put(CDC_STATE)
+    finally:
+        store.close()
+        metrics.export(FUNCTION)
+
 
+def _process(store, catalog, processing_time: str, start: str | None, end: str | None,
+             full_snapshot: bool, dataset: str | None = None, verify_views: bool = False) -> bool:
     # 1. Configuração de Caminhos
-    BASE_PATH = Path(__file__).resolve().parent.parent.parent
-    SILVER_PATH = BASE_PATH / "src" / "processing" / "silver"
-    GOLD_PATH = BASE_PATH / "gold_output"
+    SILVER_PATH = store.local_path(layer_storage.SILVER)
+    GOLD_PATH = store.local_path(layer_storage.GOLD)
     
     # 2. Cria o diretório de saída Gold se não existir
-    GOLD_PATH.mkdir(exist_ok=True)
-    
-    # 3. Localiza o arquivo Silver mais recente
-    list_of_files = glob.glob(str(SILVER_PATH / "silver_featured_*.json"))
+    GOLD_PATH.mkdir(parents=True, exist_ok=True)
 
-    if not list_of_files:
-        logging.warning("Nenhum arquivo Silver encontrado. Pulando processamento Gold.")
-        return
+    # 3-4. Lê o snapshot mais recente da tabela Silver (só os arquivos do intervalo pedido)
+    try:
+        with metrics.span(FUNCTION, "read_silver"):
+            games_list = _read_silver(store, catalog, SILVER_PATH, start, end, dataset)
 
-    # Pega o arquivo criado mais recentemente (latest_file)
-    latest_file = max(list_of_files, key=os.path.getctime)
-    logging.info('Processando arquivo Silver mais recente: %s', latest_file)
+    except Exception as e:
+        # Sem o Silver não há o que publicar: a mensagem volta para a fila
+        logging.error(f"Erro ao ler arquivo Silver: {e}")
+        raise
+    if games_list is None:
+        return False
+    metrics.count("pipeline_records_in_total", len(games_list), function=FUNCTION)
 
-    # 4. Lê o arquivo Silver
+    # 4a. Visões agregadas (preço diário, janelas móveis, frequência de desconto, rankings),
+    #     atualizadas antes do CDC: uma captura sem mudanças também é uma observação
     try:
-        with open(latest_file, 'r', encoding='utf-8') as f:
-            silver_data = json.load(f)
-            
-            # ✅ Extrai a lista de jogos do campo "items"
-            games_list = silver_data.get("items", []) 
-            
+        with metrics.span(FUNCTION, "views"):
+            applied = _update_views(store, games_list, processing_time, verify_views)
+        logging.info('Visões Gold: %d observações novas aplicadas', applied)
+    except layer_storage.StorageConflict:
+        raise
     except Exception as e:
-        logging.error(f"Erro ao ler arquivo Silver: {e}")
-        return
+        logging.error(f"Erro ao atualizar as visões Gold: {e}")
 
-    # 5. Processa os dados
-    gold_records = aggregate_featured_games(games_list, processing_time)
+    # 4b. CDC: compara a captura mais recente com o estado da última execução do Gold
+    events = None
+    fact_games = games_list
+    cdc_state_path = store.local_path(CDC_STATE)
+    if start is None and end is None and not full_snapshot:
+        with metrics.span(FUNCTION, "cdc"):
+            store.fetch(CDC_STATE, mutable=True)
+            active = cdc.latest_capture(games_list, _capture_batches(store))
+            current_state = cdc.snapshot_state(active)
+            events = cdc.diff_snapshots(cdc.load_state(cdc_state_path), current_state)
+        changed = {e["game_id"] for e in events if e["op"] != cdc.DELETE}
+        fact_games = [g for g in active if g["game_id"] in changed]
+        logging.info('CDC: %d eventos (%s) para %d jogos em destaque', len(events),
+                     dict(Counter(e["op"] for e in events)), len(current_state))
+        if not events:
+            logging.info("Nenhuma mudança desde a última execução do Gold. Nada a gravar.")
+            return False
 
-    if not gold_records:
-        logging.warning("A agregação Gold não retornou registros. Pulando a escrita.")
-        return
+    # 5. Enriquecimento: nome, tipo e gêneros pelo cache de metadados (appdetails só para ausentes)
+    #    ENRICH_FETCH=0 desliga as chamadas de rede (usa apenas o cache)
+    try:
+        with metrics.span(FUNCTION, "enrich"):
+            store.fetch(layer_storage.METADATA_CACHE, mutable=True)
+            cache = enrichment.AppMetadataCache(store.local_path(layer_storage.METADATA_CACHE))
+            collector = steam_client.SteamCollector() if os.getenv("ENRICH_FETCH", "1") != "0" else None
+            stats = enrichment.enrich_records(fact_games, cache, collector,
+                                              max_fetch=int(os.getenv("ENRICH_MAX_FETCH", "100")))
+            cache.close()
+            if stats.get("fetched"):
+                store.put(layer_storage.METADATA_CACHE)
+        logging.info('Enriquecimento concluído: %s', stats)
+    except Exception as e:
+        # O Gold segue sem enriquecimento se a API/cache falhar
+        logging.error(f"Erro no enriquecimento de metadados: {e}")
+
+    # 6. Processa os dados: linhas fato (jogos novos/alterados) e agregados por categoria
+    #    (sobre o snapshot inteiro), calculados em colunas
+    with metrics.span(FUNCTION, "aggregate"):
+        all_facts = aggregator.build_fact_columns(aggregator.columns_from_records(games_list), processing_time)
+        facts = all_facts if fact_games is games_list else aggregator.build_fact_columns(
+            aggregator.columns_from_records(fact_games), processing_time)
+        gold_records = aggregator.fact_records(facts)
+        category_rows = aggregator.category_aggregates(all_facts, processing_time)
+    metrics.count("pipeline_records_out_total", len(gold_records), function=FUNCTION, dataset="gold_facts")
+    metrics.count("pipeline_records_out_total", len(category_rows), function=FUNCTION, dataset="gold_categories")
 
-    # 6. Salva o resultado agregado
-    output_filename = f"gold_featured_facts_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    # 7. Salva o resultado agregado
+    # Dataset particionado por data de captura e categoria (formato em PIPELINE_STORAGE_FORMAT)
+    output_filename = f"gold_featured_facts_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
     output_path = GOLD_PATH / output_filename
 
+    if not gold_records:
+        logging.warning("A agregação Gold não retornou registros. Pulando a escrita das linhas fato.")
+    else:
+        try:
+            with metrics.span(FUNCTION, "write_facts"):
+                written = formats.write_dataset(output_path, gold_records, partitioning=formats.GOLD_PARTITIONING)
+                store.put_tree(store.key(output_path))
+            metrics.count("pipeline_bytes_written_total", metrics.tree_size(output_path), function=FUNCTION)
+            catalog.register_dataset("gold_facts", output_path, gold_records, written,
+                                     formats.GOLD_PARTITIONING, "capture_date_utc", aggregator.SCHEMA_VERSION)
+
+            logging.info('Pipeline Gold finalizada. Registros salvos em: %s', output_path)
+
+        except Exception as e:
+            logging.error(f"Erro ao salvar arquivo Gold: {e}")
+            raise
+
+    # 8. Agregados por categoria (contagens, preço médio/mínimo, distribuição de descontos)
     try:
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(gold_records, f, indent=2, ensure_ascii=False)
-        
-        logging.info('Pipeline Gold finalizada. Registros salvos em: %s', output_path)
+        categories_path = GOLD_PATH / output_filename.replace("_facts_", "_categories_")
+        written = formats.write_dataset(categories_path, category_rows, partitioning=())
+        store.put_tree(store.key(categories_path))
+        metrics.count("pipeline_bytes_written_total", metrics.tree_size(categories_path), function=FUNCTION)
+        catalog.register_dataset("gold_categories", categories_path, category_rows, written,
+                                 (), "processing_date_utc", aggregator.SCHEMA_VERSION)
+        logging.info('Agregados por categoria (%d) salvos em: %s', len(category_rows), categories_path)
+    except Exception as e:
+        logging.error(f"Erro ao gerar agregados por categoria: {e}")
 
+    # 9. Eventos de mudança; o estado do CDC só avança se fatos e eventos foram gravados
+    if events is None:
+        return False
+    try:
+        changes = [dict(e, processing_date_utc=processing_time) for e in events]
+        changes_path = GOLD_PATH / output_filename.replace("_facts_", "_changes_")
+        written = formats.write_dataset(changes_path, changes, partitioning=())
+        store.put_tree(store.key(changes_path))
+        metrics.count("pipeline_bytes_written_total", metrics.tree_size(changes_path), function=FUNCTION)
+        metrics.count("pipeline_records_out_total", len(changes), function=FUNCTION, dataset="gold_changes")
+        catalog.register_dataset("gold_changes", changes_path, changes, written,
+                                 (), "processing_date_utc", aggregator.SCHEMA_VERSION)
+        logging.info('Eventos de mudança (%d) salvos em: %s', len(changes), changes_path)
     except Exception as e:
-        logging.error(f"Erro ao salvar arquivo Gold: {e}")
+        logging.error(f"Erro ao salvar eventos de mudança: {e}")
+        raise
+
+    cdc.save_state(cdc_state_path, current_state, processing_time)
+    return True
+
+
+# FUNÇÃO PRINCIPAL: disparada pela mensagem silver-published do process_silver
+def main(msg: func.QueueMessage) -> None:
+    """
+    Idempotente: o CDC compara o Silver com o estado da última execução, então uma
+    mensagem reentregue não gera fatos nem eventos novos. Erros propagam para a fila
+    tentar de novo; após maxDequeueCount tentativas a mensagem vai para silver-published-poison.
+    """
+    try:
+        message = pipeline_events.parse(msg.get_body(), pipeline_events.SILVER_QUEUE)
+    except pipeline_events.InvalidMessage as e:
+        pipeline_events.record_dead_letter(_storage(), pipeline_events.SILVER_QUEUE,
+                                           msg.get_body(), msg.dequeue_count, reason=str(e),
+                                           message_id=msg.id)
+        logging.error('Mensagem inválida descartada: %s', e)
+        return
 
-    # 🚨 CORREÇÃO FINAL DE BINDING: Usando 'timer' em vez de 'mytimer'
-    if timer.past_due: 
-        logging.info('The timer is past due!')
\ No newline at end of file
+    # GOLD_START / GOLD_END (ISO 8601) restringem o intervalo de captura processado
+    # GOLD_FULL_SNAPSHOT=1 gera linhas fato para todos os jogos (desliga o CDC)
+    # GOLD_VERIFY_VIEWS=1 confere as visões agregadas com o recálculo completo a cada execução
+    run(start=os.getenv("GOLD_START") or None, end=os.getenv("GOLD_END") or None,
+        full_snapshot=os.getenv("GOLD_FULL_SNAPSHOT", "0").lower() in ("1", "true", "yes"),
+        dataset=message.get("dataset"),
+        verify_views=os.getenv("GOLD_VERIFY_VIEWS", "0").lower() in ("1", "true", "yes"))
@@ -0,0 +1,21 @@
+# Execução manual do processamento Gold, fora do host do Azure Functions:
+#   python -m process_gold                                    (Silver mais recente, inteiro)
+#   python -m process_gold --start 2025-12-01 --end 2025-12-11 (apenas capturas no intervalo)
+#   python -m process_gold --full-snapshot                    (fatos para todos os jogos, sem CDC)
+#   python -m process_gold --verify-views                     (confere as visões agregadas com o recálculo completo)
+import argparse
+import logging
+
+from . import run
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Processamento Silver -> Gold")
+    ap.add_argument("--start", help="início do intervalo de captura (ISO 8601, inclusivo)")
+    ap.add_argument("--end", help="fim do intervalo de captura (ISO 8601, inclusivo; uma data inclui o dia inteiro)")
+    ap.add_argument("--full-snapshot", action="store_true",
+                    help="gera linhas fato para todos os jogos do Silver, em vez de só as mudanças (CDC)")
+    ap.add_argument("--verify-views", action="store_true",
+                    help="confere as visões agregadas com o recálculo completo (e as recalcula se divergirem)")
+    args = ap.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    run(start=args.start, end=args.end, full_snapshot=args.full_snapshot, verify_views=args.verify_views)
@@ -1,5 +1,7 @@
 import json
+import os
 import datetime as dt
+from collections import Counter
 from pathlib import Path
 import azure.functions as func
 
@@ -7,25 +9,159 @@ import sys
 root = Path(__file__).resolve().parents[2]
 sys.path.append(str(root))
 
-from src.collectors.steam import parser
-from src.collectors.steam.Schemas.featured_schema import SCHEMA_FEATURED_GAME
+from src.collectors.steam import regions as steam_regions
+from src.collectors.steam.Schemas.featured_schema import SCHEMA_VERSION
+from src.collectors.steam.Schemas.record import GameRecord
+from src.collectors.steam.Schemas.validator import FEATURED_GAME_VALIDATOR
+from src.processing import bronze_store
+from src.processing import events
+from src.processing import manifest as ingestion_manifest
+from src.processing import formats
+from src.processing import metrics
+from src.processing import price_history
+from src.processing import silver_table
+from src.processing import silver_transform
+from src.processing import storage as layer_storage
+
+MANIFEST = f"{layer_storage.SILVER}/_ingestion_manifest.json"
+BRONZE_INDEX = f"{layer_storage.BRONZE}/{bronze_store.INDEX_NAME}"
+FUNCTION = "process_silver"
+
 
 def _now_iso():
     return dt.datetime.now(dt.timezone.utc).isoformat()
 
 
+def _storage():
+    # Disco local ou Blob Storage (PIPELINE_STORAGE); a raiz do projeto só é usada no modo local
+    return layer_storage.get_storage(Path(__file__).resolve().parents[2])
+
+
 def _bronze_dir():
-    return Path(__file__).resolve().parents[2] / "src" / "processing" / "bronze"
+    return _storage().local_path(layer_storage.BRONZE)
 
 
 def _silver_dir():
-    return Path(__file__).resolve().parents[2] / "src" / "processing" / "silver"
+    return _storage().local_path(layer_storage.SILVER)
+
+
+def _manifest_path():
+    # Manifesto de ingestão: registra quais arquivos Bronze já entraram no Silver
+    return _storage().local_path(MANIFEST)
+
+
+def _open_table():
+    # Tabela Silver transacional (MERGE por game_id), lida pelo process_gold
+    store = _storage()
+    return silver_table.SilverTable(store.local_path(layer_storage.SILVER_TABLE), store)
+
+
+def _price_prefix(region: str | None = None) -> str:
+    # Histórico da região principal na raiz; o de cada outra região (outra moeda) em regions/<região>
+    return layer_storage.PRICES if region is None else f"{layer_storage.PRICES}/regions/{region}"
+
+
+def _price_history_dir(region: str | None = None):
+    # Histórico de preços por game_id (só de anexação), alimentado a cada execução
+    return _storage().local_path(_price_prefix(region))
+
+
+def _open_price_history(store, region: str | None = None):
+    # Índice e categorias são estado mutável; os segmentos de dados são imutáveis (vêm do cache)
+    prefix = _price_prefix(region)
+    store.fetch(f"{prefix}/{price_history.INDEX_NAME}", mutable=True)
+    store.fetch(f"{prefix}/{price_history.CATEGORIES_NAME}", mutable=True)
+    prices = price_history.PriceHistoryStore(_price_history_dir(region))
+    store.fetch_many(f"{prefix}/{name}" for name in prices.segment_names())
+    return prices
+
+
+def _publish_price_history(store, prices, previous_segments: list, region: str | None = None) -> None:
+    # Só os segmentos novos sobem (a cauda do log), o índice depois deles; os fundidos são removidos.
+    # O nome do segmento inclui o hash do conteúdo: um blob já existente tem os mesmos bytes, e uma
+    # instância concorrente que gravou antes faz o put do índice levantar StorageConflict
+    prefix = _price_prefix(region)
+    current = prices.segment_names()
+    store.put_many([f"{prefix}/{name}" for name in current if name not in previous_segments], if_absent=True)
+    store.put(f"{prefix}/{price_history.CATEGORIES_NAME}")
+    store.put(f"{prefix}/{price_history.INDEX_NAME}")
+    for name in previous_segments:
+        if name not in current:
+            store.delete(f"{prefix}/{name}")
+
+
+def _update_regional_prices(store, pending: list, normalized_ts: str, workers: int, chunk_size: int) -> list:
+    """
+    Capturas das outras regiões (STEAM_REGIONS): os mesmos game_ids com preços em outra moeda.
+    Não entram no Silver (chave game_id); cada região alimenta o seu histórico de preços
+    (prices/regions/<região>). Retorna (chave do manifesto, fingerprint) das capturas lidas.
+    """
+    by_region = {}
+    for capture, fingerprint in pending:
+        by_region.setdefault(capture.region, []).append((capture, fingerprint))
+
+    processed = []
+    for region, items in sorted(by_region.items()):
+        prices = _open_price_history(store, region)
+        segments = prices.segment_names()
+        results = silver_transform.iter_processed_files([c.path for c, _ in items], normalized_ts,
+                                                        workers=workers, chunk_size=chunk_size,
+                                                        captured_at=[bronze_store.capture_time(c) for c, _ in items])
+        for (capture, fingerprint), (_, ok, file_games, _, _) in zip(items, results):
+            if not ok:
+                # Leitura interrompida: a captura fica fora do manifesto e é relida na próxima execução
+                metrics.count("pipeline_records_rejected_total", function=FUNCTION, reason="unreadable_file")
+                continue
+            prices.append(file_games.values(), captured_at=bronze_store.capture_time(capture))
+            processed.append((_manifest_key(capture), fingerprint))
+        appended = prices.commit()
+        if appended:
+            _publish_price_history(store, prices, segments, region)
+        prices.close()
+        print(f"[process_silver] price history ({region}): {appended} new observations")
+    return processed
 
 
-def _list_bronze_files():
+def _list_bronze_captures():
+    # Capturas do índice endereçado por conteúdo + arquivos raw_featured_*.json antigos
+    store = _storage()
+    store.fetch(BRONZE_INDEX, mutable=True)
+    store.fetch_many(store.list(f"{layer_storage.BRONZE}/raw_featured_"))
     d = _bronze_dir()
     d.mkdir(parents=True, exist_ok=True)
-    return sorted(d.glob("raw_featured_*.json"))
+    return bronze_store.list_captures(d)
+
+
+def _silver_region():
+    # Multi-região (STEAM_REGIONS): só a região principal entra no Silver (chave game_id);
+    # as outras alimentam só o histórico de preços da região
+    return steam_regions.primary_region(os.getenv("STEAM_REGIONS", ""))
+
+
+def _manifest_key(capture) -> str:
+    # Arquivos antigos continuam registrados pelo nome do arquivo, como antes
+    return capture.path.name if capture.sha256 is None else capture.name
+
+
+def _pending_captures(captures, manifest) -> list:
+    """
+    Capturas ainda não processadas, em ordem: lista de tuplas (captura, fingerprint).
+    Arquivos antigos passam pela verificação de tamanho/mtime/hash do manifesto;
+    capturas endereçadas por conteúdo são imutáveis, basta o nome constar no manifesto.
+    """
+    legacy = dict(ingestion_manifest.pending_files(
+        [c.path for c in captures if c.sha256 is None], manifest))
+    known = manifest.setdefault("files", {})
+
+    pending = []
+    for capture in captures:
+        if capture.sha256 is None:
+            if capture.path in legacy:
+                pending.append((capture, legacy[capture.path]))
+        elif capture.name not in known:
+            fingerprint = {"size": capture.path.stat().st_size, "mtime": None, "sha256": capture.sha256}
+            pending.append((capture, fingerprint))
+    return pending
 
 
 def _load_json(path: Path):
@@ -33,129 +169,251 @@ def _load_json(path: Path):
         return json.load(f)
 
 
-def _save_silver(items, tag="featured"):
-    out_dir = _silver_dir()
-    out_dir.mkdir(parents=True, exist_ok=True)
-    ts = dt.datetime.now().strftime("%Y%m%d_%H%M%S")
-    outfile = out_dir / f"silver_{tag}_{ts}.json"
-    # Agora salva a lista de dicionários
-    with outfile.open("w", encoding="utf-8") as f:
-        # Usa json.dump em vez de escrever a lista diretamente
-        json.dump({"items": items}, f, ensure_ascii=False, indent=2) 
-    print(f"[process_silver] wrote {outfile}")
-    return outfile
+def _latest_silver_file(tag="featured"):
+    # Último Silver do formato anterior à tabela (um dataset completo por execução).
+    # O timestamp no nome (YYYYMMDD_HHMMSS) garante que a ordenação por nome é cronológica.
+    # Aceita tanto os datasets particionados quanto os arquivos .json antigos.
+    # Lista só o primeiro nível do Silver (sem percorrer as partições) e baixa o mais recente.
+    store = _storage()
+    names = [n for n in store.list_children(layer_storage.SILVER)
+             if n.startswith(f"silver_{tag}_") and not n.endswith(".tmp")]
+    if not names:
+        return None
+    latest = f"{layer_storage.SILVER}/{max(names)}"
+    store.fetch_prefix(latest)
+    return store.local_path(latest)
+
+
+def _load_silver_state(tag="featured") -> dict:
+    """
+    Carrega o último Silver do formato anterior como estado desduplicado {game_id: registro}.
+    Usado só no primeiro commit da tabela, para que ela comece com o que já existia.
+    """
+    latest = _latest_silver_file(tag)
+    if latest is None:
+        return {}
+    try:
+        items = formats.read_dataset(latest)
+    except Exception as e:
+        print(f"[process_silver] error reading silver state {latest}: {e}")
+        return {}
+    return {game["game_id"]: GameRecord.from_dict(game) for game in items if game.get("game_id")}
+
+
+def _save_silver(table, items, overwrite=False) -> dict:
+    # Só os registros desta execução: MERGE por game_id (ou substituição total no full_rebuild).
+    # Arquivos novos por partição + um commit no log; leitores nunca veem a escrita pela metade.
+    if overwrite:
+        commit = table.overwrite(items, schema_version=SCHEMA_VERSION)
+    else:
+        commit = table.merge(items, schema_version=SCHEMA_VERSION)
+    metrics.count("pipeline_bytes_written_total", sum(a["bytes"] for a in commit["add"]), function=FUNCTION)
+    print(f"[process_silver] committed {silver_table.version_name(commit['version'])} "
+          f"({commit['operation']}, {len(commit['add'])} files)")
+    return commit
 
 
 def _validate_and_clean_game(game: dict) -> dict | None:
     """
     Valida e converte tipos de dados do registro do jogo usando o SCHEMA_FEATURED_GAME.
     Retorna o jogo limpo ou None se a validação falhar.
+    (Delegado ao validador compilado; a referência está em Schemas/validator.py.)
     """
-    cleaned_game = {}
-    
-    # 1. VALIDAÇÃO CRÍTICA: Game ID deve existir e ser conversível
-    game_id = game.get("game_id")
-    if game_id is None:
-        return None 
+    return FEATURED_GAME_VALIDATOR.validate(game)
+
+
+def _env_int(name: str, default: int) -> int:
     try:
-        cleaned_game["game_id"] = int(game_id)
+        return int(os.getenv(name, default))
     except ValueError:
-        return None # Descartar se o ID não for um número
-
-    # 2. Conversão e Limpeza dos demais campos
-    for field, spec in SCHEMA_FEATURED_GAME.items():
-        if field == "game_id":
-            continue # Já validado
-
-        value = game.get(field)
-        
-        try:
-            target_type = spec["type"]
-            
-            if value is not None:
-                if field in ["original_price", "final_price"]:
-                    # Lógica robusta para preço: trata None, remove caracteres
-                    value = str(value).replace('R$', '').replace(',', '.').strip()
-                    cleaned_game[field] = float(value)
-                elif target_type is bool and isinstance(value, int):
-                    cleaned_game[field] = bool(value)
-                else:
-                    cleaned_game[field] = target_type(value)
-            else:
-                # Mantém o valor como None se não foi encontrado, mas pula a conversão
-                cleaned_game[field] = None 
-
-        except (ValueError, TypeError):
-            # Se a conversão falhar (ex: 'abc' para float), registramos None e seguimos
-            cleaned_game[field] = None
-            
-    # Garantir que todos os campos do schema estejam no dicionário, mesmo que None
-    for field in SCHEMA_FEATURED_GAME.keys():
-        if field not in cleaned_game:
-            cleaned_game[field] = None
-            
-    return cleaned_game
-
-
-def main(timer: func.TimerRequest) -> None:
-    print("[process_silver] start")
-    
-    bronze_files = _list_bronze_files() 
-    
-    if not bronze_files:
+        return default
+
+
+def run(full_rebuild: bool = False, workers: int = 1, chunk_size: int = silver_transform.DEFAULT_CHUNK_SIZE):
+    """
+    Processamento Bronze -> Silver.
+
+    Modo incremental (padrão): apenas os arquivos Bronze que não constam no manifesto de
+    ingestão são lidos, e seus registros entram na tabela Silver por MERGE (game_id).
+    Modo full_rebuild: ignora o manifesto e substitui todo o conteúdo da tabela pelo
+    reprocessamento de todo o Bronze (backfill).
+    workers > 1 distribui os arquivos Bronze entre processos (chunk_size arquivos por tarefa);
+    a saída é idêntica à do modo serial.
+    Retorna (nome da versão gravada, linhas) ou None se nada foi gravado.
+    """
+    print(f"[process_silver] start (full_rebuild={full_rebuild}, workers={workers})")
+    metrics.reset_peak_memory()
+    try:
+        with metrics.span(FUNCTION, "total"):
+            return _run(full_rebuild, workers, chunk_size)
+    finally:
+        _storage().close()
+        metrics.export(FUNCTION)
+
+
+def _run(full_rebuild: bool, workers: int, chunk_size: int):
+    store = _storage()
+    with metrics.span(FUNCTION, "list_bronze"):
+        captures = _list_bronze_captures()
+
+    if not captures:
         print("[process_silver] no bronze files found")
         return
 
+    manifest_path = _manifest_path()
+    if full_rebuild:
+        manifest = {"version": ingestion_manifest.MANIFEST_VERSION, "files": {}}
+    else:
+        store.fetch(MANIFEST, mutable=True)
+        manifest = ingestion_manifest.load_manifest(manifest_path)
+
+    # Capturas das outras regiões (preços em outra moeda para os mesmos game_ids) não entram
+    # no Silver; vão para o histórico de preços da própria região
+    region = _silver_region()
+    regional = [c for c in captures if not bronze_store.in_region(c, region)]
+    captures = [c for c in captures if bronze_store.in_region(c, region)]
+
+    # Objetos Bronze das capturas ainda não processadas, baixados em paralelo
+    # (os que já estão no cache local não acessam a rede)
+    known = manifest.get("files", {})
+    with metrics.span(FUNCTION, "fetch_bronze"):
+        store.fetch_many(sorted({store.key(c.path) for c in captures + regional if c.sha256 and c.name not in known}))
+
+    pending = _pending_captures(captures, manifest)
+    regional_pending = _pending_captures(regional, manifest)
+
+    if not pending and not regional_pending:
+        # Nenhum arquivo novo: apenas persiste eventuais atualizações de tamanho/mtime
+        ingestion_manifest.save_manifest(manifest_path, manifest)
+        store.put(MANIFEST)
+        print("[process_silver] no new bronze files since last run")
+        return
+
+    print(f"[process_silver] {len(pending)} of {len(captures)} bronze files pending")
+
     # MUDANÇA CRÍTICA: Usa um dicionário para garantir desduplicação por game_id
     # A última ocorrência de um game_id (a mais recente processada) prevalecerá.
-    unique_games_dict = {}
+    # A tabela resolve o restante na leitura; só o primeiro commit parte do Silver antigo.
+    table = _open_table()
+    with metrics.span(FUNCTION, "load_silver_state"):
+        unique_games_dict = {} if full_rebuild or table.exists() else _load_silver_state(tag="featured")
     normalized_ts = _now_iso()
 
-    for bf in bronze_files:
-        try:
-            payload = _load_json(bf)
-            
-            if not isinstance(payload, dict):
-                 print(f"[process_silver] SKIPPING: {bf.name} não é um dicionário (formato de API).")
-                 continue
-            
-            categories = parser.parse_featured(payload) 
-
-            for category_name, category_data in categories.items():
-                for game in category_data.get("items", []):
-                    
-                    ## normalizao renomeando id para game_id
-                    normalized_game = parser.normalize_featured(game)
-                    
-                    # Se não for um jogo válido (ex: banner/spotlight), a normalização retorna None e pulamos
-                    if not normalized_game:
-                        continue                        
-
-                    # 1. Adiciona Metadados
-                    game["source"] = "steam"
-                    game["endpoint"] = "featuredcategories"
-                    game["category"] = category_name 
-                    game["captured_at"] = normalized_ts
-                    game["normalized_at"] = normalized_ts
-                    
-                    # 2. VALIDAÇÃO E LIMPEZA
-                    validated_game = _validate_and_clean_game(game)
-                    
-                    if validated_game:
-                        # 3. Adiciona ao dicionário de únicos, usando game_id como chave
-                        game_id = validated_game.get("game_id")
-                        if game_id:
-                            # Isso desduplica. Se o jogo já estiver no dict, ele será sobrescrito.
-                            unique_games_dict[game_id] = validated_game
-
-        except Exception as e:
-            print(f"[process_silver] error reading or parsing {bf}: {e}")
+    # Execuções com conteúdo idêntico à anterior não mudam o estado: entram no manifesto sem leitura
+    repeated = bronze_store.repeated_captures(captures)
+    processed = [(_manifest_key(c), fp) for c, fp in pending if c.name in repeated]
+    to_read = [(c, fp) for c, fp in pending if c.name not in repeated]
+    if processed:
+        print(f"[process_silver] {len(processed)} captures identical to the previous run skipped")
+
+    errors = Counter()
+    # O Silver guarda só o último registro de cada jogo; o histórico de preços recebe cada captura
+    prices = _open_price_history(store)
+    price_segments = prices.segment_names()
+    # captured_at de cada registro = horário da captura Bronze (não o do processamento): é o que a
+    # tabela compara no MERGE e o que define a partição capture_date
+    results = silver_transform.iter_processed_files([c.path for c, _ in to_read], normalized_ts,
+                                                    workers=workers, chunk_size=chunk_size,
+                                                    captured_at=[bronze_store.capture_time(c) for c, _ in to_read])
+    # Mescla na ordem dos arquivos (ordem de captura): a captura mais recente vence.
+    # (Duas capturas podem apontar para o mesmo objeto, por isso o pareamento é por posição.)
+    stats = Counter()
+    with metrics.span(FUNCTION, "parse_validate_merge"):
+        for (capture, fingerprint), (bf, ok, file_games, file_errors, file_stats) in zip(to_read, results):
+            errors.update(file_errors)
+            stats.update(file_stats)
+            if not ok:
+                # Leitura interrompida: os jogos parciais ficam de fora do Silver e do histórico;
+                # a captura não entra no manifesto e é relida inteira na próxima execução
+                metrics.count("pipeline_records_rejected_total", function=FUNCTION, reason="unreadable_file")
+                continue
+            silver_transform.merge_games(unique_games_dict, file_games)
+            prices.append(file_games.values(), captured_at=bronze_store.capture_time(capture))
+            processed.append((_manifest_key(capture), fingerprint))
+
+    if errors:
+        print(f"[process_silver] valores descartados na validação, por campo: {dict(errors)}")
+    metrics.count("pipeline_records_in_total", stats["records"], function=FUNCTION)
+    metrics.count("pipeline_records_rejected_total", stats["rejected"], function=FUNCTION, reason="invalid_game_id")
+    metrics.count("pipeline_bytes_read_total", stats["bytes"], function=FUNCTION)
+    for field, n in errors.items():
+        metrics.count("pipeline_values_discarded_total", n, function=FUNCTION, field=field)
 
     # Converte o dicionário de volta para uma lista
     final_game_list = list(unique_games_dict.values())
 
+    published = None
     if final_game_list:
-        _save_silver(final_game_list, tag="featured")
+        with metrics.span(FUNCTION, "write_silver"):
+            commit = _save_silver(table, final_game_list, overwrite=full_rebuild)
+        published = (silver_table.version_name(commit["version"]), len(final_game_list))
+        metrics.count("pipeline_records_out_total", len(final_game_list), function=FUNCTION)
         print(f"[process_silver] {len(final_game_list)} registros válidos e únicos salvos.")
+
+        with metrics.span(FUNCTION, "price_history"):
+            appended = prices.commit()
+            if appended:
+                _publish_price_history(store, prices, price_segments)
+        print(f"[process_silver] price history: {appended} new observations")
     else:
-        print("[process_silver] nothing to save or all records failed validation")
\ No newline at end of file
+        print("[process_silver] nothing to save or all records failed validation")
+    prices.close()
+
+    if regional_pending:
+        with metrics.span(FUNCTION, "regional_price_history"):
+            processed += _update_regional_prices(store, regional_pending, normalized_ts, workers, chunk_size)
+
+    # O manifesto só é atualizado depois que o Silver foi gravado com sucesso
+    for name, fingerprint in processed:
+        ingestion_manifest.mark_processed(manifest, name, fingerprint, normalized_ts)
+    ingestion_manifest.save_manifest(manifest_path, manifest)
+    store.put(MANIFEST)
+    return published
+
+
+def _is_processed(capture_name: str) -> bool:
+    # A captura já consta no manifesto (mensagem reentregue ou já coberta por outra execução)
+    _storage().fetch(MANIFEST, mutable=True)
+    files = ingestion_manifest.load_manifest(_manifest_path()).get("files", {})
+    return capture_name in files or f"{capture_name}.json" in files
+
+
+def main(msg: func.QueueMessage, outmsg: func.Out[str] = None) -> None:
+    """
+    Disparada por uma mensagem bronze-captured (uma captura Bronze nova).
+
+    Idempotente: se a captura já consta no manifesto, a mensagem é só confirmada. Senão,
+    roda o processamento incremental (que inclui a captura e qualquer outra pendente, na
+    ordem de captura) e publica o dataset Silver gravado em silver-published.
+    Erros propagam para a fila tentar de novo; após maxDequeueCount tentativas (host.json)
+    a mensagem vai para bronze-captured-poison.
+    """
+    try:
+        message = events.parse(msg.get_body(), events.BRONZE_QUEUE)
+    except events.InvalidMessage as e:
+        # Nunca vai dar certo: registra direto como dead letter em vez de tentar de novo
+        events.record_dead_letter(_storage(), events.BRONZE_QUEUE, msg.get_body(),
+                                  msg.dequeue_count, reason=str(e), message_id=msg.id)
+        print(f"[process_silver] mensagem inválida descartada: {e}")
+        return
+
+    capture = message["capture"]
+    if _is_processed(capture):
+        print(f"[process_silver] {capture} já processada; nada a fazer")
+        return
+
+    # SILVER_FULL_REBUILD=1 força o reprocessamento completo (backfill) pela Function
+    # SILVER_WORKERS / SILVER_CHUNK_SIZE ativam o processamento paralelo dos arquivos Bronze
+    full_rebuild = os.getenv("SILVER_FULL_REBUILD", "0").lower() in ("1", "true", "yes")
+    published = run(full_rebuild=full_rebuild,
+                    workers=_env_int("SILVER_WORKERS", 1),
+                    chunk_size=_env_int("SILVER_CHUNK_SIZE", silver_transform.DEFAULT_CHUNK_SIZE))
+
+    if not _is_processed(capture):
+        # Ex: a captura ainda não estava visível ou falhou na leitura; a fila tenta de novo
+        raise RuntimeError(f"captura {capture} não foi processada")
+
+    if published is not None and outmsg is not None:
+        name, rows = published
+        outmsg.set(events.silver_published(name, rows))
+        print(f"[process_silver] {name} publicado em {events.SILVER_QUEUE}")
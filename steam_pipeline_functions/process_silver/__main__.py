@@ -0,0 +1,19 @@
+# Execução manual do processamento Silver, fora do host do Azure Functions:
+#   python -m process_silver                 (incremental)
+#   python -m process_silver --full-rebuild  (backfill: reprocessa todo o Bronze)
+#   python -m process_silver --full-rebuild --workers 8 --chunk-size 16
+import argparse
+
+from . import run
+from src.processing import silver_transform
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Processamento Bronze -> Silver")
+    ap.add_argument("--full-rebuild", action="store_true",
+                    help="ignora o manifesto de ingestão e reprocessa todos os arquivos Bronze")
+    ap.add_argument("--workers", type=int, default=1,
+                    help="processos para ler/validar os arquivos Bronze em paralelo (padrão: 1, serial)")
+    ap.add_argument("--chunk-size", type=int, default=silver_transform.DEFAULT_CHUNK_SIZE,
+                    help="arquivos Bronze enviados a cada worker por tarefa")
+    args = ap.parse_args()
+    run(full_rebuild=args.full_rebuild, workers=args.workers, chunk_size=args.chunk_size)
@@ -0,0 +1,58 @@
+# tests/test_backfill.py
+"""
+Fase de map do backfill com uma captura Bronze truncada:
+
+    python -m unittest tests.test_backfill
+"""
+import gzip
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from src.processing import backfill
+from src.processing import silver_transform
+
+NORMALIZED_TS = "2025-12-12T00:00:00+00:00"
+
+
+def _payload(n: int) -> dict:
+    items = [{"id": 1000 + i, "type": 0, "name": f"Game {i}", "discounted": True, "discount_percent": 50,
+              "original_price": 2000, "final_price": 1000} for i in range(n)]
+    return {"specials": {"id": "cat_specials", "name": "Specials", "items": items}}
+
+
+class MapTruncatedCaptureTest(unittest.TestCase):
+    def test_truncated_capture_is_not_mapped(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            good = root / "raw_featured_20251210_120000.json"
+            good.write_text(json.dumps(_payload(20)), encoding="utf-8")
+            raw = json.dumps(_payload(40))
+            bad = root / "raw_featured_20251211_120000.json"
+            bad.write_text(raw[:len(raw) // 2], encoding="utf-8")
+
+            # Lotes de validação de 1 jogo: a leitura truncada devolve os jogos lidos até o erro
+            with mock.patch.object(silver_transform, "VALIDATION_BATCH_SIZE", 1):
+                ok, games, _, _ = silver_transform.process_bronze_file(bad, NORMALIZED_TS)
+                self.assertFalse(ok)
+                self.assertTrue(games)
+
+                items = [[0, str(good), "2025-12-10T12:00:00+00:00"], [1, str(bad), "2025-12-11T12:00:00+00:00"]]
+                result = backfill.map_task(root / "work", 0, items, shards=2, normalized_ts=NORMALIZED_TS)
+
+            self.assertEqual(result["unreadable"], [str(bad)])
+            seqs = []
+            for path in (root / "work" / "map").glob("task-*/shard-*.jsonl.gz"):
+                with gzip.open(path, "rt", encoding="utf-8") as f:
+                    seqs += [json.loads(line)[0] for line in f]
+            self.assertEqual(len(seqs), 20)
+            self.assertEqual(set(seqs), {0})
+
+
+if __name__ == "__main__":
+    unittest.main()
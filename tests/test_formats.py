@@ -0,0 +1,49 @@
+# tests/test_formats.py
+"""
+Ida e volta dos formatos de armazenamento sobre um dataset particionado (Hive):
+
+    python -m unittest tests.test_formats
+"""
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from src.processing import formats
+
+RECORDS = [
+    {"game_id": 1, "category": "specials", "final_price": 9.99, "captured_at": "2025-12-11T10:00:00"},
+    {"game_id": 2, "category": "top_sellers", "final_price": None, "captured_at": "2025-12-11T10:00:00"},
+    {"game_id": 3, "category": None, "final_price": 0.0, "captured_at": "2025-12-12T08:30:00"},
+]
+
+
+class PartitionedRoundTripTest(unittest.TestCase):
+    def _round_trip(self, name: str) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp) / "silver_featured_test"
+            written = formats.write_dataset(root, RECORDS, formats.SILVER_PARTITIONING, formats.get_format(name))
+            self.assertEqual(len(written), 3)
+
+            rows = sorted(formats.read_dataset(root), key=lambda r: r["game_id"])
+            self.assertEqual(rows, RECORDS)
+            columns = formats.read_dataset_columns(root, columns=["game_id", "category"])
+            self.assertEqual(sorted(columns["game_id"]), [1, 2, 3])
+            categories = [r["category"] for r in formats.read_files(written, columns=["category"])]
+            self.assertEqual(sorted(categories, key=str), [None, "specials", "top_sellers"])
+
+    def test_json(self):
+        self._round_trip("json")
+
+    def test_columnar(self):
+        self._round_trip("columnar")
+
+    @unittest.skipUnless("parquet" in formats.FORMATS, "pyarrow não instalado")
+    def test_parquet(self):
+        self._round_trip("parquet")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+# tests/test_price_history.py
+"""
+Segmentos do histórico de preços com dois escritores concorrentes:
+
+    python -m unittest tests.test_price_history
+"""
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from src.processing import price_history
+
+
+def _records(price: float, n: int = 3) -> list:
+    return [{"game_id": i, "final_price": price, "original_price": 20.0, "discount_percent": 50,
+             "category": "specials"} for i in range(n)]
+
+
+class ConcurrentWritersTest(unittest.TestCase):
+    def test_same_offsets_do_not_share_segments(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            base = Path(tmp) / "base"
+            store = price_history.PriceHistoryStore(base)
+            store.append(_records(10.0), captured_at="2025-12-11T10:00:00+00:00")
+            store.commit()
+            store.close()
+
+            # Duas instâncias partem do mesmo índice e gravam observações diferentes nos mesmos offsets
+            shutil.copytree(base, Path(tmp) / "a")
+            shutil.copytree(base, Path(tmp) / "b")
+            writers = {}
+            for name, price in (("a", 7.5), ("b", 5.0)):
+                writer = writers[name] = price_history.PriceHistoryStore(Path(tmp) / name)
+                writer.append(_records(price), captured_at="2025-12-12T10:00:00+00:00")
+                self.assertEqual(writer.commit(), 3)
+                writer.close()
+            names_a, names_b = writers["a"].segment_names(), writers["b"].segment_names()
+            self.assertTrue(set(names_a).isdisjoint(names_b))
+
+            # Os segmentos do escritor b no mesmo diretório não alteram o que o índice de a lê
+            for name in names_b:
+                shutil.copy(Path(tmp) / "b" / name, Path(tmp) / "a" / name)
+            reader = price_history.PriceHistoryStore(Path(tmp) / "a")
+            self.assertEqual(reader.segment_names(), names_a)
+            self.assertEqual([h["final_price"] for h in reader.history(1)], [10.0, 7.5])
+            reader.close()
+
+    def test_version_2_index_is_still_read(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            store = price_history.PriceHistoryStore(root)
+            store.append(_records(10.0), captured_at="2025-12-11T10:00:00+00:00")
+            store.commit()
+            store.close()
+
+            # Regrava o índice no layout da versão 2 (segmentos sem hash no nome)
+            raw = (root / price_history.INDEX_NAME).read_bytes()
+            header, entry = price_history._INDEX_HEADER, price_history._SEGMENT_ENTRY
+            magic, _, committed, count, segments = header.unpack_from(raw, 0)
+            pos = header.size
+            entries = list(entry.iter_unpack(raw[pos:pos + segments * entry.size]))
+            pos += segments * entry.size
+            parts = [header.pack(magic, 2, committed, count, segments)]
+            for start, end, digest in entries:
+                parts.append(price_history._SEGMENT_ENTRY_V2.pack(start, end))
+                (root / price_history.segment_name(start, end, digest)).rename(
+                    root / price_history.segment_name(start, end))
+            (root / price_history.INDEX_NAME).write_bytes(b"".join(parts) + raw[pos:])
+
+            store = price_history.PriceHistoryStore(root)
+            self.assertEqual([h["final_price"] for h in store.history(2)], [10.0])
+            store.append(_records(8.0), captured_at="2025-12-12T10:00:00+00:00")
+            store.commit()
+            store.close()
+            store = price_history.PriceHistoryStore(root)
+            self.assertEqual([h["final_price"] for h in store.history(2)], [10.0, 8.0])
+            store.close()
+
+
+if __name__ == "__main__":
+    unittest.main()